@@ -0,0 +1,96 @@
+# asr_cache.py
+"""
+Дисковый кэш результатов transcribe().
+
+Ключ = sha256 содержимого аудио + модель + compute_type + параметры декодирования,
+поэтому повторный прогон multi_track с другим gap_ms / merge_gap_ms
+не запускает ASR заново для неизменённых треков.
+Старые записи вытесняются по суммарному размеру (LRU по mtime); подкаталоги
+(namespace — например, эмбеддинги диаризации) делят с корнем один max_bytes.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+HASH_CHUNK = 1 << 20           # читаем аудио блоками по 1 МБ
+STALE_TMP_S = 3600             # .tmp старше — остаток упавшего put(), удаляется при evict
+
+
+def file_digest(path) -> str:
+    """sha256 содержимого файла (не пути и не mtime)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ASRCache:
+    def __init__(self, cache_dir, max_bytes=2 << 30, model="", compute_type="", root=None):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.root = Path(root) if root is not None else self.dir
+        self.max_bytes = max_bytes
+        self.model = model
+        self.compute_type = compute_type
+
+    def namespace(self, name, model="", compute_type="") -> "ASRCache":
+        """Кэш в подкаталоге name с общим бюджетом max_bytes."""
+        return ASRCache(self.dir / name, self.max_bytes, model, compute_type, root=self.root)
+
+    def key(self, audio_path, options: dict) -> str:
+        meta = json.dumps({
+            "audio":        file_digest(audio_path),
+            "model":        self.model,
+            "compute_type": self.compute_type,
+            "options":      options,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(meta.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.json"
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(path)                 # «свежее» для LRU-вытеснения
+        return result
+
+    def put(self, key: str, result: dict):
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp, path)          # атомарно: параллельный прогон не увидит полфайла
+        self.evict()
+
+    def evict(self):
+        """Удаляем самые старые записи (во всём дереве root), пока кэш не влезет в max_bytes."""
+        entries = []
+        total = 0
+        now = time.time()
+        for p in self.root.rglob("*"):
+            # параллельный прогон мог удалить или переименовать файл между glob и stat
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            if p.suffix == ".tmp" and now - st.st_mtime > STALE_TMP_S:
+                p.unlink(missing_ok=True)
+                continue
+            if p.suffix != ".json":
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,188 @@
+"""
+Раздача PCM участников другим процессам через общую память (без копий).
+
+Бот (AUDIO_FANOUT=true) публикует каждый кадр в кольцо в
+multiprocessing.shared_memory, локальные потребители (ASR, VAD, диаризация)
+подключаются по имени и читают кадры прямо из этой памяти:
+
+    python sample_program/audio_fanout.py zoom_audio_<meeting>   # индикатор уровня
+
+    reader = AudioFanoutReader(name)
+    for frame in reader.frames():
+        np.frombuffer(frame.data, reader.dtype)   # view в общую память
+
+Раскладка сегмента:
+    заголовок  | индекс слотов (seq, user_id, nbytes, ts_us) | данные слотов
+Формат сэмплов (s16 / f32, как CAPTURE_SAMPLE_FORMAT) — в заголовке рядом с
+частотой и числом каналов.
+Писатель один. Слот — seqlock: seq обнуляется, пишутся данные, затем seq = номер
+кадра и write_seq в заголовке. Читатель сверяет seq до и после чтения; если
+писатель обогнал его на целое кольцо, пропущенные кадры считаются в lost.
+"""
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+MAGIC = b"ZAFO"
+VERSION = 2
+# magic, version, slots, slot_bytes, rate, channels, sample_format, (выравнивание), write_seq
+HEADER = struct.Struct("<4sIIIIII4xQ")
+SLOT = struct.Struct("<QIIQ")          # seq, user_id, nbytes, ts_us
+WRITE_SEQ_OFFSET = HEADER.size - 8
+
+SLOTS = 4096                           # ~10 с при 4 говорящих (100 кадров/с на участника)
+SLOT_BYTES = 1920                      # 10 мс 48 кГц стерео int16 — с запасом для 32 кГц моно
+SAMPLE_FORMATS = {"s16": 0, "f32": 1}  # код в заголовке
+
+
+def _attach(name):
+    """Подключение без resource_tracker: иначе потребитель удалит сегмент при выходе."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:                  # Python < 3.13
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class AudioFanoutPublisher:
+    def __init__(self, name, slots=SLOTS, slot_bytes=SLOT_BYTES, sample_rate=32000, channels=1,
+                 sample_format="s16"):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"unknown sample format: {sample_format}")
+        self.name = name
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.index_offset = HEADER.size
+        self.data_offset = HEADER.size + slots * SLOT.size
+        self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                              size=self.data_offset + slots * slot_bytes)
+        self.buf = self.shm.buf
+        self.seq = 0
+        self.oversized = 0
+        HEADER.pack_into(self.buf, 0, MAGIC, VERSION, slots, slot_bytes, sample_rate, channels,
+                         SAMPLE_FORMATS[sample_format], 0)
+
+    def publish(self, user_id, pcm, ts_us=None):
+        """Вызывается из колбэка аудио: одна запись в кольцо, без блокировок."""
+        n = len(pcm)
+        if n > self.slot_bytes:
+            self.oversized += 1
+            return
+        if ts_us is None:
+            ts_us = time.time_ns() // 1000
+        self.seq += 1
+        slot = self.seq % self.slots
+        meta = self.index_offset + slot * SLOT.size
+        data = self.data_offset + slot * self.slot_bytes
+        SLOT.pack_into(self.buf, meta, 0, 0, 0, 0)             # слот «в записи»
+        self.buf[data:data + n] = pcm
+        SLOT.pack_into(self.buf, meta, self.seq, user_id, n, ts_us)
+        struct.pack_into("<Q", self.buf, WRITE_SEQ_OFFSET, self.seq)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+@dataclass
+class FanoutFrame:
+    seq: int
+    user_id: int
+    ts_us: int
+    data: memoryview       # действителен, пока писатель не сделал круг по кольцу
+
+    def copy(self) -> bytes:
+        return bytes(self.data)
+
+
+class AudioFanoutReader:
+    def __init__(self, name, poll_interval=0.005):
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        magic, version, self.slots, self.slot_bytes, self.sample_rate, self.channels, fmt, write_seq = \
+            HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name}: not an audio fan-out segment")
+        formats = {code: fmt_name for fmt_name, code in SAMPLE_FORMATS.items()}
+        if fmt not in formats:
+            raise ValueError(f"{name}: unknown sample format code {fmt}")
+        self.sample_format = formats[fmt]
+        self.index_offset = HEADER.size
+        self.data_offset = HEADER.size + self.slots * SLOT.size
+        self.next_seq = write_seq + 1          # читаем только новые кадры
+        self.lost = 0
+        self.poll_interval = poll_interval
+
+    @property
+    def dtype(self) -> str:
+        """numpy dtype сэмплов кадра."""
+        return "<f4" if self.sample_format == "f32" else "<i2"
+
+    def write_seq(self) -> int:
+        return struct.unpack_from("<Q", self.buf, WRITE_SEQ_OFFSET)[0]
+
+    def is_valid(self, frame: FanoutFrame) -> bool:
+        """Кадр ещё не перезаписан (проверять после обработки view без копии)."""
+        meta = self.index_offset + (frame.seq % self.slots) * SLOT.size
+        return SLOT.unpack_from(self.buf, meta)[0] == frame.seq
+
+    def read_available(self) -> list[FanoutFrame]:
+        head = self.write_seq()
+        if head - self.next_seq >= self.slots:             # писатель обогнал на круг
+            skip_to = head - self.slots + 1
+            self.lost += skip_to - self.next_seq
+            self.next_seq = skip_to
+        frames = []
+        while self.next_seq <= head:
+            seq = self.next_seq
+            slot = seq % self.slots
+            meta = self.index_offset + slot * SLOT.size
+            slot_seq, user_id, n, ts_us = SLOT.unpack_from(self.buf, meta)
+            self.next_seq += 1
+            if slot_seq != seq:                            # уже перезаписан
+                self.lost += 1
+                continue
+            data = self.data_offset + slot * self.slot_bytes
+            frames.append(FanoutFrame(seq, user_id, ts_us, self.buf[data:data + n]))
+        return frames
+
+    def frames(self):
+        """Бесконечный поток кадров; опрашивает заголовок раз в poll_interval."""
+        while True:
+            batch = self.read_available()
+            if not batch:
+                time.sleep(self.poll_interval)
+                continue
+            yield from batch
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+def main():
+    """Пример потребителя: уровень сигнала по участникам раз в секунду."""
+    import numpy as np
+
+    reader = AudioFanoutReader(sys.argv[1])
+    print(f"attached: {reader.slots} slots, {reader.sample_rate} Hz {reader.sample_format}")
+    scale = 1.0 if reader.sample_format == "f32" else 1 / 32768
+    energy, count, last = {}, {}, time.monotonic()
+    for frame in reader.frames():
+        samples = np.frombuffer(frame.data, reader.dtype).astype(np.float32) * scale
+        energy[frame.user_id] = energy.get(frame.user_id, 0.0) + float(np.dot(samples, samples))
+        count[frame.user_id] = count.get(frame.user_id, 0) + len(samples)
+        if time.monotonic() - last >= 1.0:
+            levels = {u: (energy[u] / max(count[u], 1)) ** 0.5 for u in energy}
+            print(" ".join(f"{u}:{lvl:.3f}" for u, lvl in sorted(levels.items())),
+                  f"lost={reader.lost}")
+            energy, count, last = {}, {}, time.monotonic()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# audio_io.py
+"""
+Загрузка WAV бота без ffmpeg/av: файл отображается в память (np.memmap),
+переводится в float32 моно и ресэмплируется потоково, блоками,
+полифазным FIR-фильтром (векторно, numpy).
+
+    load_audio(path)   → np.float32[16 kHz] — сразу в model.transcribe()
+    iter_chunks(path)  → генератор блоков, память не растёт с длиной трека
+"""
+import math
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+ASR_RATE = 16000
+CHUNK_S = 30                          # длительность блока на входе, сек
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+WavInfo = namedtuple("WavInfo", "channels rate bits fmt offset frames")
+
+
+def wav_info(path) -> WavInfo:
+    """Разбираем RIFF-заголовок: формат сэмплов и смещение блока data."""
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path}: not a RIFF/WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                tag, channels, rate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+                if tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (tag, channels, rate, bits, block_align)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"{path}: data chunk before fmt")
+                tag, channels, rate, bits, block_align = fmt
+                offset = f.tell()
+                # незакрытый wave.Wave_write (бот упал) оставляет size = 0
+                if size == 0:
+                    f.seek(0, 2)
+                    size = f.tell() - offset
+                return WavInfo(channels, rate, bits, tag, offset, size // block_align)
+            else:
+                f.seek(size + (size & 1), 1)   # чанки выровнены по 2 байта
+
+
+def is_supported(info: WavInfo) -> bool:
+    return ((info.fmt == WAVE_FORMAT_PCM and info.bits == 16)
+            or (info.fmt == WAVE_FORMAT_IEEE_FLOAT and info.bits == 32))
+
+
+def open_pcm(path, info: WavInfo | None = None) -> np.ndarray:
+    """memmap (frames, channels) без чтения файла целиком."""
+    info = info or wav_info(path)
+    if not is_supported(info):
+        raise ValueError(f"{path}: unsupported WAV format {info}")
+    dtype = np.int16 if info.fmt == WAVE_FORMAT_PCM else np.float32
+    if info.frames == 0:
+        return np.zeros((0, info.channels), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=info.offset,
+                     shape=(info.frames, info.channels))
+
+
+def _to_float_mono(block: np.ndarray) -> np.ndarray:
+    if block.dtype == np.int16:
+        block = block.astype(np.float32) * (1.0 / 32768.0)
+    if block.shape[1] == 1:
+        return np.ascontiguousarray(block[:, 0], dtype=np.float32)
+    return block.mean(axis=1, dtype=np.float32)
+
+
+class Resampler:
+    """
+    Потоковый полифазный ресэмплер src_rate → dst_rate (рациональное L/M).
+    Окно Кайзера, задержка фильтра скомпенсирована — отсчёт n выхода
+    соответствует времени n / dst_rate входа, тайм-коды слов не сдвигаются.
+    """
+
+    def __init__(self, src_rate, dst_rate, zero_crossings=16, beta=8.0):
+        g = math.gcd(src_rate, dst_rate)
+        self.up = dst_rate // g
+        self.down = src_rate // g
+        factor = max(self.up, self.down)
+        half = zero_crossings * factor
+        n = np.arange(-half, half + 1)
+        cutoff = 0.5 / factor                   # доля частоты после up-sampling
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(len(n), beta) * self.up
+        self.center = half
+        self.taps = math.ceil(len(h) / self.up)
+        h = np.concatenate([h, np.zeros(self.taps * self.up - len(h))])
+        # phases[p, j] — коэффициент для x[base - taps + 1 + j]
+        self.phases = h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.hist_start = -(self.taps - 1)      # глобальный индекс history[0]
+        self.consumed = 0                       # сколько реальных отсчётов подано
+        self.produced = 0
+
+    def _emit(self, x: np.ndarray, limit=None) -> np.ndarray:
+        buf = np.concatenate([self.history, x])
+        buf_end = self.hist_start + len(buf)    # глобальный индекс за последним
+        # выход n требует входа до base = (n*down + center) // up включительно
+        n_max = ((buf_end - 1) * self.up - self.center) // self.down
+        if limit is not None:
+            n_max = min(n_max, limit - 1)
+        out = np.zeros(0, dtype=np.float32)
+        if n_max >= self.produced:
+            n = np.arange(self.produced, n_max + 1)
+            t = n * self.down + self.center
+            base = t // self.up
+            rows = base - (self.taps - 1) - self.hist_start
+            windows = np.lib.stride_tricks.sliding_window_view(buf, self.taps)[rows]
+            out = np.einsum("ij,ij->i", windows, self.phases[t % self.up]).astype(np.float32)
+            self.produced = n_max + 1
+        keep = self.taps - 1
+        self.history = buf[len(buf) - keep:] if keep else buf[:0]
+        self.hist_start = buf_end - keep
+        return out
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        self.consumed += len(x)
+        return self._emit(np.asarray(x, dtype=np.float32))
+
+    def flush(self) -> np.ndarray:
+        total = math.ceil(self.consumed * self.up / self.down)
+        tail = np.zeros(self.center // self.up + self.taps + 1, dtype=np.float32)
+        return self._emit(tail, limit=total)
+
+    def output_length(self, frames: int) -> int:
+        return math.ceil(frames * self.up / self.down)
+
+
+def iter_chunks(path, target_rate=ASR_RATE, chunk_s=CHUNK_S):
+    """float32-моно блоки на target_rate; в памяти только текущий блок."""
+    info = wav_info(path)
+    pcm = open_pcm(path, info)
+    step = max(int(chunk_s * info.rate), 1)
+    resampler = None if info.rate == target_rate else Resampler(info.rate, target_rate)
+    for i in range(0, info.frames, step):
+        block = _to_float_mono(pcm[i:i + step])
+        out = block if resampler is None else resampler.process(block)
+        if len(out):
+            yield out
+    if resampler is not None:
+        tail = resampler.flush()
+        if len(tail):
+            yield tail
+
+
+def load_audio(path, target_rate=ASR_RATE, chunk_s=CHUNK_S) -> np.ndarray:
+    """
+    Весь трек как float32 на target_rate. Выходной массив выделяется один раз,
+    промежуточных копий всего файла (decode → resample) нет.
+    """
+    info = wav_info(path)
+    if info.rate == target_rate:
+        total = info.frames
+    else:
+        total = Resampler(info.rate, target_rate).output_length(info.frames)
+    audio = np.empty(total, dtype=np.float32)
+    pos = 0
+    for block in iter_chunks(path, target_rate, chunk_s):
+        n = min(len(block), total - pos)
+        audio[pos:pos + n] = block[:n]
+        pos += n
+    return audio[:pos]
+
+
+def asr_input(path):
+    """Массив для model.transcribe(), если WAV в известном формате; иначе сам путь."""
+    try:
+        info = wav_info(path)
+    except (ValueError, OSError, struct.error):
+        return str(path)
+    if not is_supported(info):
+        return str(path)
+    return load_audio(path)
@@ -0,0 +1,297 @@
+"""
+Автоподбор конфигурации ASR под хост: модель × compute_type × раскладка потоков.
+
+    python transcribe_zoom.py --input out/audio/<meeting> --autotune
+    python transcribe_zoom.py --input ... --autotune --autotune_models medium,large-v3
+
+  1. из записей берётся образец — первые --autotune_seconds речи (Silero-VAD
+     по блокам, весь трек в память не читается);
+  2. каждая конфигурация гоняется в отдельных процессах (spawn): модель
+     грузится, процессы стартуют по барьеру и транскрибируют образец
+     одновременно — workers процессов по cpu_threads потоков CTranslate2;
+  3. меряются RTF (wall / аудио, суммарно по процессам), CPU, пик RSS и
+     время загрузки; текст сравнивается с эталоном (первая модель в полной
+     точности) — конфигурации с похожестью ниже порога отбрасываются;
+  4. лучшая по RTF сохраняется в профиль хоста; последующие запуски
+     transcribe_zoom подставляют из него то, что не задано явно.
+
+Профиль — HOST_PROFILE (по умолчанию ~/.cache/zoom_transcribe/host_profile.json),
+привязан к отпечатку хоста (имя, модель CPU, число ядер): скопированный на
+другую машину профиль игнорируется.
+"""
+import difflib
+import hashlib
+import json
+import os
+import platform
+import resource
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from audio_io import ASR_RATE, iter_chunks
+from batched_asr import speech_islands
+
+HOST_PROFILE = Path(os.environ.get(
+    "HOST_PROFILE", Path.home() / ".cache" / "zoom_transcribe" / "host_profile.json"))
+SAMPLE_VAD = {"min_silence_duration_ms": 300, "speech_pad_ms": 100}
+
+COMPUTE_TYPES = {
+    "cpu": ["int8", "int8_float32", "float32"],
+    "cuda": ["float16", "int8_float16", "int8"],
+}
+REFERENCE_COMPUTE = {"cpu": "float32", "cuda": "float16"}
+
+
+# ---------- профиль хоста ----------
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def host_fingerprint() -> dict:
+    return {"host": socket.gethostname(), "cpu": _cpu_model(), "cores": os.cpu_count()}
+
+
+def load_profile(device, path=HOST_PROFILE) -> dict | None:
+    """Выбранная конфигурация для device или None (нет файла / другой хост)."""
+    try:
+        data = json.loads(Path(path).read_text("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("fingerprint") != host_fingerprint():
+        print(f"→ host profile {path} is from another host, ignored")
+        return None
+    return data.get("profiles", {}).get(device)
+
+
+def save_profile(device, best, results, path=HOST_PROFILE):
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text("utf-8"))
+        if data.get("fingerprint") != host_fingerprint():
+            data = {}
+    except (OSError, ValueError):
+        data = {}
+    data["fingerprint"] = host_fingerprint()
+    data.setdefault("profiles", {})[device] = best
+    data.setdefault("results", {})[device] = results
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), "utf-8")
+    os.replace(tmp, path)
+
+
+def apply_profile(args, defaults: dict, path=HOST_PROFILE):
+    """Заполняет не заданные явно (None) поля args: профиль хоста, затем defaults."""
+    profile = None if args.no_host_profile else load_profile(args.device, path)
+    used = {}
+    for key, default in defaults.items():
+        if getattr(args, key) is not None:
+            continue
+        if profile and key in profile:
+            setattr(args, key, profile[key])
+            used[key] = profile[key]
+        else:
+            setattr(args, key, default)
+    if used:
+        print(f"→ host profile: {used}")
+    return profile
+
+
+# ---------- образец и замер ----------
+
+def extract_sample(paths, seconds) -> np.ndarray:
+    """Первые seconds секунд речи из записей, острова подряд."""
+    need = int(seconds * ASR_RATE)
+    parts, have = [], 0
+    for path in paths:
+        for block in iter_chunks(path):
+            for s, e in speech_islands(block, SAMPLE_VAD):
+                parts.append(block[s:e])
+                have += e - s
+                if have >= need:
+                    return np.concatenate(parts)[:need]
+    if not parts:
+        raise ValueError("no speech found for the autotune sample")
+    return np.concatenate(parts)
+
+
+def _bench_worker(cfg, sample_path, options, barrier, results):
+    try:
+        from faster_whisper import WhisperModel
+        t = time.perf_counter()
+        model = WhisperModel(cfg["model"], device=cfg["device"], compute_type=cfg["compute_type"],
+                             cpu_threads=cfg["cpu_threads"])
+        load_s = time.perf_counter() - t
+        audio = np.load(sample_path)
+    except Exception as e:
+        barrier.abort()
+        results.put({"error": f"{type(e).__name__}: {e}"})
+        return
+    try:
+        barrier.wait()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        segments, _ = model.transcribe(audio, **options)
+        text = " ".join(s.text.strip() for s in segments)
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+        return
+    results.put({
+        "wall_s": time.perf_counter() - wall0,
+        "cpu_s": time.process_time() - cpu0,
+        "load_s": load_s,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "text": text,
+    })
+
+
+def run_config(cfg, sample_path, sample_s, options, timeout_s):
+    import multiprocessing as mp
+    from queue import Empty
+
+    ctx = mp.get_context("spawn")              # чистый процесс: свои потоки, свой RSS
+    barrier = ctx.Barrier(cfg["workers"] + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_bench_worker, args=(cfg, sample_path, options, barrier, results))
+             for _ in range(cfg["workers"])]
+    for p in procs:
+        p.start()
+    runs = []
+    try:
+        barrier.wait(timeout=timeout_s)
+        for _ in procs:
+            runs.append(results.get(timeout=timeout_s))
+    except Exception as e:                     # BrokenBarrierError / Empty / таймаут
+        try:
+            runs.append(results.get(timeout=1))
+        except Empty:
+            runs.append({"error": f"{type(e).__name__}: timed out or failed"})
+    finally:
+        for p in procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.kill()
+    errors = [r["error"] for r in runs if "error" in r]
+    if errors:
+        return {**cfg, "error": errors[0]}
+    wall = max(r["wall_s"] for r in runs)
+    return {
+        **cfg,
+        "rtf": round(wall / (sample_s * cfg["workers"]), 4),       # на секунду аудио, суммарно
+        "stream_rtf": round(wall / sample_s, 4),                  # одного потока
+        "cpu_s": round(sum(r["cpu_s"] for r in runs), 2),
+        "load_s": round(max(r["load_s"] for r in runs), 2),
+        "rss_mb": round(sum(r["rss_mb"] for r in runs), 1),
+        "text": runs[0]["text"],
+    }
+
+
+def similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio()
+
+
+def layouts(cores, worker_counts):
+    """(workers, cpu_threads): процессы делят ядра поровну; плюс один процесс на половине ядер."""
+    out = []
+    for w in worker_counts:
+        if w <= cores:
+            out.append((w, max(cores // w, 1)))
+    if cores >= 4:
+        out.append((1, cores // 2))
+    return sorted(set(out))
+
+
+def candidates(models, compute_types, device, cores, worker_counts):
+    try:
+        import ctranslate2
+        supported = set(ctranslate2.get_supported_compute_types(device))
+        compute_types = [c for c in compute_types if c in supported]
+    except Exception:
+        pass
+    reference = {"model": models[0], "compute_type": REFERENCE_COMPUTE[device], "device": device,
+                 "workers": 1, "cpu_threads": cores}
+    grid = [reference]
+    for model in models:
+        for compute in compute_types:
+            for workers, threads in layouts(cores, worker_counts):
+                cfg = {"model": model, "compute_type": compute, "device": device,
+                       "workers": workers, "cpu_threads": threads}
+                if cfg != reference:
+                    grid.append(cfg)
+    return grid
+
+
+def autotune(paths, args, options):
+    models = [m for m in (args.autotune_models or args.model or "large").split(",") if m]
+    compute_types = (args.autotune_compute_types.split(",") if args.autotune_compute_types
+                     else COMPUTE_TYPES[args.device])
+    worker_counts = [int(w) for w in args.autotune_workers.split(",")]
+    cores = os.cpu_count() or 1
+
+    sample = extract_sample(paths, args.autotune_seconds)
+    sample_s = len(sample) / ASR_RATE
+    grid = candidates(models, compute_types, args.device, cores, worker_counts)
+    print(f"→ autotune: {len(grid)} configurations on a {sample_s:.0f}s sample")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        sample_path = os.path.join(tmp, "sample.npy")
+        np.save(sample_path, sample)
+        timeout_s = max(600.0, sample_s * 20)
+        for cfg in grid:
+            r = run_config(cfg, sample_path, sample_s, options, timeout_s)
+            if "error" not in r:
+                r["similarity"] = round(similarity(results[0]["text"], r["text"]), 3) \
+                    if results and "text" in results[0] else 1.0
+            results.append(r)
+            _print_result(r)
+
+    if "error" in results[0]:
+        raise RuntimeError(f"reference configuration failed: {results[0]['error']}")
+    ok = [r for r in results if "error" not in r
+          and r["similarity"] >= args.autotune_min_similarity
+          and (not args.autotune_max_rss_mb or r["rss_mb"] <= args.autotune_max_rss_mb)]
+    if not ok:
+        raise RuntimeError("no configuration passed the similarity/memory limits")
+    best = min(ok, key=lambda r: r["rtf"])
+    # без параллельных процессов тот же model/compute_type работает на своём числе потоков
+    single = [r for r in ok if r["workers"] == 1 and r["model"] == best["model"]
+              and r["compute_type"] == best["compute_type"]]
+    profile = {
+        "model": best["model"],
+        "compute_type": best["compute_type"],
+        "cpu_threads": min(single, key=lambda r: r["stream_rtf"])["cpu_threads"] if single else cores,
+        "workers": best["workers"],
+        "worker_cpu_threads": best["cpu_threads"],
+        "rtf": best["rtf"],
+        "tuned": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sample_s": round(sample_s, 1),
+        "sample_digest": hashlib.sha256(sample.tobytes()).hexdigest()[:16],
+    }
+    for r in results:
+        r.pop("text", None)
+    save_profile(args.device, profile, results)
+    print(f"✓ host profile saved to {HOST_PROFILE}: {profile['model']} {profile['compute_type']} "
+          f"workers={profile['workers']}×{profile['worker_cpu_threads']} threads, "
+          f"single-process {profile['cpu_threads']} threads (RTF {profile['rtf']})")
+    return profile
+
+
+def _print_result(r):
+    cfg = f"{r['model']:>10} {r['compute_type']:>13} {r['workers']}×{r['cpu_threads']:<3}"
+    if "error" in r:
+        print(f"  {cfg} failed: {r['error']}")
+        return
+    print(f"  {cfg} RTF {r['rtf']:.3f} (stream {r['stream_rtf']:.3f})  load {r['load_s']:.1f}s  "
+          f"RSS {r['rss_mb']:.0f} MB  similarity {r['similarity']:.3f}")
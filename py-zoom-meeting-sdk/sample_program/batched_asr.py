@@ -0,0 +1,112 @@
+# batched_asr.py
+"""
+Пакетный ASR по «островкам речи» всех спикеров сразу.
+
+Вместо model.transcribe() на каждый файл с batch=1:
+  1. Silero-VAD (из faster-whisper) режет каждый трек на островки ≤ 30 с;
+  2. островки всех треков сортируются по длительности (бакетинг по длине)
+     и копируются в один заранее выделенный буфер (трек читается повторно);
+  3. буфер идёт в BatchedInferencePipeline с clip_timestamps = островки;
+  4. каждый сегмент/слово отображается обратно в (спикер, локальное время трека).
+"""
+import bisect
+from dataclasses import dataclass
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from audio_io import ASR_RATE, load_audio
+
+ISLAND_PAD_S = 0.2             # тишина между островками в общем буфере
+MAX_ISLAND_S = 30              # окно Whisper
+
+
+@dataclass
+class Island:
+    speaker: str
+    local_start: float         # сек от начала трека
+    concat_start: float        # сек от начала общего буфера
+    duration: float
+
+
+def speech_islands(audio: np.ndarray, vad_parameters: dict):
+    """[(start_sample, end_sample)] речевых участков, не длиннее MAX_ISLAND_S."""
+    params = dict(vad_parameters)
+    params["max_speech_duration_s"] = min(params.get("max_speech_duration_s", MAX_ISLAND_S),
+                                          MAX_ISLAND_S)
+    return [(ts["start"], ts["end"])
+            for ts in get_speech_timestamps(audio, VadOptions(**params))]
+
+
+def _island_at(t, islands, starts) -> Island:
+    """Островок общего буфера, в который попадает время t."""
+    return islands[max(bisect.bisect_right(starts, t) - 1, 0)]
+
+
+def transcribe_islands(model, tracks: dict, vad_parameters: dict,
+                       batch_size=16, language=None):
+    """
+    tracks: {speaker: путь к WAV}.
+    Возвращает {speaker: list[dict]} — сегменты в локальном времени своего трека,
+    отсортированные по start (формат как у transcribe()).
+    """
+    # 1-й проход: только границы островков, звук трека сразу освобождается
+    pieces = []                                  # (duration, speaker, start)
+    for speaker, path in tracks.items():
+        found = speech_islands(load_audio(path), vad_parameters)
+        pieces += [(e - s, speaker, s) for s, e in found]
+        print(f"→ {speaker}: {len(found)} speech islands")
+    if not pieces:
+        return {speaker: [] for speaker in tracks}
+
+    # бакетинг по длине: соседние островки в батче близки по длительности
+    pieces.sort(key=lambda p: p[0])
+    pad = int(ISLAND_PAD_S * ASR_RATE)
+    islands, clips, placed = [], [], {speaker: [] for speaker in tracks}
+    pos = 0
+    for n, speaker, start in pieces:
+        islands.append(Island(speaker, start / ASR_RATE, pos / ASR_RATE, n / ASR_RATE))
+        clips.append({"start": pos / ASR_RATE, "end": (pos + n) / ASR_RATE})
+        placed[speaker].append((start, pos, n))
+        pos += n + pad
+    del pieces
+    starts = [isl.concat_start for isl in islands]
+
+    # 2-й проход: островки пишутся прямо в общий буфер, в памяти он и один трек
+    buf = np.zeros(pos, dtype=np.float32)
+    for speaker, spans in placed.items():
+        if spans:
+            audio = load_audio(tracks[speaker])
+            for start, at, n in spans:
+                buf[at:at + n] = audio[start:start + n]
+            del audio
+
+    pipeline = BatchedInferencePipeline(model=model)
+    segments, _ = pipeline.transcribe(buf,
+                                      language=language,
+                                      vad_filter=False,
+                                      clip_timestamps=clips,
+                                      batch_size=batch_size,
+                                      word_timestamps=True)
+
+    out = {speaker: [] for speaker in tracks}
+    for seg in segments:
+        isl = _island_at(seg.start, islands, starts)
+        shift = isl.local_start - isl.concat_start
+        out[isl.speaker].append({
+            "id":    seg.id,
+            "start": seg.start + shift,
+            "end":   seg.end + shift,
+            "text":  seg.text,
+            "words": [
+                {
+                    "start": w.start + shift,
+                    "end":   w.end + shift,
+                    "text":  w.word
+                } for w in (seg.words or [])
+            ],
+        })
+    for segs in out.values():
+        segs.sort(key=lambda s: s["start"])
+    return out
@@ -0,0 +1,258 @@
+"""
+Супервизор: запускает много ботов (sample.py) на одном хосте.
+
+    python sample_program/bot_supervisor.py --links links.txt --cpus_per_bot 1
+
+Каждая ссылка из очереди → отдельный процесс sample.py, закреплённый за своими
+ядрами (sched_setaffinity) и с лимитом памяти (RLIMIT_AS). Упавший бот
+перезапускается с backoff, SIGTERM/SIGINT переводит супервизор в режим drain:
+новые боты не стартуют, запущенным отправляется SIGTERM.
+
+Admission control: новый бот стартует, только если измеренная суммарная
+нагрузка (CPU из /proc/<pid>/stat, запись на диск из /proc/<pid>/io) плюс
+оценка «ещё одного бота» укладывается в бюджет хоста.
+"""
+import argparse
+import collections
+import os
+import resource
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from zoom_link import parse_zoom_link
+
+SAMPLE_PY = Path(__file__).with_name("sample.py")
+WORK_DIR = Path(__file__).resolve().parent.parent     # meeting_bot пишет в sample_program/out
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+EWMA_ALPHA = 0.3
+WARMUP_S = 10                  # пока бот входит во встречу, его замеры не показательны
+
+
+@dataclass
+class BotJob:
+    link: str
+    meeting_id: str
+    restarts: int = 0
+    not_before: float = 0.0
+
+
+@dataclass
+class BotProcess:
+    job: BotJob
+    proc: subprocess.Popen
+    cpus: list
+    started: float = field(default_factory=time.monotonic)
+    last_cpu_ticks: int = 0
+    last_write_bytes: int = 0
+    last_sample: float = field(default_factory=time.monotonic)
+    cpu_cores: float = 0.0          # EWMA, в ядрах
+    disk_mbps: float = 0.0          # EWMA, МБ/с
+
+
+def read_proc_usage(pid: int):
+    """(utime+stime в тиках, write_bytes) процесса; (0, 0), если процесс уже исчез."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = int(fields[11]) + int(fields[12])     # utime, stime
+    except (OSError, IndexError, ValueError):
+        return 0, 0
+    write_bytes = 0
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                if line.startswith("write_bytes:"):
+                    write_bytes = int(line.split()[1])
+    except OSError:
+        pass                         # /proc/<pid>/io может быть недоступен без CAP_SYS_PTRACE
+    return ticks, write_bytes
+
+
+class BotSupervisor:
+    def __init__(self, links, cpus_per_bot=1, mem_limit_mb=0, max_bots=0,
+                 cpu_budget=0.85, disk_budget_mbps=0.0, est_cpu_cores=0.5,
+                 est_disk_mbps=0.5, max_restarts=3, grace_s=20.0):
+        self.queue = collections.deque()
+        for link in links:
+            meeting_id, _ = parse_zoom_link(link)
+            self.queue.append(BotJob(link=link, meeting_id=meeting_id or link))
+        self.running: dict[int, BotProcess] = {}
+        self.cpus_per_bot = cpus_per_bot
+        self.free_cpus = sorted(os.sched_getaffinity(0))
+        self.host_cpus = len(self.free_cpus)
+        self.mem_limit = mem_limit_mb * 1024 * 1024
+        self.max_bots = max_bots or self.host_cpus // max(cpus_per_bot, 1)
+        self.cpu_budget = cpu_budget
+        self.disk_budget_mbps = disk_budget_mbps
+        self.est_cpu_cores = est_cpu_cores
+        self.est_disk_mbps = est_disk_mbps
+        self.max_restarts = max_restarts
+        self.grace_s = grace_s
+        self.draining = False
+        self.drain_deadline = 0.0
+
+    # ---------- admission control ----------
+
+    def is_warm(self, bot: BotProcess) -> bool:
+        return time.monotonic() - bot.started > WARMUP_S
+
+    def per_bot_estimate(self):
+        """Оценка нагрузки одного бота: максимум измеренного среди «прогретых» ботов."""
+        warm = [b for b in self.running.values() if self.is_warm(b)]
+        cpu = max([b.cpu_cores for b in warm], default=self.est_cpu_cores)
+        disk = max([b.disk_mbps for b in warm], default=self.est_disk_mbps)
+        return max(cpu, self.est_cpu_cores), max(disk, self.est_disk_mbps)
+
+    def can_admit(self) -> bool:
+        if self.draining or len(self.running) >= self.max_bots:
+            return False
+        if len(self.free_cpus) < self.cpus_per_bot:
+            return False
+        cpu_next, disk_next = self.per_bot_estimate()
+        # ещё не прогретые боты считаем по оценке, а не по (нулевому) замеру
+        cpu_used = sum(b.cpu_cores if self.is_warm(b) else cpu_next
+                       for b in self.running.values())
+        if cpu_used + cpu_next > self.cpu_budget * self.host_cpus:
+            return False
+        if self.disk_budget_mbps:
+            disk_used = sum(b.disk_mbps if self.is_warm(b) else disk_next
+                            for b in self.running.values())
+            if disk_used + disk_next > self.disk_budget_mbps:
+                return False
+        return True
+
+    # ---------- запуск / остановка ----------
+
+    def spawn(self, job: BotJob):
+        cpus = self.free_cpus[:self.cpus_per_bot]
+        del self.free_cpus[:self.cpus_per_bot]
+        mem_limit = self.mem_limit
+
+        def limit_child():
+            os.sched_setaffinity(0, cpus)
+            if mem_limit:
+                resource.setrlimit(resource.RLIMIT_AS, (mem_limit, mem_limit))
+
+        proc = subprocess.Popen(
+            [sys.executable, str(SAMPLE_PY), "--zoom_url", job.link],
+            cwd=WORK_DIR,
+            preexec_fn=limit_child,
+            start_new_session=True,   # Ctrl-C терминала не должен бить по ботам напрямую
+        )
+        bot = BotProcess(job=job, proc=proc, cpus=cpus)
+        bot.last_cpu_ticks, bot.last_write_bytes = read_proc_usage(proc.pid)
+        self.running[proc.pid] = bot
+        print(f"[supervisor] started bot {job.meeting_id} pid={proc.pid} cpus={cpus}")
+
+    def on_exit(self, bot: BotProcess, code: int):
+        self.free_cpus = sorted(self.free_cpus + bot.cpus)
+        job = bot.job
+        if code == 0 or self.draining:
+            print(f"[supervisor] bot {job.meeting_id} finished (code={code})")
+            return
+        if job.restarts >= self.max_restarts:
+            print(f"[supervisor] bot {job.meeting_id} crashed (code={code}), giving up")
+            return
+        job.restarts += 1
+        job.not_before = time.monotonic() + min(2 ** job.restarts, 60)
+        print(f"[supervisor] bot {job.meeting_id} crashed (code={code}), "
+              f"restart {job.restarts}/{self.max_restarts}")
+        self.queue.appendleft(job)
+
+    def sample_usage(self):
+        now = time.monotonic()
+        for bot in self.running.values():
+            ticks, write_bytes = read_proc_usage(bot.proc.pid)
+            dt = now - bot.last_sample
+            if dt <= 0:
+                continue
+            cpu = (ticks - bot.last_cpu_ticks) / CLK_TCK / dt
+            disk = (write_bytes - bot.last_write_bytes) / (1024 * 1024) / dt
+            bot.cpu_cores += EWMA_ALPHA * (cpu - bot.cpu_cores)
+            bot.disk_mbps += EWMA_ALPHA * (disk - bot.disk_mbps)
+            bot.last_cpu_ticks, bot.last_write_bytes, bot.last_sample = ticks, write_bytes, now
+
+    def reap(self):
+        for pid, bot in list(self.running.items()):
+            code = bot.proc.poll()
+            if code is not None:
+                del self.running[pid]
+                self.on_exit(bot, code)
+
+    def admit(self):
+        now = time.monotonic()
+        for _ in range(len(self.queue)):
+            if not self.can_admit():
+                return
+            job = self.queue.popleft()
+            if job.not_before > now:
+                self.queue.append(job)
+                continue
+            self.spawn(job)
+
+    def on_signal(self, signum, frame):
+        print(f"\n[supervisor] received signal {signum}, draining {len(self.running)} bot(s)")
+        self.draining = True
+        for bot in self.running.values():
+            if bot.proc.poll() is None:
+                bot.proc.send_signal(signal.SIGTERM)
+        self.drain_deadline = time.monotonic() + self.grace_s
+
+    def run(self, interval_s=1.0):
+        signal.signal(signal.SIGINT, self.on_signal)
+        signal.signal(signal.SIGTERM, self.on_signal)
+        while self.running or (self.queue and not self.draining):
+            self.reap()
+            self.sample_usage()
+            self.admit()
+            if self.draining and time.monotonic() > self.drain_deadline:
+                for bot in self.running.values():
+                    print(f"[supervisor] killing bot {bot.job.meeting_id} pid={bot.proc.pid}")
+                    bot.proc.kill()
+            time.sleep(interval_s)
+        print("[supervisor] all bots finished")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Запускает несколько Zoom-ботов на одном хосте и следит за ними")
+    parser.add_argument("--links", default=None,
+                        help="Файл со ссылками на встречи (по одной в строке)")
+    parser.add_argument("--zoom_url", "-z", action="append", default=[],
+                        help="Ссылка на встречу; можно указать несколько раз")
+    parser.add_argument("--cpus_per_bot", type=int, default=1)
+    parser.add_argument("--mem_limit_mb", type=int, default=0,
+                        help="RLIMIT_AS для каждого бота, 0 = без лимита")
+    parser.add_argument("--max_bots", type=int, default=0,
+                        help="0 = ядра хоста / cpus_per_bot")
+    parser.add_argument("--cpu_budget", type=float, default=0.85,
+                        help="Доля CPU хоста, которую могут занять боты")
+    parser.add_argument("--disk_budget_mbps", type=float, default=0.0,
+                        help="Суммарная запись на диск, МБ/с; 0 = не ограничивать")
+    parser.add_argument("--max_restarts", type=int, default=3)
+    parser.add_argument("--grace_s", type=float, default=20.0,
+                        help="Сколько ждать ботов после SIGTERM до SIGKILL")
+    args = parser.parse_args()
+
+    links = list(args.zoom_url)
+    if args.links:
+        links += [l.strip() for l in Path(args.links).read_text().splitlines() if l.strip()]
+    if not links:
+        parser.error("Нужна хотя бы одна ссылка: --links или --zoom_url")
+
+    BotSupervisor(links,
+                  cpus_per_bot=args.cpus_per_bot,
+                  mem_limit_mb=args.mem_limit_mb,
+                  max_bots=args.max_bots,
+                  cpu_budget=args.cpu_budget,
+                  disk_budget_mbps=args.disk_budget_mbps,
+                  max_restarts=args.max_restarts,
+                  grace_s=args.grace_s).run()
+
+
+if __name__ == "__main__":
+    main()
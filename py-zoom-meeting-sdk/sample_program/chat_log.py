@@ -0,0 +1,77 @@
+"""
+Журнал чата встречи: append-only JSONL рядом с per-user WAV.
+
+Сообщение снимается одним вызовом IChatMsgInfo.Snapshot() (dict со всеми
+полями) и кладётся в буфер; на диск буфер уходит пачкой — по размеру или по
+таймеру бота (flush). Поэтому всплеск сообщений на потоке SDK стоит один
+нативный вызов и append в список.
+
+"ts" — локальное время прихода в формате лога бота, как у аудиокадров, так
+что чат ложится на одну шкалу с записью.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+
+TS_FORMAT = "%Y.%m.%d %H:%M:%S.%f"
+CHAT_FILE = "chat.jsonl"
+
+
+class ChatLog:
+    def __init__(self, path, flush_every=256):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.pending: list[dict] = []
+        self.written = 0
+        self._file = None
+
+    def _append(self, record):
+        record["ts"] = datetime.now().strftime(TS_FORMAT)
+        self.pending.append(record)
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def on_message(self, chat_msg_info):
+        record = chat_msg_info.Snapshot()
+        record["event"] = "message"
+        self._append(record)
+
+    def on_edit(self, chat_msg_info):
+        record = chat_msg_info.Snapshot()
+        record["event"] = "edit"
+        self._append(record)
+
+    def on_delete(self, message_id, delete_by):
+        self._append({"event": "delete", "message_id": message_id,
+                      "delete_by": getattr(delete_by, "name", str(delete_by))})
+
+    def flush(self):
+        """Дописывает буфер одной записью; True — чтобы работать таймером GLib."""
+        if self.pending:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self.pending)
+            self._file.write(lines)
+            self._file.flush()
+            self.written += len(self.pending)
+            self.pending.clear()
+        return True
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_chat(path) -> list[dict]:
+    """Записи журнала; недописанная последняя строка (бот упал) пропускается."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return records
@@ -0,0 +1,237 @@
+"""
+Нагрузочный тест живых субтитров: N одновременных потоков через DeepgramTranscriber.
+
+По умолчанию поднимает deepgram_standin.py в отдельном процессе (чтобы сервер
+не делил GIL с клиентами) и гоняет в него аудио в темпе реального времени:
+
+    python deepgram_loadtest.py --streams 32 --seconds 60 --latency_ms 300 --jitter_ms 100
+    python deepgram_loadtest.py --url http://host:8765 --streams 8    # внешний стенд
+
+Меряет:
+  * send: длительность вызова send(), МБ/с и кратность реального времени;
+  * latency: от отправки последнего байта окна до прихода final-результата
+    с этим окном (по start + duration результата), p50/p95/p99;
+  * память: пик RSS процесса и прирост на один поток.
+
+--speed 0 шлёт без пауз — потолок пропускной способности клиента.
+"""
+import argparse
+import bisect
+import json
+import math
+import os
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from deepgram_transcriber import DeepgramTranscriber
+
+HERE = Path(__file__).resolve().parent
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def percentiles(values, qs=(50, 95, 99)) -> dict:
+    if not values:
+        return {f"p{q}": None for q in qs}
+    arr = np.asarray(values)
+    return {f"p{q}": round(float(np.percentile(arr, q)), 2) for q in qs}
+
+
+def synthetic_pcm(seconds, rate) -> bytes:
+    """Тон с шумом — стенду содержимое не важно, но байты «живые»."""
+    t = np.arange(int(seconds * rate)) / rate
+    x = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * np.random.default_rng(0).standard_normal(len(t))
+    return (x * 32767).astype("<i2").tobytes()
+
+
+class StreamStats:
+    def __init__(self, bytes_per_s):
+        self.bytes_per_s = bytes_per_s
+        self.sent_bytes = []          # нарастающий итог после каждого send
+        self.sent_at = []
+        self.send_ms = []
+        self.latency_ms = []
+        self.finals = 0
+        self.final_end_s = 0.0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def on_sent(self, total, t, took):
+        with self.lock:
+            self.sent_bytes.append(total)
+            self.sent_at.append(t)
+        self.send_ms.append(took * 1000)
+
+    def on_transcript(self, result):
+        now = time.perf_counter()
+        if not result.is_final:
+            return
+        end_s = result.start + result.duration
+        needed = math.ceil(end_s * self.bytes_per_s - 1e-6)
+        with self.lock:
+            i = bisect.bisect_left(self.sent_bytes, needed)
+            if i < len(self.sent_at):
+                self.latency_ms.append((now - self.sent_at[i]) * 1000)
+            self.finals += 1
+            self.final_end_s = max(self.final_end_s, end_s)
+
+    def on_error(self, error):
+        self.errors += 1
+
+
+def run_stream(stats, pcm, args, start_barrier):
+    try:
+        transcriber = DeepgramTranscriber(api_key=args.api_key, url=args.url,
+                                          sample_rate=args.rate, interim_results=args.interim,
+                                          on_transcript=stats.on_transcript,
+                                          on_error=stats.on_error)
+    except Exception:
+        start_barrier.abort()                   # остальные потоки не ждут вечно
+        raise
+    chunk = int(args.rate * args.chunk_ms / 1000) * 2
+    pace = args.chunk_ms / 1000 / args.speed if args.speed > 0 else 0.0
+    start_barrier.wait()
+    t0 = time.perf_counter()
+    total = 0
+    for n, pos in enumerate(range(0, len(pcm), chunk)):
+        if pace:
+            delay = t0 + n * pace - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        data = pcm[pos:pos + chunk]
+        before = time.perf_counter()
+        transcriber.send(data)
+        after = time.perf_counter()
+        total += len(data)
+        stats.on_sent(total, after, after - before)
+    # ждём финальные результаты по всему отправленному аудио
+    deadline = time.perf_counter() + args.drain_s
+    audio_s = total / stats.bytes_per_s
+    while stats.final_end_s < audio_s - args.chunk_ms / 1000 and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    transcriber.finish()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_standin(args):
+    port = free_port()
+    cmd = [sys.executable, str(HERE / "deepgram_standin.py"), "--port", str(port),
+           "--latency_ms", str(args.latency_ms), "--jitter_ms", str(args.jitter_ms),
+           "--window_ms", str(args.window_ms)]
+    proc = subprocess.Popen(cmd)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError("Deepgram stand-in exited on startup")
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("Deepgram stand-in did not start in 10 s")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--streams", type=int, default=8)
+    p.add_argument("--seconds", type=float, default=30.0, help="Длительность аудио каждого потока.")
+    p.add_argument("--pcm", default=None, help="Сырой s16le моно вместо синтетического тона.")
+    p.add_argument("--rate", type=int, default=32000, help="sample_rate потока (как у бота).")
+    p.add_argument("--chunk_ms", type=float, default=100.0, help="Аудио на один send().")
+    p.add_argument("--speed", type=float, default=1.0,
+                   help="Кратность реального времени; 0 — без пауз.")
+    p.add_argument("--interim", action="store_true", help="Запрашивать interim_results.")
+    p.add_argument("--url", default=None, help="Готовый стенд/сервис; без него стенд поднимается сам.")
+    p.add_argument("--api_key", default="standin")
+    p.add_argument("--latency_ms", type=float, default=300.0)
+    p.add_argument("--jitter_ms", type=float, default=50.0)
+    p.add_argument("--window_ms", type=float, default=1000.0)
+    p.add_argument("--drain_s", type=float, default=10.0,
+                   help="Сколько ждать последние результаты после отправки.")
+    p.add_argument("--out", default=None, help="Сохранить сводку в JSON.")
+    args = p.parse_args(argv)
+
+    if args.pcm:
+        pcm = Path(args.pcm).read_bytes()[:int(args.seconds * args.rate) * 2]
+    else:
+        pcm = synthetic_pcm(args.seconds, args.rate)
+
+    proc = None
+    if args.url is None:
+        proc, args.url = start_standin(args)
+    try:
+        rss0 = rss_mb()
+        peak = [rss0]
+        stop = threading.Event()
+
+        def sample_rss():
+            while not stop.wait(0.2):
+                peak[0] = max(peak[0], rss_mb())
+
+        threading.Thread(target=sample_rss, daemon=True).start()
+        bytes_per_s = args.rate * 2
+        stats = [StreamStats(bytes_per_s) for _ in range(args.streams)]
+        barrier = threading.Barrier(args.streams + 1)
+        threads = [threading.Thread(target=run_stream, args=(s, pcm, args, barrier))
+                   for s in stats]
+        for t in threads:
+            t.start()
+        barrier.wait()                          # все соединения открыты
+        rss_connected = rss_mb()
+        t0 = time.perf_counter()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+        stop.set()
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    sent = sum(s.sent_bytes[-1] if s.sent_bytes else 0 for s in stats)
+    audio_s = sent / bytes_per_s
+    summary = {
+        "streams": args.streams,
+        "url": args.url,
+        "audio_s_per_stream": round(audio_s / args.streams, 2),
+        "wall_s": round(wall, 2),
+        "send": {
+            "mb_per_s": round(sent / 2**20 / wall, 3),
+            "x_realtime": round(audio_s / wall, 2),
+            "call_ms": percentiles([ms for s in stats for ms in s.send_ms]),
+        },
+        "latency_ms": percentiles([ms for s in stats for ms in s.latency_ms]),
+        "finals": sum(s.finals for s in stats),
+        "errors": sum(s.errors for s in stats),
+        "memory_mb": {
+            "rss_start": round(rss0, 1),
+            "rss_connected": round(rss_connected, 1),
+            "rss_peak": round(max(peak[0], rss_mb()), 1),
+            "per_stream": round((rss_connected - rss0) / args.streams, 2),
+            "max_rss": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+    }
+    print(json.dumps(summary, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(summary, indent=2), "utf-8")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Локальная замена Deepgram live: websocket /v1/listen без сети и ключа.
+
+Принимает linear16 и отвечает синтетическими событиями Results — столько,
+сколько нужно DeepgramTranscriber и нагрузочному тесту:
+
+  * final-результат на каждые --window_ms аудио (и interim каждые
+    --interim_ms, если клиент просил interim_results=true);
+  * start/duration результата — в секундах аудио потока, поэтому клиент
+    по start + duration сопоставляет ответ с моментом отправки байтов;
+  * ответ задерживается на --latency_ms ± --jitter_ms, порядок внутри
+    потока сохраняется, как у настоящего сервиса;
+  * KeepAlive игнорируется, Finalize дописывает хвост, CloseStream —
+    хвост + Metadata и закрытие.
+
+    python deepgram_standin.py --port 8765 --latency_ms 300 --jitter_ms 100
+    DEEPGRAM_URL=http://127.0.0.1:8765 python meeting_bot.py ...
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import websockets
+
+MODEL_INFO = {"name": "standin", "version": "0", "arch": "synthetic"}
+MODEL_UUID = "00000000-0000-0000-0000-000000000000"
+WORDS_PER_S = 2.5
+
+
+def results_message(request_id, start, duration, index, is_final, speech_final=False,
+                    from_finalize=False):
+    n = max(1, round(duration * WORDS_PER_S))
+    step = duration / n
+    words = [{"word": f"w{index}_{i}", "punctuated_word": f"w{index}_{i}",
+              "start": round(start + i * step, 3), "end": round(start + (i + 1) * step, 3),
+              "confidence": 0.99} for i in range(n)]
+    return {
+        "type": "Results",
+        "channel_index": [0, 1],
+        "duration": round(duration, 3),
+        "start": round(start, 3),
+        "is_final": is_final,
+        "speech_final": speech_final,
+        "from_finalize": from_finalize,
+        "channel": {"alternatives": [{
+            "transcript": " ".join(w["word"] for w in words),
+            "confidence": 0.99,
+            "words": words,
+        }]},
+        "metadata": {"request_id": request_id, "model_info": MODEL_INFO,
+                     "model_uuid": MODEL_UUID},
+    }
+
+
+def metadata_message(request_id, duration, channels, sha):
+    return {
+        "type": "Metadata",
+        "transaction_key": "deprecated",
+        "request_id": request_id,
+        "sha256": sha,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "duration": round(duration, 3),
+        "channels": channels,
+        "models": [MODEL_UUID],
+        "model_info": {MODEL_UUID: MODEL_INFO},
+    }
+
+
+def _request_info(ws):
+    """Путь и заголовки запроса — и для нового, и для legacy API websockets."""
+    request = getattr(ws, "request", None)
+    if request is not None:
+        return request.path, request.headers
+    return ws.path, ws.request_headers
+
+
+class StandinStream:
+    def __init__(self, ws, params, args):
+        self.ws = ws
+        self.args = args
+        self.request_id = str(uuid.uuid4())
+        self.rate = int(params.get("sample_rate", ["16000"])[0])
+        self.channels = int(params.get("channels", ["1"])[0])
+        self.interim = params.get("interim_results", ["false"])[0] == "true"
+        self.bytes_per_s = self.rate * 2 * self.channels
+        self.received = 0                     # байт аудио
+        self.final_end = 0.0                  # секунд аудио, закрытых final-результатами
+        self.interim_end = 0.0
+        self.index = 0
+        self.sha = hashlib.sha256()
+        self.outbox = asyncio.Queue()
+        self.last_due = 0.0
+
+    @property
+    def audio_s(self):
+        return self.received / self.bytes_per_s
+
+    def schedule(self, message):
+        loop = asyncio.get_running_loop()
+        delay = self.args.latency_ms + random.uniform(-self.args.jitter_ms, self.args.jitter_ms)
+        due = max(loop.time() + max(delay, 0) / 1000, self.last_due)
+        self.last_due = due
+        self.outbox.put_nowait((due, message))
+
+    def on_audio(self, data):
+        self.received += len(data)
+        self.sha.update(data)
+        window = self.args.window_ms / 1000
+        while self.audio_s - self.final_end >= window:
+            self.emit_final(window)
+        interim = self.args.interim_ms / 1000
+        while self.interim and self.audio_s - self.interim_end >= interim:
+            self.interim_end += interim
+            if self.interim_end - self.final_end > 1e-6:
+                self.schedule(results_message(self.request_id, self.final_end,
+                                              self.interim_end - self.final_end,
+                                              self.index, is_final=False))
+
+    def emit_final(self, duration, from_finalize=False):
+        self.schedule(results_message(self.request_id, self.final_end, duration, self.index,
+                                      is_final=True, speech_final=True,
+                                      from_finalize=from_finalize))
+        self.final_end += duration
+        self.interim_end = max(self.interim_end, self.final_end)
+        self.index += 1
+
+    def flush(self, from_finalize=False):
+        tail = self.audio_s - self.final_end
+        if tail > 1e-6:
+            self.emit_final(tail, from_finalize)
+
+    async def sender(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            due, message = await self.outbox.get()
+            if message is None:
+                return
+            await asyncio.sleep(max(0.0, due - loop.time()))
+            await self.ws.send(json.dumps(message))
+
+
+async def handle(ws, args):
+    path, headers = _request_info(ws)
+    url = urlsplit(path)
+    if not url.path.rstrip("/").endswith("/listen"):
+        await ws.close(1008, f"unknown path {url.path}")
+        return
+    if args.api_key and headers.get("Authorization") != f"Token {args.api_key}":
+        await ws.close(1008, "unauthorized")
+        return
+    params = parse_qs(url.query)
+    encoding = params.get("encoding", ["linear16"])[0]
+    if encoding != "linear16":
+        await ws.close(1008, f"unsupported encoding {encoding}")
+        return
+
+    stream = StandinStream(ws, params, args)
+    sender = asyncio.create_task(stream.sender())
+    try:
+        async for message in ws:
+            if isinstance(message, bytes):
+                stream.on_audio(message)
+                continue
+            kind = json.loads(message).get("type")
+            if kind == "Finalize":
+                stream.flush(from_finalize=True)
+            elif kind == "CloseStream":
+                stream.flush()
+                stream.schedule(metadata_message(stream.request_id, stream.audio_s,
+                                                 stream.channels, stream.sha.hexdigest()))
+                break
+            # KeepAlive и прочее — без ответа
+        stream.outbox.put_nowait((0.0, None))
+        await sender
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        sender.cancel()
+    await ws.close()
+
+
+async def serve(args):
+    async with websockets.serve(lambda ws, *rest: handle(ws, args), args.host, args.port,
+                                max_size=None):
+        print(f"→ Deepgram stand-in on ws://{args.host}:{args.port}/v1/listen "
+              f"(latency {args.latency_ms}±{args.jitter_ms} ms)", flush=True)
+        await asyncio.Future()
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--latency_ms", type=float, default=300.0,
+                   help="Задержка ответа относительно прихода аудио.")
+    p.add_argument("--jitter_ms", type=float, default=0.0,
+                   help="Равномерный разброс задержки ±jitter.")
+    p.add_argument("--window_ms", type=float, default=1000.0,
+                   help="Сколько аудио закрывает один final-результат.")
+    p.add_argument("--interim_ms", type=float, default=250.0,
+                   help="Шаг interim-результатов (если клиент их запросил).")
+    p.add_argument("--api_key", default=None,
+                   help="Если задан, требовать заголовок 'Authorization: Token <key>'.")
+    p.add_argument("--seed", type=int, default=None)
+    args = p.parse_args(argv)
+    random.seed(args.seed)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
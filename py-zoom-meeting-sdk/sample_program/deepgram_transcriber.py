@@ -11,45 +11,65 @@ from deepgram import (
 
 import asyncio
 
+
+def print_transcript(result):
+    sentence = result.channel.alternatives[0].transcript
+    if len(sentence) == 0:
+        return
+    print(f"Transcription: {sentence}")
+
+
+def print_error(error):
+    print(f"Error: {error}")
+
+
 class DeepgramTranscriber:
-    def __init__(self):
+    """
+    Живые субтитры через websocket Deepgram.
+
+    url/api_key по умолчанию берутся из DEEPGRAM_URL / DEEPGRAM_API_KEY; для
+    локального стенда (deepgram_standin.py) url="http://127.0.0.1:8765".
+    on_transcript(result) и on_error(error) вызываются из потока SDK.
+    """
+
+    def __init__(self, api_key=None, url=None, sample_rate=32000, language='en-GB',
+                 model="nova-2-conversationalai", interim_results=True,
+                 on_transcript=print_transcript, on_error=print_error):
         # Configure the DeepgramClientOptions to enable KeepAlive for maintaining the WebSocket connection (only if necessary to your scenario)
+        url = url or os.environ.get('DEEPGRAM_URL')
         config = DeepgramClientOptions(
-            options={"keepalive": "true"}
+            options={"keepalive": "true"},
+            **({"url": url} if url else {}),
         )
 
         # Create a websocket connection using the DEEPGRAM_API_KEY from environment variables
-        self.deepgram = DeepgramClient(os.environ.get('DEEPGRAM_API_KEY'), config)
+        self.deepgram = DeepgramClient(api_key or os.environ.get('DEEPGRAM_API_KEY'), config)
 
         # Use the listen.live class to create the websocket connection
-        self.dg_connection = self.deepgram.listen.websocket.v("1") 
+        self.dg_connection = self.deepgram.listen.websocket.v("1")
+        self.sample_rate = sample_rate
 
-        def on_message(self, result, **kwargs):
-            #print("got")
-            #print(result)
-            #print(result.channel.alternatives[0])
-            sentence = result.channel.alternatives[0].transcript
-            if len(sentence) == 0:
-                return
-            print(f"Transcription: {sentence}")
+        def on_message(connection, result, **kwargs):
+            on_transcript(result)
 
         self.dg_connection.on(LiveTranscriptionEvents.Transcript, on_message)
 
-        def on_error(self, error, **kwargs):
-            print(f"Error: {error}")
+        def on_dg_error(connection, error, **kwargs):
+            on_error(error)
 
-        self.dg_connection.on(LiveTranscriptionEvents.Error, on_error)
+        self.dg_connection.on(LiveTranscriptionEvents.Error, on_dg_error)
 
         options = LiveOptions(
-            model="nova-2-conversationalai",
+            model=model,
             punctuate=True,
-            interim_results=True,
-            language='en-GB',
+            interim_results=interim_results,
+            language=language,
             encoding= "linear16",
-            sample_rate=32000
+            sample_rate=sample_rate
             )
 
-        self.dg_connection.start(options)
+        if self.dg_connection.start(options) is False:
+            raise ConnectionError(f"Deepgram websocket did not start ({url or 'api.deepgram.com'})")
 
     def send(self, data):
         self.dg_connection.send(data)
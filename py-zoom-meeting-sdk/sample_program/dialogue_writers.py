@@ -0,0 +1,148 @@
+# dialogue_writers.py
+"""
+Инкрементальная запись диалога: каждая реплика пишется сразу,
+как только её выдал конвейер multi_track, без накопления всего списка.
+
+Форматы: txt (как раньше dialogue.txt), json, srt, vtt.
+"""
+import datetime
+import json
+from pathlib import Path
+
+
+def dialogue_line(s) -> str:
+    spk = s.get("speaker", "Speaker")
+    abs_start = s.get("abs_start", "HH:MM:SS")
+    return f"[{abs_start}] {spk}: {s['text'].strip()}"
+
+
+def _abs_end(s):
+    return s["abs_start"] + datetime.timedelta(seconds=s["end"] - s["start"])
+
+
+def _clock(delta: datetime.timedelta, sep: str) -> str:
+    ms = max(int(delta.total_seconds() * 1000), 0)
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    sec, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{sec:02d}{sep}{ms:03d}"
+
+
+class TextWriter:
+    suffix = ".txt"
+
+    def __init__(self, path, origin=None):
+        self.f = open(path, "w", encoding="utf-8")
+
+    def write(self, s):
+        self.f.write(dialogue_line(s) + "\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class JsonWriter:
+    """JSON-массив, который дописывается по одному элементу."""
+    suffix = ".json"
+
+    def __init__(self, path, origin=None):
+        self.f = open(path, "w", encoding="utf-8")
+        self.f.write("[\n")
+        self.first = True
+
+    def write(self, s):
+        # s — dict или SegmentView: поля берутся по ключам, json.dumps(s) не годится
+        rec = {
+            "speaker":   s.get("speaker"),
+            "abs_start": s["abs_start"].isoformat(),
+            "abs_end":   _abs_end(s).isoformat(),
+            "start":     s["start"],
+            "end":       s["end"],
+            "text":      s["text"].strip(),
+            "words":     s.get("words", []),
+        }
+        if not self.first:
+            self.f.write(",\n")
+        self.f.write(json.dumps(rec, ensure_ascii=False))
+        self.f.flush()
+        self.first = False
+
+    def close(self):
+        self.f.write("\n]\n")
+        self.f.close()
+
+
+class SrtWriter:
+    suffix = ".srt"
+    sep = ","
+
+    def __init__(self, path, origin=None):
+        self.f = open(path, "w", encoding="utf-8")
+        self.origin = origin
+        self.n = 0
+        self.header()
+
+    def header(self):
+        pass
+
+    def cue_id(self):
+        return f"{self.n}\n"
+
+    def write(self, s):
+        if self.origin is None:
+            self.origin = s["abs_start"]
+        self.n += 1
+        start = _clock(s["abs_start"] - self.origin, self.sep)
+        end = _clock(_abs_end(s) - self.origin, self.sep)
+        spk = s.get("speaker", "Speaker")
+        self.f.write(f"{self.cue_id()}{start} --> {end}\n{spk}: {s['text'].strip()}\n\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class VttWriter(SrtWriter):
+    suffix = ".vtt"
+    sep = "."
+
+    def header(self):
+        self.f.write("WEBVTT\n\n")
+
+    def cue_id(self):
+        return ""
+
+
+WRITERS = {"txt": TextWriter, "json": JsonWriter, "srt": SrtWriter, "vtt": VttWriter}
+DIALOGUE_STEM = "dialogue"
+
+
+def output_names(stem=DIALOGUE_STEM) -> set[str]:
+    """Имена файлов, которые DialogueWriters может создать в папке встречи."""
+    return {f"{stem}{w.suffix}" for w in WRITERS.values()}
+
+
+class DialogueWriters:
+    """
+    Пишет одну и ту же реплику сразу во все запрошенные форматы. Реплика — dict
+    или Mapping (SegmentView из segment_table): писатели читают её по ключам.
+    """
+
+    def __init__(self, folder, formats=("txt",), origin=None, stem=DIALOGUE_STEM):
+        self.paths = [Path(folder) / f"{stem}{WRITERS[fmt].suffix}" for fmt in formats]
+        self.writers = [WRITERS[fmt](path, origin) for fmt, path in zip(formats, self.paths)]
+
+    def write(self, s):
+        for w in self.writers:
+            w.write(s)
+
+    def close(self):
+        for w in self.writers:
+            w.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
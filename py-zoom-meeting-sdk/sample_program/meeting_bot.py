@@ -3,14 +3,12 @@ import sys
 import pathlib
 from datetime import datetime, timedelta
 import json
-import requests
+import time
 
-import wave
 import zoom_meeting_sdk as zoom
-import jwt
-from deepgram_transcriber import DeepgramTranscriber
-import cv2
-import numpy as np
+import startup_profile
+from wav_writer import open_track
+from token_cache import http_session, token_cache
 import gi
 gi.require_version('GLib', '2.0')
 from gi.repository import GLib
@@ -18,8 +16,15 @@ from gi.repository import GLib
 
 from typing import Final
 
+# cv2 / numpy / jwt / deepgram импортируются лениво, внутри функций:
+# бот должен дойти до SDKAuth как можно быстрее, а эти подсистемы нужны позже или вообще не нужны.
+startup_profile.mark("meeting_bot imported")
+
 TOKEN_URL:   Final = "https://zoom.us/oauth/token"
 USER_TOKEN:  Final = "https://api.zoom.us/v2/users/{user_id}/token"
+ZAK_URL:     Final = "https://api.zoom.us/v2/users/me/token?type=zak"
+ZAK_TTL_S:   Final = 2 * 3600          # ZAK по умолчанию живёт 2 ч
+JWT_TTL:     Final = timedelta(hours=24)
 
 meeting_event_log = []
 
@@ -27,24 +32,31 @@ class ZoomAuthError(RuntimeError):
     """Любое отклонение Zoom OAuth."""
 
 def _s2s_access_token(account_id: str, client_id: str, client_secret: str) -> str:
-    """Шаг 1 — access_token из Server-to-Server OAuth (TTL ≈ 1 ч)."""
-    resp = requests.post(
-        TOKEN_URL,
-        data={
-            "grant_type":  "account_credentials",
-            "account_id":  account_id.strip(),
-        },
-        auth=(client_id.strip(), client_secret.strip()),
-        timeout=10,
-    )
-    if resp.status_code != 200:
-        raise ZoomAuthError(
-            f"S2S OAuth failed {resp.status_code}: {resp.text.strip()}"
+    """Шаг 1 — access_token из Server-to-Server OAuth (TTL ≈ 1 ч), общий для ботов хоста."""
+    def fetch():
+        resp = http_session().post(
+            TOKEN_URL,
+            data={
+                "grant_type":  "account_credentials",
+                "account_id":  account_id.strip(),
+            },
+            auth=(client_id.strip(), client_secret.strip()),
+            timeout=10,
         )
-    return resp.json()["access_token"]
+        if resp.status_code != 200:
+            raise ZoomAuthError(
+                f"S2S OAuth failed {resp.status_code}: {resp.text.strip()}"
+            )
+        body = resp.json()
+        return body["access_token"], time.time() + body.get("expires_in", 3600)
+
+    key = token_cache().key("s2s", account_id.strip(), client_id.strip())
+    return token_cache().get(key, fetch)
 
 
 def save_yuv420_frame_as_png(frame_bytes, width, height, output_path):
+    import cv2
+    import numpy as np
     try:
         # Convert bytes to numpy array
         yuv_data = np.frombuffer(frame_bytes, dtype=np.uint8)
@@ -62,37 +74,40 @@ def save_yuv420_frame_as_png(frame_bytes, width, height, output_path):
 
 
 def generate_jwt(client_id, client_secret):
-    iat = datetime.utcnow()
-    exp = iat + timedelta(hours=24)
+    """SDK JWT на 24 ч — подписывается один раз и переиспользуется всеми ботами хоста."""
+    def fetch():
+        import jwt
+        iat = datetime.utcnow()
+        exp = iat + JWT_TTL
+
+        payload = {
+            "iat": iat,
+            "exp": exp,
+            "appKey": client_id,
+            "tokenExp": int(exp.timestamp())
+        }
 
-    payload = {
-        "iat": iat,
-        "exp": exp,
-        "appKey": client_id,
-        "tokenExp": int(exp.timestamp())
-    }
+        token = jwt.encode(payload, client_secret, algorithm="HS256")
+        return token, time.time() + JWT_TTL.total_seconds()
 
-    token = jwt.encode(payload, client_secret, algorithm="HS256")
-    return token
+    return token_cache().get(token_cache().key("jwt", client_id, client_secret), fetch)
 
 
 def get_zak(client_id, client_secret, account_id):
 
-    # 1. S2S OAuth access token
-    resp = requests.post(
-        "https://zoom.us/oauth/token",
-        data = {"grant_type":"account_credentials",
-                "account_id": account_id},
-        auth = (client_id, client_secret))
-    resp.raise_for_status()
-    access_token = resp.json()["access_token"]
-
-    # 2. ZAK for the bot-user (self)
-    zak = requests.get(
-        "https://api.zoom.us/v2/users/me/token?type=zak",
-        headers={"Authorization": f"Bearer {access_token}"}).json()["token"]
-    
-    return zak
+    def fetch():
+        # 1. S2S OAuth access token (из общего кэша)
+        access_token = _s2s_access_token(account_id, client_id, client_secret)
+
+        # 2. ZAK for the bot-user (self)
+        resp = http_session().get(
+            ZAK_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+            timeout=10)
+        resp.raise_for_status()
+        return resp.json()["token"], time.time() + ZAK_TTL_S
+
+    return token_cache().get(token_cache().key("zak", account_id, client_id), fetch)
 
 
 
@@ -127,6 +142,8 @@ def normalized_rms_audio(pcm_data: bytes, sample_width: int = 2) -> bool:
 
 
 def create_red_yuv420_frame(width=640, height=360):
+    import cv2
+    import numpy as np
     # Create BGR frame (red is [0,0,255] in BGR)
     bgr_frame = np.zeros((height, width, 3), dtype=np.uint8)
     bgr_frame[:, :] = [0, 0, 255]  # Pure red in BGR
@@ -163,7 +180,21 @@ class MeetingBot:
         self.audio_settings = None
 
         self.use_audio_recording = True
+        # кадры копятся в нативном буфере, Python будится через eventfd пачками
+        self.use_buffered_audio = os.environ.get('BUFFERED_AUDIO', 'true') == 'true'
+        self.audio_buffer_watch_id = None
+        # формат треков: в буферном режиме кадры ресэмплируются нативно ещё до Python
+        # (16 кГц — частота Whisper, transcribe_zoom тогда не ресэмплирует)
+        if self.use_buffered_audio:
+            self.track_sample_rate = int(os.environ.get('CAPTURE_SAMPLE_RATE', '16000'))
+            self.track_sample_format = os.environ.get('CAPTURE_SAMPLE_FORMAT', 's16')
+        else:
+            self.track_sample_rate = 32000
+            self.track_sample_format = 's16'
         self.use_video_recording = os.environ.get('RECORD_VIDEO') == 'true'
+        # кадры участников дублируются в кольцо в общей памяти для внешних процессов
+        self.use_audio_fanout = os.environ.get('AUDIO_FANOUT') == 'true'
+        self.audio_fanout = None
 
         self.reminder_controller = None
 
@@ -173,17 +204,23 @@ class MeetingBot:
         self.audio_raw_data_sender = None
         self.virtual_audio_mic_event_passthrough = None
 
-        self.deepgram_transcriber = DeepgramTranscriber()
+        # живые субтитры открывают websocket к Deepgram — только если включены
+        self.use_live_transcription = os.environ.get('LIVE_TRANSCRIPTION') == 'true'
+        self.deepgram_transcriber = None
 
         self.my_participant_id = None
         self.other_participant_id = None
         self.participants_ctrl = None
+        self.roster = None
         self.meeting_reminder_event = None
         self.audio_print_counter = 0
 
         self.video_helper = None
         self.renderer_delegate = None
         self.video_frame_counter = 0
+        self.video_scheduler = None
+        self.video_scheduler_timer = None
+        self.video_snapshot_every = int(os.environ.get('VIDEO_SNAPSHOT_EVERY', '150'))
 
         self.meeting_video_controller = None
         self.video_sender = None
@@ -194,6 +231,10 @@ class MeetingBot:
         self.meeting_share_ctrl_event = None
 
         self.share_helper = None
+        # демонстрация экрана пишется как слайды: только изменившиеся кадры
+        self.use_share_recording = os.environ.get('RECORD_SHARE') == 'true'
+        self.share_capture = None
+        self.share_renderer = None
         self.share_video_renderer_delegate = None
         self.share_audio_renderer_delegate = None
         self.share_video_sender = None
@@ -201,12 +242,36 @@ class MeetingBot:
 
         self.chat_ctrl = None
         self.chat_ctrl_event = None
+        self.chat_log = None                             # chat.jsonl рядом с per-user WAV
+        self.chat_log_timer = None
 
-        self.mix_wav: wave.Wave_write | None = None      # общий файл
-        self.user_wavs: dict[int, wave.Wave_write] = {}  # per-user
+        self.mix_wav = None                              # общий файл
+        self.user_wavs: dict[int, object] = {}           # per-user (wav_writer.open_track)
+        # когда шёл звук каждого per-user WAV — прогонами, вместо события на каждый кадр
+        self.speech_intervals = None
+        self.speech_intervals_timer = None
+        self.log_audio_frames = os.environ.get('LOG_AUDIO_FRAMES') == 'true'
 
 
     def cleanup(self):
+        self.flush_audio_buffer()
+        self.stop_share_capture()
+
+        if self.video_scheduler:
+            GLib.source_remove(self.video_scheduler_timer)
+            self.video_scheduler.close()
+            self.video_scheduler = None
+
+        if self.chat_log:
+            GLib.source_remove(self.chat_log_timer)
+            self.chat_log.close()
+            self.chat_log = None
+
+        if self.speech_intervals:
+            GLib.source_remove(self.speech_intervals_timer)
+            self.speech_intervals.close()
+            self.speech_intervals = None
+
         if self.meeting_service:
             zoom.DestroyMeetingService(self.meeting_service)
             print("Destroyed Meeting service")
@@ -233,6 +298,10 @@ class MeetingBot:
             wav.close()
         self.user_wavs.clear()
 
+        if self.audio_fanout:
+            self.audio_fanout.close()
+            self.audio_fanout = None
+
         print("CleanUPSDK() called")
         zoom.CleanUPSDK()
         print("CleanUPSDK() finished")
@@ -259,11 +328,27 @@ class MeetingBot:
         init_sdk_result = zoom.InitSDK(init_param)
         if init_sdk_result != zoom.SDKERR_SUCCESS:
             raise Exception('InitSDK failed')
+        startup_profile.mark("InitSDK done")
         self.create_services()
 
 
     def on_user_join_callback(self, joined_user_ids, user_name):
         print("on_user_join_callback called. joined_user_ids =", joined_user_ids, "user_name =", user_name)
+        if self.roster:
+            self.roster.on_user_join(joined_user_ids)
+
+
+    def on_user_left_callback(self, left_user_ids, user_name):
+        print("on_user_left_callback called. left_user_ids =", left_user_ids)
+        if self.roster:
+            self.roster.on_user_left(left_user_ids)
+        if self.video_scheduler:
+            self.video_scheduler.on_user_left(left_user_ids)
+
+
+    def on_user_names_changed_callback(self, user_ids):
+        if self.roster:
+            self.roster.on_user_names_changed(user_ids)
 
 
     def on_sharing_status_callback(self, share_info):
@@ -276,6 +361,39 @@ class MeetingBot:
             f"isShowingInFirstView = {share_info.isShowingInFirstView} ",
             f"isShowingInSecondView = {share_info.isShowingInSecondView} ",
         )
+        if not self.use_share_recording:
+            return
+        if share_info.status in (zoom.Sharing_Other_Share_Begin, zoom.Sharing_View_Other_Sharing):
+            self.start_share_capture(share_info)
+        elif share_info.status == zoom.Sharing_Other_Share_End:
+            self.stop_share_capture()
+
+
+    def start_share_capture(self, share_info):
+        if self.share_renderer is not None:
+            self.stop_share_capture()
+        from share_capture import ShareCapture
+
+        self.share_capture = ShareCapture(
+            f"sample_program/out/share/{self.meeting_name}", save_yuv420_frame_as_png,
+            frame_pool=zoom.VideoFramePool(4))
+        user_id = share_info.userid
+        self.share_video_renderer_delegate = zoom.ZoomSDKRendererDelegateCallbacks(
+            onRawDataFrameReceivedCallback=lambda data: self.share_capture.on_frame(data, user_id))
+        self.share_renderer = zoom.createRenderer(self.share_video_renderer_delegate)
+        self.share_renderer.setRawDataResolution(zoom.ZoomSDKResolution_720P)
+        result = self.share_renderer.subscribe(share_info.shareSourceID, zoom.RAW_DATA_TYPE_SHARE)
+        print("share renderer subscribe result =", result)
+
+
+    def stop_share_capture(self):
+        if self.share_renderer is not None:
+            self.share_renderer.unSubscribe()
+            zoom.destroyRenderer(self.share_renderer)
+            self.share_renderer = None
+        if self.share_capture is not None:
+            self.share_capture.close()
+            self.share_capture = None
 
 
     def on_failed_to_start_share_callback(self):
@@ -317,27 +435,30 @@ class MeetingBot:
         )
 
 
-    # NOTE: content will always be None use chat_msg_info.GetContent() instead
+    # NOTE: content will always be None, the text is in the snapshot ("content")
     def on_chat_msg_notification_callback(self, chat_msg_info, content):
-        print("\n=== on_chat_msg_notification called ===")
-        print(f"Message ID: {chat_msg_info.GetMessageID()}")
-        print(f"Sender ID: {chat_msg_info.GetSenderUserId()}")
-        print(f"Sender Name: {chat_msg_info.GetSenderDisplayName()}")
-        print(f"Receiver ID: {chat_msg_info.GetReceiverUserId()}")
-        print(f"Receiver Name: {chat_msg_info.GetReceiverDisplayName()}")
-        print(f"Content: {chat_msg_info.GetContent()}")
-        print(f"Timestamp: {chat_msg_info.GetTimeStamp()}")
-        print(f"Message Type: {chat_msg_info.GetChatMessageType()}")
-        print(f"Is Chat To All: {chat_msg_info.IsChatToAll()}")
-        print(f"Is Chat To All Panelist: {chat_msg_info.IsChatToAllPanelist()}")
-        print(f"Is Chat To Waitingroom: {chat_msg_info.IsChatToWaitingroom()}")
-        print(f"Is Comment: {chat_msg_info.IsComment()}")
-        print(f"Is Thread: {chat_msg_info.IsThread()}")
-        print(f"Thread ID: {chat_msg_info.GetThreadID()}")
-        print("=====================\n")
+        if self.chat_log:
+            self.chat_log.on_message(chat_msg_info)
+
+    def on_chat_msg_edit_callback(self, chat_msg_info):
+        if self.chat_log:
+            self.chat_log.on_edit(chat_msg_info)
+
+    def on_chat_msg_delete_callback(self, message_id, delete_by):
+        if self.chat_log:
+            self.chat_log.on_delete(message_id, delete_by)
+
+
+    def start_live_transcription(self):
+        if not self.use_live_transcription or self.deepgram_transcriber is not None:
+            return
+        from deepgram_transcriber import DeepgramTranscriber
+        self.deepgram_transcriber = DeepgramTranscriber()
 
 
     def on_join(self):
+        self.start_live_transcription()
+
         self.meeting_reminder_event = zoom.MeetingReminderEventCallbacks(onReminderNotifyCallback=self.on_reminder_notify)
         self.reminder_controller = self.meeting_service.GetMeetingReminderController()
         self.reminder_controller.SetEvent(self.meeting_reminder_event)
@@ -358,10 +479,19 @@ class MeetingBot:
             GLib.timeout_add_seconds(1, self.start_raw_recording)
 
         self.participants_ctrl = self.meeting_service.GetMeetingParticipantsController()
-        self.participants_ctrl_event = zoom.MeetingParticipantsCtrlEventCallbacks(onUserJoinCallback=self.on_user_join_callback)
+        self.participants_ctrl_event = zoom.MeetingParticipantsCtrlEventCallbacks(
+            onUserJoinCallback=self.on_user_join_callback,
+            onUserLeftCallback=self.on_user_left_callback,
+            onUserNamesChangedCallback=self.on_user_names_changed_callback)
         self.participants_ctrl.SetEvent(self.participants_ctrl_event)
         self.my_participant_id = self.participants_ctrl.GetMySelfUser().GetUserID()
 
+        # имена участников сохраняются вместе с записью (roster.json рядом с per-user WAV)
+        from roster import ROSTER_FILE, RosterCache
+        self.roster = RosterCache(self.participants_ctrl,
+                                  path=f"sample_program/out/audio/{self.meeting_name}/{ROSTER_FILE}")
+        self.roster.refresh()
+
         participant_ids_list = self.participants_ctrl.GetParticipantsList()
         print("participant_ids_list", participant_ids_list)
         for participant_id in participant_ids_list:
@@ -370,6 +500,9 @@ class MeetingBot:
                 break
         print("other_participant_id", self.other_participant_id)
 
+        if self.use_video_recording:
+            self.start_video_scheduler()
+
         self.meeting_sharing_controller = self.meeting_service.GetMeetingShareController()
         self.meeting_share_ctrl_event = zoom.MeetingShareCtrlEventCallbacks(
             onSharingStatusCallback=self.on_sharing_status_callback,
@@ -395,8 +528,16 @@ class MeetingBot:
         # See here for more details: https://devforum.zoom.us/t/cant-record-audio-with-linux-meetingsdk-after-6-3-5-6495-error-code-32/130689/5
         self.audio_ctrl.JoinVoip()
         
+        # сообщения чата — снимком в буфер, на диск пачками по таймеру
+        from chat_log import CHAT_FILE, ChatLog
+        self.chat_log = ChatLog(f"sample_program/out/audio/{self.meeting_name}/{CHAT_FILE}")
+        self.chat_log_timer = GLib.timeout_add_seconds(2, self.chat_log.flush)
+
         self.chat_ctrl = self.meeting_service.GetMeetingChatController()
-        self.chat_ctrl_event = zoom.MeetingChatEventCallbacks(onChatMsgNotificationCallback=self.on_chat_msg_notification_callback)
+        self.chat_ctrl_event = zoom.MeetingChatEventCallbacks(
+            onChatMsgNotificationCallback=self.on_chat_msg_notification_callback,
+            onChatMsgDeleteNotificationCallback=self.on_chat_msg_delete_callback,
+            onChatMessageEditNotificationCallback=self.on_chat_msg_edit_callback)
         self.chat_ctrl.SetEvent(self.chat_ctrl_event)
 
         # Send a welcome message to the chat
@@ -417,6 +558,35 @@ class MeetingBot:
             "event": "on_user_active_audio_change_callback",
             "ts": datetime.now().strftime("%Y.%m.%d %H:%M:%S.%f")
         })
+        if self.video_scheduler:
+            self.video_scheduler.on_active_speakers(user_ids)
+
+
+    def start_video_scheduler(self):
+        """Видео пишем только для текущих и недавних говорящих (см. video_scheduler)."""
+        from video_scheduler import VideoScheduler
+
+        def is_video_on(user_id):
+            user = self.participants_ctrl.GetUserByUserID(user_id)
+            return user is not None and user.IsVideoOn()
+
+        self.video_scheduler = VideoScheduler(
+            self.on_video_frame,
+            my_user_id=self.my_participant_id,
+            is_video_on=is_video_on,
+            cpu_budget=float(os.environ.get('VIDEO_CPU_BUDGET', '0.5')))
+        self.video_scheduler_timer = GLib.timeout_add_seconds(2, self.video_scheduler.tick)
+
+
+    def on_video_frame(self, user_id, data):
+        self.video_frame_counter += 1
+        if self.video_frame_counter % self.video_snapshot_every:
+            return
+        out_dir = pathlib.Path(f"sample_program/out/video/{self.meeting_name}")
+        out_dir.mkdir(parents=True, exist_ok=True)
+        ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
+        save_yuv420_frame_as_png(data.GetBuffer(), data.GetStreamWidth(), data.GetStreamHeight(),
+                                 str(out_dir / f"user_{user_id}_{ts}.png"))
 
 
     def on_user_audio_status_change_callback(self, user_audio_statuses, otherstuff):
@@ -449,13 +619,42 @@ class MeetingBot:
 
 
     def on_one_way_audio_raw_data_received_callback(self, data, node_id):
-        meeting_event_log.append({
-            "event": "on_one_way_audio_raw_data_received_callback",
-            "node_id": str(node_id),
-            "ts": datetime.now().strftime("%Y.%m.%d %H:%M:%S.%f")
-        })
+        buf = data.GetBuffer()
+        if self.audio_fanout:
+            self.audio_fanout.publish(node_id, buf)
+        self.write_one_way_audio(buf, node_id, time.time_ns() // 1000)
+
+
+    def on_audio_buffer_ready(self, fd, condition):
+        """GLib io-watch на eventfd делегата: забираем всю накопленную пачку кадров."""
+        for frame in self.audio_source.drainOneWayAudio():
+            data = frame.data
+            if self.audio_fanout:
+                self.audio_fanout.publish(frame.userId, data, frame.wallClockMicroseconds)
+            self.write_one_way_audio(data, frame.userId, frame.wallClockMicroseconds)
+        return True
+
+
+    def flush_audio_buffer(self):
+        if self.audio_buffer_watch_id is not None:
+            GLib.source_remove(self.audio_buffer_watch_id)
+            self.audio_buffer_watch_id = None
+            # хвост ресемплеров (задержка фильтра) — последним кадром до закрытия WAV
+            self.audio_source.flushOneWayAudio()
+            self.on_audio_buffer_ready(None, None)
+            dropped = self.audio_source.getDroppedFrameCount()
+            if dropped:
+                print(f"audio buffer dropped {dropped} frames")
+
+
+    def write_one_way_audio(self, buf, node_id, wall_us):
+        if self.log_audio_frames:                        # старый формат: событие на кадр
+            meeting_event_log.append({
+                "event": "on_one_way_audio_raw_data_received_callback",
+                "node_id": str(node_id),
+                "ts": datetime.fromtimestamp(wall_us / 1e6).strftime("%Y.%m.%d %H:%M:%S.%f")
+            })
 
-        buf = data.GetBuffer()  # bytes
         # 3-a. общий микс
         if self.mix_wav:
             self.mix_wav.writeframes(buf)
@@ -463,16 +662,16 @@ class MeetingBot:
         # 3-b. per-user файлы (опционно)
         if node_id not in self.user_wavs:
             out_dir = pathlib.Path(f"sample_program/out/audio/{self.meeting_name}")
-            if not out_dir.exists():
-                out_dir.mkdir()
+            out_dir.mkdir(parents=True, exist_ok=True)
             ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             wav_path = out_dir / f"user_{node_id}_{ts}.wav"
-            wav = wave.open(str(wav_path), "wb")
-            wav.setnchannels(1)
-            wav.setsampwidth(2)
-            wav.setframerate(32000)
-            self.user_wavs[node_id] = wav
+            self.user_wavs[node_id] = open_track(wav_path, self.track_sample_rate,
+                                                 self.track_sample_format)
+            if self.speech_intervals:
+                self.speech_intervals.open_track(node_id, wav_path.name)
         self.user_wavs[node_id].writeframes(buf)
+        if self.speech_intervals:
+            self.speech_intervals.on_frame(node_id, len(buf), wall_us)
 
 
     # def on_share_audio_start_send_callback(self, sender):
@@ -537,13 +736,30 @@ class MeetingBot:
         meeting_event_log.append({
             "event": "start_raw_recording",
             "wav_path": str(wav_path),
+            "sample_rate": self.track_sample_rate,
+            "sample_format": self.track_sample_format,
             "ts": datetime.now().strftime("%Y.%m.%d %H:%M:%S.%f")
         })
-        self.mix_wav = wave.open(str(wav_path), "wb")     # ВАЖНО: именно wave.open, не Path
-        # self.mix_wav = wave.open(out_dir / f"meeting_{ts}.wav", "wb")
-        self.mix_wav.setnchannels(1)       # mono
-        self.mix_wav.setsampwidth(2)       # 16-bit PCM
-        self.mix_wav.setframerate(32000)   # Zoom SDK default:contentReference[oaicite:0]{index=0}
+        self.mix_wav = open_track(wav_path, self.track_sample_rate, self.track_sample_format)
+
+        if self.speech_intervals is None:
+            from speech_intervals import INTERVALS_FILE, SpeechIntervalRecorder
+            self.speech_intervals = SpeechIntervalRecorder(
+                f"sample_program/out/audio/{self.meeting_name}/{INTERVALS_FILE}",
+                self.track_sample_rate, self.track_sample_format)
+            self.speech_intervals_timer = GLib.timeout_add_seconds(2, self.speech_intervals.flush)
+
+        if self.use_audio_fanout and self.audio_fanout is None:
+            from audio_fanout import AudioFanoutPublisher
+            self.audio_fanout = AudioFanoutPublisher(f"zoom_audio_{self.meeting_name}",
+                                                     sample_rate=self.track_sample_rate,
+                                                     sample_format=self.track_sample_format)
+            print("audio fan-out:", self.audio_fanout.name)
+            meeting_event_log.append({
+                "event": "audio_fanout_started",
+                "shm_name": self.audio_fanout.name,
+                "ts": datetime.now().strftime("%Y.%m.%d %H:%M:%S.%f")
+            })
 
         self.audio_helper = zoom.GetAudioRawdataHelper()
         if self.audio_helper is None:
@@ -551,7 +767,18 @@ class MeetingBot:
             return
         
         if self.audio_source is None:
-            self.audio_source = zoom.ZoomSDKAudioRawDataDelegateCallbacks(onOneWayAudioRawDataReceivedCallback=self.on_one_way_audio_raw_data_received_callback, collectPerformanceData=True)
+            if self.use_buffered_audio:
+                self.audio_source = zoom.ZoomSDKAudioRawDataDelegateCallbacks(
+                    collectPerformanceData=True, bufferOneWayAudio=True,
+                    captureSampleRate=self.track_sample_rate,
+                    captureSampleFormat=self.track_sample_format)
+            else:
+                self.audio_source = zoom.ZoomSDKAudioRawDataDelegateCallbacks(onOneWayAudioRawDataReceivedCallback=self.on_one_way_audio_raw_data_received_callback, collectPerformanceData=True)
+
+        if self.use_buffered_audio and self.audio_buffer_watch_id is None:
+            self.audio_buffer_watch_id = GLib.io_add_watch(
+                self.audio_source.getNotificationFd(), GLib.PRIORITY_DEFAULT,
+                GLib.IOCondition.IN, self.on_audio_buffer_ready)
 
         audio_helper_subscribe_result = self.audio_helper.subscribe(self.audio_source, False)
         print("audio_helper_subscribe_result =",audio_helper_subscribe_result)
@@ -562,6 +789,8 @@ class MeetingBot:
 
 
     def stop_raw_recording(self):
+        self.flush_audio_buffer()
+
         if self.mix_wav:
             self.mix_wav.close()
             self.mix_wav = None
@@ -569,6 +798,8 @@ class MeetingBot:
         for wav in self.user_wavs.values():
             wav.close()
         self.user_wavs.clear()
+        if self.speech_intervals:
+            self.speech_intervals.flush()
 
         rec_ctrl = self.meeting_service.StopRawRecording()
         if rec_ctrl.StopRawRecording() != zoom.SDKERR_SUCCESS:
@@ -673,6 +904,8 @@ class MeetingBot:
         auth_context = zoom.AuthContext()
         auth_context.jwt_token = generate_jwt(os.environ.get('ZOOM_APP_CLIENT_ID'), os.environ.get('ZOOM_APP_CLIENT_SECRET'))
         result = self.auth_service.SDKAuth(auth_context)
+        startup_profile.mark("SDKAuth called")
+        startup_profile.report()
 
         if result == zoom.SDKError.SDKERR_SUCCESS:
             print("Authentication successful")
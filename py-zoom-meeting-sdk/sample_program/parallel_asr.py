@@ -0,0 +1,151 @@
+# parallel_asr.py
+"""
+Параллельный ASR одного длинного трека по кускам в пуле процессов.
+
+  1. трек режется по паузам (Silero-VAD, split_at_silences из диаризации) на
+     куски ~chunk_s, каждый кусок расширяется на overlap_s в обе стороны —
+     контекст, чтобы слово у разреза не обрывалось;
+  2. куски транскрибируются в N процессах, в каждом своя WhisperModel на
+     cpu_threads потоков (workers × cpu_threads ≈ ядра — как подбирает --autotune);
+  3. тайм-коды сегментов и слов сдвигаются на начало куска; слово принадлежит
+     куску, в «свою» часть которого попадает его середина, — перекрытия только
+     контекст и в результат не дублируются; на стыке ещё отбрасывается повтор
+     последнего слова предыдущего куска.
+
+Сегменты отдаются по порядку по мере готовности кусков, формат — как у
+transcribe() (локальное время трека), так что split/merge multi_track не меняются.
+"""
+import collections
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from audio_io import ASR_RATE, load_audio
+from parallel_diarization import split_at_silences
+from whisper_segments import segment_to_dict
+
+_model = None                   # по одному экземпляру модели на процесс пула
+
+
+def _init_worker(name, device, compute_type, cpu_threads):
+    global _model
+    from faster_whisper import WhisperModel
+
+    _model = WhisperModel(name, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(samples: np.ndarray, options: dict) -> dict:
+    """Сегменты куска во времени от его начала."""
+    segments, info = _model.transcribe(samples, **options)
+    return {"language": info.language, "segments": [segment_to_dict(seg) for seg in segments]}
+
+
+def _norm(text: str) -> str:
+    return re.sub(r"[^\w]+", "", text.lower())
+
+
+def own_segments(segments, shift, own_start, own_end):
+    """
+    Сегменты куска в абсолютном времени трека, только «своя» часть:
+    слова — по середине слова, сегменты без слов — по середине сегмента.
+    """
+    out = []
+    for seg in segments:
+        words = [dict(w, start=w["start"] + shift, end=w["end"] + shift) for w in seg["words"]]
+        if words:
+            kept = [w for w in words if own_start <= (w["start"] + w["end"]) / 2 < own_end]
+            if not kept:
+                continue
+            if len(kept) < len(words):
+                out.append({"start": kept[0]["start"], "end": kept[-1]["end"],
+                            "text": "".join(w["text"] for w in kept), "words": kept})
+                continue
+        elif not own_start <= (seg["start"] + seg["end"]) / 2 + shift < own_end:
+            continue
+        out.append({"start": seg["start"] + shift, "end": seg["end"] + shift,
+                    "text": seg["text"], "words": words})
+    return out
+
+
+def drop_repeat(segments, last_word):
+    """Убирает в начале куска повтор последнего слова предыдущего (тот же текст внахлёст)."""
+    if not segments or last_word is None or not segments[0]["words"]:
+        return segments
+    first = segments[0]["words"][0]
+    if _norm(first["text"]) != _norm(last_word["text"]) or first["start"] >= last_word["end"]:
+        return segments
+    rest = segments[0]["words"][1:]
+    if not rest:
+        return segments[1:]
+    head = {"start": rest[0]["start"], "end": segments[0]["end"],
+            "text": "".join(w["text"] for w in rest), "words": rest}
+    return [head] + segments[1:]
+
+
+class ParallelTranscriber:
+    """
+    Пул процессов с моделями Whisper; живёт весь прогон, так что в multi_track
+    модели грузятся один раз на все треки.
+    """
+
+    def __init__(self, name, device="cpu", compute_type="float32", workers=2, cpu_threads=0,
+                 chunk_s=120.0, overlap_s=2.0):
+        self.workers = workers
+        self.chunk_s = chunk_s
+        self.overlap_s = overlap_s
+        cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+        print(f"→ parallel ASR: {workers} workers × {cpu_threads} threads, chunks of ~{chunk_s:.0f}s")
+        self._pool = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                         initargs=(name, device, compute_type, cpu_threads))
+
+    def transcribe(self, audio, options: dict, meta: dict | None = None):
+        """
+        audio — float32 16 кГц или путь; сегменты отдаются по порядку.
+        meta (если передан) получает "language" — преобладающий по длительности кусков.
+        """
+        if meta is None:
+            meta = {}
+        if isinstance(audio, (str, os.PathLike)):
+            audio = load_audio(audio)
+        owned = split_at_silences(audio, self.chunk_s)
+        pad = int(self.overlap_s * ASR_RATE)
+        windows = [(max(s - pad, 0), min(e + pad, len(audio))) for s, e in owned]
+        print(f"→ parallel ASR: {len(windows)} chunks")
+
+        # в полёте не больше 2 × workers кусков: память не растёт с длиной трека,
+        # а пул не простаивает, пока отдаются готовые сегменты
+        pending = collections.deque()
+        languages = collections.Counter()
+        last_word, seg_id = None, 0
+        ahead = 2 * self.workers
+        next_chunk = 0
+        for w in range(len(windows)):
+            while next_chunk < len(windows) and len(pending) < ahead:
+                s, e = windows[next_chunk]
+                pending.append(self._pool.submit(_transcribe_chunk, audio[s:e].copy(), options))
+                next_chunk += 1
+            result = pending.popleft().result()
+            # крайние куски владеют всем, что модель нашла до начала / после конца
+            own_start = owned[w][0] / ASR_RATE if w > 0 else float("-inf")
+            own_end = owned[w][1] / ASR_RATE if w < len(windows) - 1 else float("inf")
+            segments = own_segments(result["segments"], windows[w][0] / ASR_RATE, own_start, own_end)
+            segments = drop_repeat(segments, last_word)
+            languages[result["language"]] += owned[w][1] - owned[w][0]
+            for seg in segments:
+                seg["id"] = seg_id
+                seg_id += 1
+                if seg["words"]:
+                    last_word = seg["words"][-1]
+                yield seg
+        meta["language"] = languages.most_common(1)[0][0] if languages else None
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
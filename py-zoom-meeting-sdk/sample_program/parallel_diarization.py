@@ -0,0 +1,149 @@
+# parallel_diarization.py
+"""
+Диаризация длинного общего трека по окнам в пуле процессов.
+
+  1. трек режется по паузам (Silero-VAD из faster-whisper) на окна ~window_s,
+     каждое окно расширяется на overlap_s в обе стороны — контекст для модели;
+  2. окна параллельно проходят pyannote (сегментация + эмбеддинги спикеров),
+     результат окна — сегменты с локальными метками и центроид каждой метки;
+  3. результаты кэшируются на диске по хэшу сэмплов окна: повторный прогон
+     (в т.ч. с другим порогом кластеризации) модель не запускает;
+  4. глобальная кластеризация центроидов (cosine, average linkage) связывает
+     локальные метки окон в сквозных спикеров.
+
+Возвращает DataFrame (start, end, speaker) — как whisperx.DiarizationPipeline,
+его можно сразу отдать в whisperx.assign_word_speakers.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from asr_cache import ASRCache
+from audio_io import ASR_RATE, load_audio
+from batched_asr import speech_islands
+
+DIAR_MODEL = "pyannote/speaker-diarization-3.1"
+VAD_PARAMETERS = {"min_silence_duration_ms": 300, "speech_pad_ms": 100}
+
+_pipeline = None                # по одному экземпляру модели на процесс пула
+
+
+def _init_worker(hf_token, device, threads):
+    global _pipeline
+    import torch
+    from pyannote.audio import Pipeline
+
+    torch.set_num_threads(threads)
+    _pipeline = Pipeline.from_pretrained(DIAR_MODEL, use_auth_token=hf_token)
+    _pipeline.to(torch.device(device))
+
+
+def _diarize_window(samples: np.ndarray) -> dict:
+    """Сегменты окна с локальными метками и центроиды эмбеддингов этих меток."""
+    import torch
+
+    waveform = torch.from_numpy(samples).unsqueeze(0)
+    annotation, embeddings = _pipeline({"waveform": waveform, "sample_rate": ASR_RATE},
+                                       return_embeddings=True)
+    labels = annotation.labels()
+    segments = [{"start": turn.start, "end": turn.end, "label": label}
+                for turn, _, label in annotation.itertracks(yield_label=True)]
+    return {
+        "segments": segments,
+        "labels": labels,
+        "embeddings": [[float(v) for v in embeddings[i]] for i in range(len(labels))],
+    }
+
+
+def split_at_silences(audio: np.ndarray, window_s: float):
+    """Границы окон [(start, end)] в сэмплах; разрезы — в середине пауз."""
+    target = int(window_s * ASR_RATE)
+    if len(audio) <= target:
+        return [(0, len(audio))]
+    islands = speech_islands(audio, VAD_PARAMETERS)
+    gaps = [(a_end + b_start) // 2
+            for (_, a_end), (b_start, _) in zip(islands, islands[1:])]
+    cuts, start = [], 0
+    for gap in gaps:
+        if gap - start >= target:
+            cuts.append(gap)
+            start = gap
+    bounds = [0] + cuts + [len(audio)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _window_key(samples: np.ndarray) -> str:
+    h = hashlib.sha256(samples.tobytes())
+    h.update(json.dumps({"model": DIAR_MODEL, "rate": ASR_RATE}).encode())
+    return h.hexdigest()
+
+
+def cluster_speakers(embeddings: np.ndarray, threshold: float) -> np.ndarray:
+    """Номер глобального спикера для каждого локального центроида."""
+    if len(embeddings) < 2:
+        return np.zeros(len(embeddings), dtype=int)
+    from scipy.cluster.hierarchy import fcluster, linkage
+
+    normed = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-9)
+    tree = linkage(normed, method="average", metric="cosine")
+    return fcluster(tree, t=threshold, criterion="distance") - 1
+
+
+def parallel_diarize(audio_path, hf_token=None, device="cpu", workers=None,
+                     window_s=300.0, overlap_s=15.0, threshold=0.7, cache: ASRCache | None = None):
+    import pandas as pd
+
+    audio = load_audio(audio_path)
+    owned = split_at_silences(audio, window_s)
+    pad = int(overlap_s * ASR_RATE)
+    windows = [(max(s - pad, 0), min(e + pad, len(audio))) for s, e in owned]
+    print(f"→ diarization: {len(windows)} windows of ~{window_s:.0f}s")
+
+    cache = cache.namespace("diarization", model=DIAR_MODEL) if cache else None
+    results = [None] * len(windows)
+    keys = [_window_key(audio[s:e]) for s, e in windows]
+    todo = []
+    for i, key in enumerate(keys):
+        results[i] = cache.get(key) if cache else None
+        if results[i] is None:
+            todo.append(i)
+    print(f"→ diarization: {len(windows) - len(todo)} windows from cache")
+
+    if todo:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(hf_token, device, threads)) as pool:
+            chunks = [audio[windows[i][0]:windows[i][1]].copy() for i in todo]
+            for i, result in zip(todo, pool.map(_diarize_window, chunks)):
+                results[i] = result
+                if cache:
+                    cache.put(keys[i], result)
+
+    # центроиды всех окон → глобальные спикеры
+    centroids, owners = [], []
+    for w, result in enumerate(results):
+        for label, emb in zip(result["labels"], result["embeddings"]):
+            if np.all(np.isfinite(emb)):
+                centroids.append(emb)
+                owners.append((w, label))
+    clusters = cluster_speakers(np.asarray(centroids, dtype=np.float32), threshold)
+    speaker_of = {owner: f"SPEAKER_{c:02d}" for owner, c in zip(owners, clusters)}
+
+    # сегмент окна берём только в «своей» части окна, перекрытия — лишь контекст
+    rows = []
+    for w, result in enumerate(results):
+        offset = windows[w][0] / ASR_RATE
+        own_start, own_end = owned[w][0] / ASR_RATE, owned[w][1] / ASR_RATE
+        for seg in result["segments"]:
+            speaker = speaker_of.get((w, seg["label"]))
+            start = max(seg["start"] + offset, own_start)
+            end = min(seg["end"] + offset, own_end)
+            if speaker is not None and end > start:
+                rows.append({"start": start, "end": end, "speaker": speaker})
+    rows.sort(key=lambda r: r["start"])
+    print(f"→ diarization: {len(set(speaker_of.values()))} speakers")
+    return pd.DataFrame(rows, columns=["start", "end", "speaker"])
@@ -0,0 +1,124 @@
+"""
+Кэш списка участников: id → имя, роль, состояние аудио/видео.
+
+Полный список берётся одним вызовом GetParticipantsRoster() (колонки, без
+GetUserByUserID на каждого), дальше кэш обновляется по событиям join/left/
+name-changed — запрашиваются только затронутые участники. Вышедшие остаются
+в кэше с отметкой left: их имена нужны для расшифровки.
+
+Кэш сохраняется в roster.json рядом с per-user WAV, transcribe_zoom берёт
+оттуда имена спикеров (load_speaker_labels).
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+TS_FORMAT = "%Y.%m.%d %H:%M:%S.%f"
+ROSTER_FILE = "roster.json"
+
+
+def _now():
+    return datetime.now().strftime(TS_FORMAT)
+
+
+class RosterCache:
+    def __init__(self, participants_ctrl, path=None):
+        self.ctrl = participants_ctrl
+        self.path = Path(path) if path else None
+        self.participants: dict[int, dict] = {}
+
+    def refresh(self):
+        """Полная синхронизация одним вызовом в нативный код."""
+        r = self.ctrl.GetParticipantsRoster()
+        now = _now()
+        present = set()
+        for i, user_id in enumerate(r.userId):
+            present.add(user_id)
+            entry = self.participants.setdefault(user_id, {"joined": now, "left": None})
+            entry.update({
+                "name": r.userName[i],
+                "persistent_id": r.persistentId[i],
+                "role": r.role[i],
+                "is_host": r.isHost[i],
+                "is_myself": r.isMySelf[i],
+                "audio_muted": r.isAudioMuted[i],
+                "video_on": r.isVideoOn[i],
+                "phone": r.isPurePhoneUser[i],
+                "left": None,
+            })
+        for user_id, entry in self.participants.items():
+            if user_id not in present and entry["left"] is None:
+                entry["left"] = now
+        self.save()
+
+    def _update_user(self, user_id):
+        user = self.ctrl.GetUserByUserID(user_id)
+        if user is None:
+            return
+        entry = self.participants.setdefault(user_id, {"joined": _now(), "left": None})
+        entry.update({
+            "name": user.GetUserName(),
+            "persistent_id": user.GetPersistentId(),
+            "role": int(user.GetUserRole()),
+            "is_host": user.IsHost(),
+            "is_myself": user.IsMySelf(),
+            "audio_muted": user.IsAudioMuted(),
+            "video_on": user.IsVideoOn(),
+            "phone": user.IsPurePhoneUser(),
+            "left": None,
+        })
+
+    # ---------- события участников ----------
+
+    def on_user_join(self, user_ids, user_name=None):
+        for user_id in user_ids:
+            self._update_user(user_id)
+        self.save()
+
+    def on_user_left(self, user_ids, user_name=None):
+        now = _now()
+        for user_id in user_ids:
+            if user_id in self.participants:
+                self.participants[user_id]["left"] = now
+        self.save()
+
+    def on_user_names_changed(self, user_ids):
+        for user_id in user_ids:
+            self._update_user(user_id)
+        self.save()
+
+    def name(self, user_id) -> str | None:
+        entry = self.participants.get(user_id)
+        return entry.get("name") if entry else None
+
+    # ---------- сохранение ----------
+
+    def save(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"updated": _now(),
+                       "participants": {str(u): e for u, e in self.participants.items()}},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+def load_speaker_labels(folder) -> dict[str, str]:
+    """
+    {node_id: ярлык} из roster.json папки встречи; {} если файла нет.
+    Одинаковые имена разводятся добавлением id.
+    """
+    path = Path(folder) / ROSTER_FILE
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        participants = json.load(f).get("participants", {})
+    names = {node: (e.get("name") or "").strip() for node, e in participants.items()}
+    counts = {}
+    for name in names.values():
+        counts[name] = counts.get(name, 0) + 1
+    return {node: (name if counts[name] == 1 else f"{name} ({node})")
+            for node, name in names.items() if name}
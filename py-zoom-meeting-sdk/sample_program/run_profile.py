@@ -0,0 +1,199 @@
+"""
+Профиль прогона transcribe_zoom по стадиям: wall, CPU, пик RSS и объём работы.
+
+    import run_profile as prof
+    prof.enable()
+    with prof.stage("model_load"):
+        ...
+    for seg in prof.timed(asr_stream, "asr", track=node):    # генераторы конвейера
+        ...
+    prof.add(prof.INPUT_STAGE, track=node, audio_s=12.5)     # для RTF всего прогона
+    prof.write("dialogue_folder/profile.json", meta={...})
+
+Конвейер multi_track потоковый: ASR, split, merge и запись чередуются через
+генераторы. Время каждой стадии поэтому «исключающее» — время вложенных
+стадий (например, ASR внутри next() у split) вычитается из родительской.
+
+Память стадии: текущий RSS (/proc/self/statm) на входе и выходе. peak_rss_mb —
+максимум этих замеров, а если за время стадии вырос пик процесса (ru_maxrss),
+то он: новый пик процесса мог быть достигнут только внутри неё. rss_delta_mb —
+суммарный прирост RSS за все вызовы стадии.
+"""
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+INPUT_STAGE = "input"             # add(INPUT_STAGE, track, audio_s=...) — длительность входа
+
+_enabled = False
+_stats: dict[tuple, dict] = {}
+_stack: list[list] = []          # [key, wall0, cpu0, child_wall, child_cpu, rss0, maxrss0]
+_started = None
+
+
+def enable():
+    global _enabled, _started
+    _enabled = True
+    _started = (time.perf_counter(), time.process_time(), datetime.now())
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _peak_rss_mb() -> float:
+    """Пик RSS процесса за всё время."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux: КБ
+
+
+def _rss_mb() -> float:
+    """Текущий RSS."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _entry(key):
+    entry = _stats.get(key)
+    if entry is None:
+        entry = _stats[key] = {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0,
+                               "peak_rss_mb": 0.0, "rss_delta_mb": 0.0, "items": {}}
+    return entry
+
+
+def _enter(key):
+    _stack.append([key, time.perf_counter(), time.process_time(), 0.0, 0.0,
+                   _rss_mb(), _peak_rss_mb()])
+
+
+def _exit():
+    key, wall0, cpu0, child_wall, child_cpu, rss0, maxrss0 = _stack.pop()
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+    rss, maxrss = _rss_mb(), _peak_rss_mb()
+    peak = max(rss0, rss, maxrss if maxrss > maxrss0 else 0.0)
+    entry = _entry(key)
+    entry["wall_s"] += wall - child_wall
+    entry["cpu_s"] += cpu - child_cpu
+    entry["calls"] += 1
+    entry["peak_rss_mb"] = max(entry["peak_rss_mb"], peak)
+    entry["rss_delta_mb"] += rss - rss0
+    if _stack:
+        _stack[-1][3] += wall
+        _stack[-1][4] += cpu
+
+
+@contextmanager
+def stage(name, track=None, **items):
+    if not _enabled:
+        yield
+        return
+    _enter((name, track))
+    try:
+        yield
+    finally:
+        _exit()
+        add(name, track, **items)
+
+
+def timed(iterable, name, track=None, count="items"):
+    """Обёртка генератора: время внутри next() и число выданных элементов."""
+    if not _enabled:
+        yield from iterable
+        return
+    it = iter(iterable)
+    while True:
+        _enter((name, track))
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        finally:
+            _exit()
+        add(name, track, **{count: 1})
+        yield item
+
+
+def add(name, track=None, **items):
+    if not _enabled or not items:
+        return
+    counters = _entry((name, track))["items"]
+    for k, v in items.items():
+        counters[k] = counters.get(k, 0) + v
+
+
+def report(meta=None) -> dict:
+    wall0, cpu0, started = _started
+    wall = time.perf_counter() - wall0
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    stages = []
+    for (name, track), e in _stats.items():
+        row = {"stage": name, "track": track, **e,
+               "wall_s": round(e["wall_s"], 4), "cpu_s": round(e["cpu_s"], 4),
+               "peak_rss_mb": round(e["peak_rss_mb"], 1), "rss_delta_mb": round(e["rss_delta_mb"], 1)}
+        audio_s = e["items"].get("audio_s")
+        if audio_s and e["calls"]:
+            row["rtf"] = round(e["wall_s"] / audio_s, 4)     # < 1 — быстрее реального времени
+        stages.append(row)
+
+    audio_total = sum(e["items"].get("audio_s", 0) for (name, _), e in _stats.items()
+                      if name == INPUT_STAGE)
+    by_stage = {}
+    for row in stages:
+        s = by_stage.setdefault(row["stage"], {"wall_s": 0.0, "cpu_s": 0.0})
+        s["wall_s"] = round(s["wall_s"] + row["wall_s"], 4)
+        s["cpu_s"] = round(s["cpu_s"] + row["cpu_s"], 4)
+    return {
+        "meta": {"started": started.isoformat(), "argv": sys.argv, **(meta or {})},
+        "total": {
+            "wall_s": round(wall, 4),
+            "cpu_s": round(time.process_time() - cpu0, 4),
+            "children_cpu_s": round(children.ru_utime + children.ru_stime, 4),
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "audio_s": round(audio_total, 3),
+            "rtf": round(wall / audio_total, 4) if audio_total else None,
+        },
+        "by_stage": by_stage,
+        "stages": stages,
+    }
+
+
+def write(path, meta=None):
+    if not _enabled:
+        return
+    data = report(meta)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"✓ profile saved to {path} (wall {data['total']['wall_s']:.1f}s, "
+          f"RTF {data['total']['rtf']})")
+
+
+@contextmanager
+def profiler(kind, out_stem):
+    """Необязательный профилировщик всего прогона: cprofile → .prof, pyinstrument → .html."""
+    if kind == "cprofile":
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(f"{out_stem}.prof")
+            print(f"✓ cProfile stats saved to {out_stem}.prof")
+    elif kind == "pyinstrument":
+        from pyinstrument import Profiler
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            with open(f"{out_stem}.html", "w", encoding="utf-8") as f:
+                f.write(prof.output_html())
+            print(f"✓ pyinstrument report saved to {out_stem}.html")
+    else:
+        yield
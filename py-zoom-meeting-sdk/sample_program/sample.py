@@ -1,50 +1,15 @@
 import os
 import signal
 import argparse
-from typing import Optional, Tuple
-from urllib.parse import urlparse, parse_qs
 from dotenv import load_dotenv
+import startup_profile
+from zoom_link import parse_zoom_link
 import gi
 gi.require_version('GLib', '2.0')
 from gi.repository import GLib
 
 load_dotenv()
-
-def parse_zoom_link(url: str) -> Tuple[Optional[str], Optional[str]]:
-    """
-    Извлекает ID конференции Zoom и секрет (pwd) из переданной ссылки.
-
-    Параметры
-    ----------
-    url : str
-        Ссылка вида https://…zoom.us/j/<MEETING_ID>?pwd=<SECRET>
-
-    Возвращает
-    ----------
-    Tuple[str | None, str | None]
-        (meeting_id, secret).  Если что-то не найдено, на этом месте будет None.
-    """
-    parsed = urlparse(url)
-
-    # ---------- ID конференции ----------
-    meeting_id = None
-    # Преобразуем путь '/j/83053648874' → ['j', '83053648874']
-    parts = [p for p in parsed.path.split('/') if p]
-    if 'j' in parts:                           # классический формат /j/<ID>
-        j_idx = parts.index('j')
-        if len(parts) > j_idx + 1:
-            meeting_id = parts[j_idx + 1]
-    elif parts and parts[0].isdigit():         # reserve: /<ID> без /j/
-        meeting_id = parts[0]
-
-    # ---------- Секрет (pwd) ----------
-    query = parse_qs(parsed.query)
-    secret = query.get('pwd', [None])[0]       # в большинстве случаев
-    # иногда встречается ?passcode=…
-    if secret is None:
-        secret = query.get('passcode', [None])[0]
-
-    return meeting_id, secret
+startup_profile.mark("sample imports done")
 
 
 class ZoomBotRunner:
@@ -55,7 +20,7 @@ class ZoomBotRunner:
         self.meeting_id = meeting_id
         self.secret = secret
 
-    def exit_process(self):
+    def exit_process(self, exit_code=0):
         """Clean shutdown of the bot and main loop"""
         print("Starting cleanup process...")
 
@@ -70,17 +35,17 @@ class ZoomBotRunner:
                 self.bot.leave()
                 print("Cleaning up bot...")
                 self.bot.cleanup()
-                self.force_exit()
+                self.force_exit(exit_code)
 
         except Exception as e:
             print(f"Error during cleanup: {e}")
-            self.force_exit()
+            self.force_exit(1)
         return False
 
-    def force_exit(self):
-        """Force the process to exit"""
+    def force_exit(self, exit_code=0):
+        """Force the process to exit (non-zero code lets a supervisor restart the bot)"""
         print("Forcing exit...")
-        os._exit(0)  # Use os._exit() to force immediate termination
+        os._exit(exit_code)  # Use os._exit() to force immediate termination
         return False
 
     def on_signal(self, signum, frame):
@@ -92,11 +57,10 @@ class ZoomBotRunner:
         else:
             self.exit_process()
 
-    def on_timeout(self):
-        """Regular timeout callback"""
-        if self.shutdown_requested:
-            return False
-        return True
+    def on_unix_signal(self, signum):
+        """SIGINT/SIGTERM delivered through the GLib main loop (no polling needed)"""
+        self.on_signal(signum, None)
+        return GLib.SOURCE_CONTINUE
 
     def run(self):
         """Main run method"""
@@ -104,17 +68,20 @@ class ZoomBotRunner:
         os.environ['MEETING_PWD'] = self.secret.strip()
         from meeting_bot import MeetingBot
         self.bot = MeetingBot(self.meeting_id, self.secret)
+        startup_profile.mark("MeetingBot constructed")
         try:
             self.bot.init()
         except Exception as e:
             print(e)
-            self.exit_process()
+            self.exit_process(1)
 
         # Create a GLib main loop
         self.main_loop = GLib.MainLoop()
 
-        # Add a timeout function that will be called every 100ms
-        GLib.timeout_add(100, self.on_timeout)
+        # Signals wake the main loop directly; audio arrives via the delegate's eventfd
+        # watch (see MeetingBot.start_raw_recording), so nothing has to poll.
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            GLib.unix_signal_add(GLib.PRIORITY_HIGH, signum, self.on_unix_signal, signum)
 
         try:
             print("Starting main event loop")
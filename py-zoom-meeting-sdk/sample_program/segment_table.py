@@ -0,0 +1,394 @@
+"""
+Колоночное хранение сегментов ASR и слов для длинных встреч.
+
+Вместо списка dict на сегмент и dict на слово — NumPy-колонки:
+
+  слова:     w_start, w_end (float64) + текст одним блобом со смещениями;
+  реплики:   start, end, speaker (код), seg_id, abs_start (мкс), диапазон
+             слов [w0, w1) и диапазон «кусков» текста [p0, p1);
+  куски:     текст реплики до склейки — исходный текст сегмента или
+             (после split) слова [w0, w1) подряд, т.е. срез блоба.
+
+Слова одной реплики идут в блобе подряд, поэтому её текст/слова — срез, без
+копий. split по паузам лога и abs_start считаются векторно; склейка реплик
+одного спикера (merge) зависит от головы группы, поэтому идёт скалярным
+проходом по плоским спискам float без dict.
+
+Для совместимости с DialogueWriters строки отдаются ленивыми view (Mapping
+с ключами start/end/text/words/speaker/abs_start[/id]); dict слов строятся
+только при обращении к "words". View — не dict и не сериализуется json.dumps:
+наружу (JSON, кэш, другой процесс) строки отдаются через dict(view) или
+SegmentTable.to_dicts().
+
+Семантика совпадает с split_segment_by_log / abs_time /
+iter_merge_consecutive_speaker_segments из transcribe_zoom.
+"""
+import datetime
+from collections.abc import Mapping
+
+import numpy as np
+
+from speech_intervals import SpeechIntervals
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class TextColumn:
+    """Строки одним блобом: i-я строка — blob[offsets[i]:offsets[i + 1]]."""
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, blob: str, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_list(cls, texts):
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in texts], out=offsets[1:])
+        return cls("".join(texts), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i) -> str:
+        return self.blob[self.offsets[i]:self.offsets[i + 1]]
+
+    def join(self, i0, i1) -> str:
+        """Строки [i0, i1) подряд — это просто срез блоба."""
+        return self.blob[self.offsets[i0]:self.offsets[i1]]
+
+    @property
+    def nbytes(self):
+        return len(self.blob.encode("utf-8")) + self.offsets.nbytes
+
+    @staticmethod
+    def concat(columns):
+        blob = "".join(c.blob for c in columns)
+        parts, base = [np.zeros(1, dtype=np.int64)], 0
+        for c in columns:
+            parts.append(c.offsets[1:] + base)
+            base += c.offsets[-1]
+        return TextColumn(blob, np.concatenate(parts))
+
+
+def _ranges(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Склеенные arange(lo[i], hi[i]) без цикла Python."""
+    lengths = hi - lo
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.repeat(lo - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return starts + np.arange(total, dtype=np.int64)
+
+
+def to_us(ts_list) -> np.ndarray:
+    """list[datetime] лога бота → int64 микросекунд."""
+    return np.asarray(ts_list, dtype="datetime64[us]").astype(np.int64)
+
+
+def log_gaps(ts_us: np.ndarray, gap_ms) -> np.ndarray:
+    """Как find_log_gaps: индексы кадров, перед которыми пауза ≥ gap_ms."""
+    return np.flatnonzero(np.diff(ts_us) >= gap_ms * 1000) + 1
+
+
+class SegmentView(Mapping):
+    """
+    Ленивый dict-вид одной реплики. Не dict: для json.dumps / pickle — dict(view)
+    (abs_start остаётся datetime, как в dict-пути transcribe_zoom).
+    """
+    __slots__ = ("_t", "_i")
+
+    def __init__(self, table, i):
+        self._t = table
+        self._i = i
+
+    def _keys(self):
+        keys = ["start", "end", "text", "words", "speaker"]
+        if self._t.seg_id[self._i] >= 0:
+            keys.append("id")
+        if self._t.has_abs_start:
+            keys.append("abs_start")
+        return keys
+
+    def __getitem__(self, key):
+        t, i = self._t, self._i
+        if key == "start":
+            return float(t.start[i])
+        if key == "end":
+            return float(t.end[i])
+        if key == "text":
+            return t.text(i)
+        if key == "words":
+            return t.words(i)
+        if key == "speaker":
+            return t.speakers[t.speaker[i]]
+        if key == "id" and t.seg_id[i] >= 0:
+            return int(t.seg_id[i])
+        if key == "abs_start" and t.has_abs_start:
+            return EPOCH + datetime.timedelta(microseconds=int(t.abs_start[i]))
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+
+class SegmentTable:
+    ROW_COLUMNS = ("start", "end", "speaker", "seg_id", "abs_start", "w0", "w1", "p0", "p1")
+
+    def __init__(self, *, w_start, w_end, w_text, seg_text, piece_src, piece_w0, piece_w1,
+                 speakers, start, end, speaker, seg_id, abs_start, w0, w1, p0, p1,
+                 has_abs_start=False):
+        # слова
+        self.w_start, self.w_end, self.w_text = w_start, w_end, w_text
+        # куски текста: piece_src >= 0 — индекс в seg_text, -1 — слова [piece_w0, piece_w1)
+        self.seg_text = seg_text
+        self.piece_src, self.piece_w0, self.piece_w1 = piece_src, piece_w0, piece_w1
+        # реплики
+        self.speakers = speakers
+        self.start, self.end, self.speaker, self.seg_id = start, end, speaker, seg_id
+        self.abs_start = abs_start
+        self.w0, self.w1, self.p0, self.p1 = w0, w1, p0, p1
+        self.has_abs_start = has_abs_start
+
+    # ---------- построение ----------
+
+    @classmethod
+    def from_segments(cls, segments, speaker):
+        """Сегменты одного трека (dict из iter_transcribe/кэша) → таблица.
+        Сегменты читаются потоково: dict живут только до разбора."""
+        starts, ends, ids, texts = [], [], [], []
+        w_start, w_end, w_text, w_count = [], [], [], []
+        for seg in segments:
+            starts.append(seg["start"])
+            ends.append(seg["end"])
+            ids.append(seg.get("id", -1))
+            texts.append(seg["text"])
+            words = seg.get("words") or []
+            w_count.append(len(words))
+            for w in words:
+                w_start.append(w["start"])
+                w_end.append(w["end"])
+                w_text.append(w["text"])
+        n = len(starts)
+        w1 = np.cumsum(np.asarray(w_count, dtype=np.int64))
+        w0 = w1 - np.asarray(w_count, dtype=np.int64)
+        rows = np.arange(n, dtype=np.int64)
+        return cls(
+            w_start=np.asarray(w_start, dtype=np.float64),
+            w_end=np.asarray(w_end, dtype=np.float64),
+            w_text=TextColumn.from_list(w_text),
+            seg_text=TextColumn.from_list(texts),
+            piece_src=rows.copy(), piece_w0=w0, piece_w1=w1,
+            speakers=[speaker],
+            start=np.asarray(starts, dtype=np.float64),
+            end=np.asarray(ends, dtype=np.float64),
+            speaker=np.zeros(n, dtype=np.int32),
+            seg_id=np.asarray(ids, dtype=np.int32),
+            abs_start=np.zeros(n, dtype=np.int64),
+            w0=w0, w1=w1, p0=rows, p1=rows + 1,
+        )
+
+    def _replace(self, **changes):
+        fields = {k: getattr(self, k) for k in (
+            "w_start", "w_end", "w_text", "seg_text", "piece_src", "piece_w0", "piece_w1",
+            "speakers", "has_abs_start") + self.ROW_COLUMNS}
+        fields.update(changes)
+        return SegmentTable(**fields)
+
+    def take(self, idx):
+        """Подмножество/перестановка реплик; слова и тексты общие, не копируются."""
+        return self._replace(**{c: getattr(self, c)[idx] for c in self.ROW_COLUMNS})
+
+    @staticmethod
+    def concat(tables):
+        """Реплики нескольких треков в одной таблице (коды спикеров перенумеровываются)."""
+        speakers, codes = [], []
+        for t in tables:
+            remap = np.empty(len(t.speakers), dtype=np.int32)
+            for i, name in enumerate(t.speakers):
+                if name not in speakers:
+                    speakers.append(name)
+                remap[i] = speakers.index(name)
+            codes.append(remap[t.speaker] if len(t.speaker) else t.speaker)
+        w_base = np.cumsum([0] + [len(t.w_start) for t in tables])
+        s_base = np.cumsum([0] + [len(t.seg_text) for t in tables])
+        p_base = np.cumsum([0] + [len(t.piece_src) for t in tables])
+        cat = np.concatenate
+        return SegmentTable(
+            w_start=cat([t.w_start for t in tables]),
+            w_end=cat([t.w_end for t in tables]),
+            w_text=TextColumn.concat([t.w_text for t in tables]),
+            seg_text=TextColumn.concat([t.seg_text for t in tables]),
+            piece_src=cat([np.where(t.piece_src >= 0, t.piece_src + s_base[k], -1)
+                           for k, t in enumerate(tables)]),
+            piece_w0=cat([t.piece_w0 + w_base[k] for k, t in enumerate(tables)]),
+            piece_w1=cat([t.piece_w1 + w_base[k] for k, t in enumerate(tables)]),
+            speakers=speakers,
+            start=cat([t.start for t in tables]),
+            end=cat([t.end for t in tables]),
+            speaker=cat(codes).astype(np.int32),
+            seg_id=cat([t.seg_id for t in tables]),
+            abs_start=cat([t.abs_start for t in tables]),
+            w0=cat([t.w0 + w_base[k] for k, t in enumerate(tables)]),
+            w1=cat([t.w1 + w_base[k] for k, t in enumerate(tables)]),
+            p0=cat([t.p0 + p_base[k] for k, t in enumerate(tables)]),
+            p1=cat([t.p1 + p_base[k] for k, t in enumerate(tables)]),
+            has_abs_start=all(t.has_abs_start for t in tables),
+        )
+
+    # ---------- операции конвейера ----------
+
+    def split_by_gaps(self, gaps_idx: np.ndarray, frame_ms=10):
+        """split_segment_by_log для всех реплик сразу: новая реплика начинается
+        со слова, перед которым пройден очередной разрыв лога."""
+        if len(gaps_idx) == 0:
+            return self
+        counts = self.w1 - self.w0
+        word_idx = _ranges(self.w0, self.w1)
+        row_of_word = np.repeat(np.arange(len(self), dtype=np.int64), counts)
+        if len(word_idx) == 0:
+            return self.take(np.zeros(0, dtype=np.int64))
+        frame_idx = np.round(self.w_start[word_idx] * 1000 / frame_ms)
+        # число пройденных разрывов; указатель разрыва только растёт и сбрасывается
+        # на каждой реплике — сдвиг на (len + 1) на реплику и накопленный максимум
+        passed = np.searchsorted(gaps_idx, frame_idx, side="right") + row_of_word * (len(gaps_idx) + 1)
+        passed = np.maximum.accumulate(passed)
+        first = np.flatnonzero(np.concatenate(([True], passed[1:] != passed[:-1])))
+        last = np.concatenate((first[1:], [len(word_idx)])) - 1
+        w0 = word_idx[first]
+        w1 = word_idx[last] + 1
+        n = len(first)
+        pieces = np.arange(n, dtype=np.int64)
+        return self._replace(
+            piece_src=np.full(n, -1, dtype=np.int64), piece_w0=w0, piece_w1=w1,
+            start=self.w_start[w0], end=self.w_end[w1 - 1],
+            speaker=self.speaker[row_of_word[first]],
+            seg_id=np.full(n, -1, dtype=np.int32),
+            abs_start=np.zeros(n, dtype=np.int64),
+            w0=w0, w1=w1, p0=pieces, p1=pieces + 1,
+            has_abs_start=False,
+        )
+
+    def with_abs_start(self, ts_us: np.ndarray, frame_ms=10):
+        """abs_time: метка кадра лога, в который попадает начало реплики."""
+        if len(self) and len(ts_us) == 0:
+            raise ValueError(f"no log frames for speaker {self.speakers}")
+        idx = np.round(self.start * 1000 / frame_ms).astype(np.int64)
+        idx = np.minimum(idx, len(ts_us) - 1)
+        return self._replace(abs_start=ts_us[idx] if len(self) else self.abs_start,
+                             has_abs_start=True)
+
+    def with_abs_start_us(self, abs_us: np.ndarray):
+        """abs_start уже посчитан (мкс) — например, SpeechIntervals.abs_us(start)."""
+        return self._replace(abs_start=np.asarray(abs_us, dtype=np.int64), has_abs_start=True)
+
+    def sort_by_abs_start(self):
+        return self.take(np.argsort(self.abs_start, kind="stable"))
+
+    def _compact_pieces(self):
+        """Куски реплик подряд в порядке реплик — нужно перед merge."""
+        idx = _ranges(self.p0, self.p1)
+        p1 = np.cumsum(self.p1 - self.p0)
+        return self._replace(piece_src=self.piece_src[idx], piece_w0=self.piece_w0[idx],
+                             piece_w1=self.piece_w1[idx], p0=p1 - (self.p1 - self.p0), p1=p1)
+
+    def merge_consecutive(self, merge_gap_ms=400):
+        """iter_merge_consecutive_speaker_segments над отсортированной таблицей."""
+        n = len(self)
+        if n == 0:
+            return self
+        t = self._compact_pieces()
+        speaker = t.speaker.tolist()
+        abs_ms = (t.abs_start / 1000).tolist()
+        start = t.start.tolist()
+        end = t.end.tolist()
+        heads, lasts = [0], []
+        h, cur_end = 0, end[0]
+        for i in range(1, n):
+            gap_ms = (abs_ms[i] - abs_ms[h]) - (cur_end - start[h]) * 1000
+            if speaker[i] == speaker[h] and gap_ms <= merge_gap_ms:
+                cur_end = end[i]
+            else:
+                lasts.append(i - 1)
+                heads.append(i)
+                h, cur_end = i, end[i]
+        lasts.append(n - 1)
+        heads = np.asarray(heads, dtype=np.int64)
+        lasts = np.asarray(lasts, dtype=np.int64)
+        return t._replace(
+            start=t.start[heads], end=t.end[lasts], speaker=t.speaker[heads],
+            seg_id=t.seg_id[heads], abs_start=t.abs_start[heads],
+            w0=t.w0[heads], w1=t.w1[lasts], p0=t.p0[heads], p1=t.p1[lasts],
+        )
+
+    def relabel(self, labels: dict):
+        """Имена спикеров (id → имя из roster) — правка списка кодов, не строк."""
+        return self._replace(speakers=[labels.get(s, s) for s in self.speakers])
+
+    # ---------- доступ ----------
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self, i) -> SegmentView:
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return SegmentView(self, i % len(self))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield SegmentView(self, i)
+
+    def _piece_text(self, p) -> str:
+        src = self.piece_src[p]
+        if src >= 0:
+            return self.seg_text[src]
+        return self.w_text.join(self.piece_w0[p], self.piece_w1[p])
+
+    def text(self, i) -> str:
+        p0, p1 = int(self.p0[i]), int(self.p1[i])
+        text = self._piece_text(p0)
+        for p in range(p0 + 1, p1):
+            text += " " + self._piece_text(p).lstrip()
+        return text
+
+    def words(self, i) -> list[dict]:
+        w0, w1 = int(self.w0[i]), int(self.w1[i])
+        return [{"start": float(self.w_start[k]), "end": float(self.w_end[k]),
+                 "text": self.w_text[k]} for k in range(w0, w1)]
+
+    def to_dicts(self) -> list[dict]:
+        return [dict(view) for view in self]
+
+    @property
+    def nbytes(self):
+        arrays = [self.w_start, self.w_end, self.piece_src, self.piece_w0, self.piece_w1] + \
+                 [getattr(self, c) for c in self.ROW_COLUMNS]
+        return sum(a.nbytes for a in arrays) + self.w_text.nbytes + self.seg_text.nbytes
+
+
+def build_dialogue(track_segments: dict, ts_map: dict, gap_ms=2000, merge_gap_ms=400,
+                   frame_ms=10) -> SegmentTable:
+    """
+    track_segments: {node: iterable[dict]} — сегменты ASR в локальном времени трека.
+    ts_map: {node: list[datetime] | SpeechIntervals} — метки кадров из лога бота
+    или прогоны звука из speech_intervals.json.
+    То же, что multi_track (split → abs_start → merge по времени → склейка), колонками.
+    """
+    tables = []
+    for node, segments in track_segments.items():
+        timeline = ts_map.get(node, [])
+        table = SegmentTable.from_segments(segments, node)
+        if isinstance(timeline, SpeechIntervals):
+            table = table.split_by_gaps(timeline.gap_frames(gap_ms, frame_ms), frame_ms)
+            tables.append(table.with_abs_start_us(timeline.abs_us(table.start)))
+            continue
+        ts_us = to_us(timeline)
+        table = table.split_by_gaps(log_gaps(ts_us, gap_ms), frame_ms)
+        tables.append(table.with_abs_start(ts_us, frame_ms))
+    if not tables:
+        return SegmentTable.from_segments([], None).with_abs_start(np.zeros(0, dtype=np.int64))
+    return SegmentTable.concat(tables).sort_by_abs_start().merge_consecutive(merge_gap_ms)
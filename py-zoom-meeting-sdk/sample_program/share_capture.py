@@ -0,0 +1,138 @@
+"""
+Запись демонстрации экрана без почти одинаковых кадров.
+
+Демонстрация — в основном статичные слайды, кодировать каждый кадр в PNG
+незачем. По каждому кадру считается уменьшенная яркость (Y-плоскость, блоки
+THUMB_H x THUMB_W, numpy) и сравнивается:
+
+* с предыдущим кадром — идёт ли сейчас движение (перелистывание, анимация);
+* с последним сохранённым — изменилось ли содержимое.
+
+Кадр сохраняется, когда содержимое изменилось и картинка устоялась
+(settle_frames кадров без движения), либо — для видео/непрерывной анимации —
+когда с прошлого сохранения прошло max_interval_s.
+
+С frame_pool (zoom.VideoFramePool) Y-плоскость читается прямо из буфера SDK:
+кадр AddRef'ится на время расчёта миниатюры, без копии в bytes. Если пул
+полон или кадр нельзя удержать — обычная копия через GetYBuffer().
+
+Рядом с картинками пишется slides.jsonl — таймлайн «время → картинка»:
+
+    timeline = load_timeline("sample_program/out/share/<meeting>/slides.jsonl")
+    slide_at(timeline, some_datetime)["path"]
+"""
+import bisect
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+THUMB_H, THUMB_W = 36, 64
+SUBSAMPLE = 4                  # перед усреднением берём каждый 4-й пиксель
+TS_FORMAT = "%Y.%m.%d %H:%M:%S.%f"
+
+
+def luma_thumbnail(y_plane, width: int, height: int) -> np.ndarray:
+    """Y-плоскость (bytes или массив height x width) → THUMB_H x THUMB_W средних яркостей (float32)."""
+    y = np.frombuffer(y_plane, dtype=np.uint8, count=width * height).reshape(height, width) \
+        if isinstance(y_plane, bytes) else y_plane
+    y = y[::SUBSAMPLE, ::SUBSAMPLE]
+    bh, bw = max(y.shape[0] // THUMB_H, 1), max(y.shape[1] // THUMB_W, 1)
+    th, tw = y.shape[0] // bh, y.shape[1] // bw
+    return y[:th * bh, :tw * bw].reshape(th, bh, tw, bw).mean(axis=(1, 3), dtype=np.float32)
+
+
+def changed_fraction(a: np.ndarray, b: np.ndarray, cell_delta: float) -> float:
+    """Доля блоков, яркость которых изменилась больше чем на cell_delta."""
+    if a is None or b is None or a.shape != b.shape:
+        return 1.0
+    return float(np.count_nonzero(np.abs(a - b) > cell_delta)) / a.size
+
+
+class ShareCapture:
+    def __init__(self, out_dir, save_frame, cell_delta=12.0, change_threshold=0.01,
+                 settle_frames=3, max_interval_s=5.0, frame_pool=None):
+        """
+        save_frame(frame_bytes, width, height, path) — кодирует I420 в файл
+        (например, save_yuv420_frame_as_png из meeting_bot).
+        frame_pool — zoom.VideoFramePool для чтения Y-плоскости без копии.
+        """
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.save_frame = save_frame
+        self.cell_delta = cell_delta
+        self.change_threshold = change_threshold
+        self.settle_frames = settle_frames
+        self.max_interval_s = max_interval_s
+        self.frame_pool = frame_pool
+
+        self.prev_thumb = None
+        self.kept_thumb = None
+        self.stable = 0
+        self.last_kept = 0.0
+        self.frames_seen = 0
+        self.frames_kept = 0
+        self.timeline = open(self.out_dir / "slides.jsonl", "a")
+
+    def _changed(self, a, b) -> float:
+        return changed_fraction(a, b, self.cell_delta) > self.change_threshold
+
+    def on_frame(self, data, user_id=None):
+        """Колбэк share-рендерера (YUVRawDataI420)."""
+        self.frames_seen += 1
+        width, height = data.GetStreamWidth(), data.GetStreamHeight()
+        thumb = self._thumbnail(data, width, height)
+
+        self.stable = 0 if self._changed(thumb, self.prev_thumb) else self.stable + 1
+        self.prev_thumb = thumb
+        if not self._changed(thumb, self.kept_thumb):
+            return
+        now = time.monotonic()
+        if self.stable >= self.settle_frames or now - self.last_kept >= self.max_interval_s:
+            self._keep(data, thumb, width, height, user_id, now)
+
+    def _thumbnail(self, data, width, height):
+        handle = self.frame_pool.acquire(data) if self.frame_pool is not None else None
+        if handle is None:
+            return luma_thumbnail(data.GetYBuffer(), width, height)
+        with handle:
+            return luma_thumbnail(handle.y, width, height)
+
+    def _keep(self, data, thumb, width, height, user_id, now):
+        ts = datetime.now()
+        path = self.out_dir / f"slide_{self.frames_kept:05d}_{ts.strftime('%H%M%S_%f')}.png"
+        self.save_frame(data.GetBuffer(), width, height, str(path))
+        self.timeline.write(json.dumps({
+            "index": self.frames_kept,
+            "ts": ts.strftime(TS_FORMAT),
+            "path": str(path),
+            "user_id": user_id,
+            "width": width,
+            "height": height,
+            "changed": round(changed_fraction(thumb, self.kept_thumb, self.cell_delta), 4),
+        }) + "\n")
+        self.timeline.flush()
+        self.kept_thumb = thumb
+        self.last_kept = now
+        self.frames_kept += 1
+
+    def close(self):
+        print(f"share capture: kept {self.frames_kept} of {self.frames_seen} frames")
+        self.timeline.close()
+
+
+def load_timeline(path) -> list[dict]:
+    with open(path) as f:
+        slides = [json.loads(line) for line in f if line.strip()]
+    for slide in slides:
+        slide["time"] = datetime.strptime(slide["ts"], TS_FORMAT)
+    slides.sort(key=lambda s: s["time"])
+    return slides
+
+
+def slide_at(timeline: list[dict], t: datetime):
+    """Слайд, который был на экране в момент t (или None до первого слайда)."""
+    i = bisect.bisect_right([s["time"] for s in timeline], t) - 1
+    return timeline[i] if i >= 0 else None
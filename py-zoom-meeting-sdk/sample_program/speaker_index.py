@@ -0,0 +1,183 @@
+# speaker_index.py
+"""
+Индекс «кто говорит когда», построенный по логу самого бота
+(meeting_event_log), вместо нейросетевой диаризации.
+
+Источники интервалов:
+  • on_user_active_audio_change_callback — список активных спикеров на момент события;
+  • on_one_way_audio_raw_data_received_callback — приход кадров по node_id
+    (склеиваем в «прогоны», пока пауза между кадрами < frame_gap_ms);
+    новые записи бота дают прогоны сразу — speech_intervals.json.
+
+Интервалы разворачиваются в отсортированный массив элементарных отрезков,
+поэтому поиск спикера для слова — bisect, O(log n).
+"""
+import bisect
+import collections
+import datetime
+
+TS_FMT = "%Y.%m.%d %H:%M:%S.%f"
+ACTIVE_EVENT = "on_user_active_audio_change_callback"
+FRAME_EVENT = "on_one_way_audio_raw_data_received_callback"
+
+
+def _ts(rec) -> datetime.datetime:
+    return datetime.datetime.strptime(rec["ts"], TS_FMT)
+
+
+def active_speaker_intervals(records):
+    """
+    [(start, end, speaker)] из событий смены активных спикеров.
+    Спикер активен с события, где он появился, до первого события без него.
+    """
+    intervals = []
+    opened = {}                                  # speaker -> start
+    last_ts = None
+    for rec in records:
+        if rec.get("event") != ACTIVE_EVENT:
+            continue
+        ts = _ts(rec)
+        now_active = {str(u) for u in rec.get("user_ids", [])}
+        for spk in list(opened):
+            if spk not in now_active:
+                intervals.append((opened.pop(spk), ts, spk))
+        for spk in now_active:
+            opened.setdefault(spk, ts)
+        last_ts = ts
+    for spk, start in opened.items():           # хвост — до последнего события
+        if last_ts is not None and last_ts > start:
+            intervals.append((start, last_ts, spk))
+    return intervals
+
+
+def frame_arrival_intervals(records, frame_gap_ms=200, frame_ms=10):
+    """[(start, end, node_id)] — непрерывные прогоны аудиокадров каждого участника."""
+    runs = {}                                    # node -> [start, last]
+    intervals = []
+    gap = datetime.timedelta(milliseconds=frame_gap_ms)
+    frame = datetime.timedelta(milliseconds=frame_ms)
+    for rec in records:
+        if rec.get("event") != FRAME_EVENT:
+            continue
+        node = str(rec["node_id"])
+        ts = _ts(rec)
+        run = runs.get(node)
+        if run is not None and ts - run[1] < gap:
+            run[1] = ts
+            continue
+        if run is not None:
+            intervals.append((run[0], run[1] + frame, node))
+        runs[node] = [ts, ts]
+    for node, (start, last) in runs.items():
+        intervals.append((start, last + frame, node))
+    return intervals
+
+
+class SpeakerIntervalIndex:
+    """
+    Отсортированный массив границ + кортеж активных спикеров на каждом отрезке
+    [bounds[i], bounds[i+1]).  Время — datetime.
+    """
+
+    def __init__(self, intervals):
+        events = []
+        for start, end, spk in intervals:
+            if end <= start:
+                continue
+            events.append((start, 1, spk))
+            events.append((end, 0, spk))         # 0 < 1: закрытия раньше открытий
+        events.sort(key=lambda e: (e[0], e[1]))
+
+        self.bounds = []
+        self.active = []
+        counts = collections.Counter()
+        i = 0
+        while i < len(events):
+            t = events[i][0]
+            while i < len(events) and events[i][0] == t:
+                _, opening, spk = events[i]
+                counts[spk] += 1 if opening else -1
+                if counts[spk] == 0:
+                    del counts[spk]
+                i += 1
+            self.bounds.append(t)
+            self.active.append(tuple(sorted(counts)))
+
+    def __bool__(self):
+        return bool(self.bounds)
+
+    @classmethod
+    def from_event_log(cls, records, frame_gap_ms=200, frame_intervals=None):
+        """frame_intervals — готовые прогоны звука (speech_intervals) вместо кадров лога."""
+        if frame_intervals is None:
+            frame_intervals = frame_arrival_intervals(records, frame_gap_ms)
+        return cls(active_speaker_intervals(records) + frame_intervals)
+
+    def speakers_at(self, t):
+        i = bisect.bisect_right(self.bounds, t) - 1
+        if i < 0:
+            return ()
+        return self.active[i]
+
+    def speaker_for(self, start, end):
+        """Спикер с наибольшим перекрытием [start, end); None, если никого."""
+        if end <= start:
+            spk = self.speakers_at(start)
+            return spk[0] if spk else None
+        i = max(bisect.bisect_right(self.bounds, start) - 1, 0)
+        overlap = collections.Counter()
+        while i < len(self.bounds) - 1 and self.bounds[i] < end:
+            lo = max(start, self.bounds[i])
+            hi = min(end, self.bounds[i + 1])
+            if hi > lo:
+                for spk in self.active[i]:
+                    overlap[spk] += (hi - lo).total_seconds()
+            i += 1
+        if not overlap:
+            return None
+        return overlap.most_common(1)[0][0]
+
+
+def recording_origin(records, audio_name=None):
+    """Абсолютное время начала микс-WAV: событие start_raw_recording (по имени файла)."""
+    starts = [r for r in records if r.get("event") == "start_raw_recording"]
+    if audio_name is not None:
+        named = [r for r in starts if str(r.get("wav_path", "")).endswith(audio_name)]
+        starts = named or starts
+    if starts:
+        return _ts(starts[0])
+    frames = [r for r in records if r.get("event") == FRAME_EVENT]
+    return _ts(frames[0]) if frames else None
+
+
+def assign_speakers(asr_result, index, origin):
+    """
+    Размечаем слова спикерами по индексу и режем сегменты на смене спикера.
+    Слово без активного спикера наследует спикера предыдущего слова.
+    """
+    out = []
+    for seg in asr_result["segments"]:
+        words = seg.get("words") or []
+        if not words:
+            continue
+        runs = []
+        prev = None
+        for w in words:
+            a = origin + datetime.timedelta(seconds=w["start"])
+            b = origin + datetime.timedelta(seconds=w["end"])
+            spk = index.speaker_for(a, b) or prev
+            if runs and spk == runs[-1][0]:
+                runs[-1][1].append(w)
+            else:
+                runs.append((spk, [w]))
+            prev = spk
+        for spk, buf in runs:
+            out.append({
+                "start":     buf[0]["start"],
+                "end":       buf[-1]["end"],
+                "text":      "".join(w["text"] for w in buf),
+                "words":     buf,
+                "speaker":   spk if spk is not None else "Speaker",
+                "abs_start": origin + datetime.timedelta(seconds=buf[0]["start"]),
+            })
+    return {"segments": out, "language": asr_result.get("language")}
@@ -0,0 +1,155 @@
+"""
+Индекс «когда шёл звук» по каждому per-user WAV — прогоны кадров (run-length).
+
+Бот на каждый кадр не пишет событие в лог, а продлевает текущий прогон трека:
+кадр, пришедший в пределах tolerance_ms от ожидаемого по числу сэмплов
+момента, удлиняет прогон; иначе (пауза, скачок часов) открывается новый.
+Прогон — [sample_start, samples, start_us]: смещение в сэмплах своего WAV,
+длина и wall-clock начала (мкс от эпохи, UTC). За встречу это тысячи
+записей вместо миллионов кадров лога; файл маленький и перезаписывается
+целиком по таймеру бота (flush) и при закрытии.
+
+    intervals = load_intervals("sample_program/out/audio/<meeting>/speech_intervals.json")
+    timeline = intervals["user_16778240_20250710_141645.wav"]
+    timeline.abs_time(12.5)            # datetime слова с 12.5 с трека — bisect по прогонам
+
+Время наружу — локальное наивное, как "ts" в логе бота.
+"""
+import datetime
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+INTERVALS_FILE = "speech_intervals.json"
+TOLERANCE_MS = 100             # меньше frame_gap_ms индекса спикеров и gap_ms транскрипции
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class SpeechIntervalRecorder:
+    def __init__(self, path, rate, sample_format="s16", tolerance_ms=TOLERANCE_MS):
+        self.path = Path(path)
+        self.rate = rate
+        self.bytes_per_sample = 4 if sample_format == "f32" else 2
+        self.tolerance_us = int(tolerance_ms * 1000)
+        self.tracks: dict[str, dict] = {}        # имя WAV -> {"node_id", "runs"}
+        self.current = {}                        # node_id -> [runs, сэмплов записано]
+        self.dirty = False
+
+    def open_track(self, node_id, name):
+        """Новый WAV участника: смещения дальше считаются от его начала."""
+        runs = []
+        self.tracks[name] = {"node_id": str(node_id), "runs": runs}
+        self.current[node_id] = [runs, 0]
+        self.dirty = True
+
+    def on_frame(self, node_id, nbytes, wall_us):
+        cur = self.current.get(node_id)
+        if cur is None:
+            return
+        runs, pos = cur
+        n = nbytes // self.bytes_per_sample
+        cur[1] = pos + n
+        self.dirty = True
+        if runs:
+            run = runs[-1]
+            expected = run[2] + run[1] * 1_000_000 // self.rate
+            if abs(wall_us - expected) <= self.tolerance_us:
+                run[1] += n
+                return
+        runs.append([pos, n, wall_us])
+
+    def flush(self):
+        """Перезаписывает файл целиком; True — чтобы работать таймером GLib."""
+        if self.dirty:
+            data = {
+                "rate": self.rate,
+                "tolerance_ms": self.tolerance_us / 1000,
+                "tracks": {name: self.tracks[name] for name in sorted(self.tracks)},
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, separators=(",", ":")), "utf-8")
+            os.replace(tmp, self.path)
+            self.dirty = False
+        return True
+
+    def close(self):
+        self.flush()
+        runs = sum(len(t["runs"]) for t in self.tracks.values())
+        print(f"speech intervals: {runs} runs in {len(self.tracks)} tracks")
+
+
+def _local_us(epoch_us: int) -> int:
+    """Мкс UTC от эпохи → мкс локального наивного времени (шкала to_us / datetime64)."""
+    seconds = epoch_us // 1_000_000
+    offset = (datetime.datetime.fromtimestamp(seconds)
+              - datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).replace(tzinfo=None))
+    return epoch_us + offset // datetime.timedelta(microseconds=1)
+
+
+class SpeechIntervals:
+    """Прогоны одного трека, отсортированы по sample_start."""
+
+    def __init__(self, node_id, rate, runs):
+        runs = sorted(runs)
+        self.node_id = node_id
+        self.rate = rate
+        self.sample_start = np.array([r[0] for r in runs], dtype=np.int64)
+        self.samples = np.array([r[1] for r in runs], dtype=np.int64)
+        self.start_us = np.array([_local_us(r[2]) for r in runs], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.sample_start)
+
+    @property
+    def end_us(self) -> np.ndarray:
+        return self.start_us + self.samples * 1_000_000 // self.rate
+
+    @property
+    def origin(self) -> datetime.datetime | None:
+        return EPOCH + datetime.timedelta(microseconds=int(self.start_us[0])) if len(self) else None
+
+    def gap_frames(self, gap_ms, frame_ms=10) -> np.ndarray:
+        """
+        Как find_log_gaps: номера кадров трека, перед которыми пауза ≥ gap_ms
+        (между началами соседних кадров, т.е. с учётом длины кадра).
+        """
+        if len(self) < 2:
+            return np.zeros(0, dtype=np.int64)
+        pause = self.start_us[1:] - self.end_us[:-1] + frame_ms * 1000
+        starts = self.sample_start[1:][pause >= gap_ms * 1000]
+        return np.round(starts * 1000 / (self.rate * frame_ms)).astype(np.int64)
+
+    def abs_us(self, local_s) -> np.ndarray:
+        """Секунды от начала WAV → мкс локального времени: bisect по прогонам."""
+        if not len(self):
+            raise ValueError(f"no speech intervals for node {self.node_id}")
+        sample = np.round(np.asarray(local_s, dtype=np.float64) * self.rate).astype(np.int64)
+        i = np.maximum(np.searchsorted(self.sample_start, sample, side="right") - 1, 0)
+        # за концом записи — конец последнего прогона, как у лога кадров
+        sample = np.minimum(sample, self.sample_start[-1] + self.samples[-1])
+        return self.start_us[i] + (sample - self.sample_start[i]) * 1_000_000 // self.rate
+
+    def abs_time(self, local_s) -> datetime.datetime:
+        return EPOCH + datetime.timedelta(microseconds=int(self.abs_us(local_s)))
+
+    def runs(self):
+        """[(start, end)] datetime — прогоны звука трека."""
+        return [(EPOCH + datetime.timedelta(microseconds=int(s)),
+                 EPOCH + datetime.timedelta(microseconds=int(e)))
+                for s, e in zip(self.start_us, self.end_us)]
+
+
+def load_intervals(path) -> dict[str, SpeechIntervals]:
+    """{имя WAV: SpeechIntervals}."""
+    data = json.loads(Path(path).read_text("utf-8"))
+    return {name: SpeechIntervals(track["node_id"], data["rate"], track["runs"])
+            for name, track in data["tracks"].items()}
+
+
+def speech_runs(intervals: dict) -> list:
+    """[(start, end, node_id)] всех треков — для SpeakerIntervalIndex."""
+    return [(start, end, timeline.node_id)
+            for timeline in intervals.values() for start, end in timeline.runs()]
@@ -0,0 +1,52 @@
+"""
+Профиль старта бота: отметки «сколько прошло от запуска процесса».
+
+    import startup_profile
+    startup_profile.mark("imports done")
+    ...
+    startup_profile.report()      # печатает, если STARTUP_PROFILE=true
+
+Время отсчитывается от старта процесса (/proc/self/stat), поэтому в отчёт
+попадает и запуск интерпретатора, и импорты до первого mark().
+STARTUP_PROFILE читается в report(), так что его можно задать и в .env
+(load_dotenv() выполняется уже после импорта модуля).
+"""
+import os
+import time
+
+_marks: list[tuple[str, float]] = []
+
+
+def _process_start() -> float:
+    """perf_counter() момента старта процесса (Linux); иначе — момент импорта модуля."""
+    now = time.perf_counter()
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return now
+    return now - (uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+_t0 = _process_start()
+
+
+def mark(name: str):
+    _marks.append((name, time.perf_counter() - _t0))
+
+
+def enabled() -> bool:
+    return os.environ.get("STARTUP_PROFILE") == "true"
+
+
+def report():
+    if not enabled():
+        return
+    print("=== startup profile (s since process start) ===")
+    prev = 0.0
+    for name, t in _marks:
+        print(f"{t:8.3f}  (+{t - prev:6.3f})  {name}")
+        prev = t
+    print("===============================================")
@@ -0,0 +1,122 @@
+"""
+Общий для всех ботов хоста кэш токенов (S2S OAuth, ZAK, SDK JWT).
+
+* файл на токен в TOKEN_CACHE_DIR (0600), запись атомарная (tmp + rename);
+  каталог — $XDG_RUNTIME_DIR или ~/.cache, и только свой и 0700: чужой
+  (например, заранее созданный другим пользователем в /tmp) не используется;
+* обновление заранее — за REFRESH_AHEAD_S до истечения;
+* single-flight по ключу: обновляет токен один поток/процесс (замок ключа +
+  flock на .lock-файле), остальные ждут и читают уже свежий токен; замки
+  разных ключей независимы — fetch() ZAK может сам взять токен S2S;
+* HTTP-запросы идут через один пул соединений (requests.Session).
+"""
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+
+TOKEN_CACHE_DIR = Path(os.environ.get(
+    "TOKEN_CACHE_DIR",
+    Path(os.environ.get("XDG_RUNTIME_DIR") or Path.home() / ".cache") / "zoom_bot_tokens"))
+REFRESH_AHEAD_S = 300
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """requests.Session с пулом keep-alive соединений, один на процесс."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def _private_dir(path: Path) -> Path:
+    """Создаёт каталог 0700; существующий принимается, только если он наш и закрыт для других."""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"token cache dir {path} must be a directory owned by uid {os.getuid()} with mode 0700")
+    return path
+
+
+class TokenCache:
+    def __init__(self, cache_dir=TOKEN_CACHE_DIR, refresh_ahead_s=REFRESH_AHEAD_S):
+        self.dir = _private_dir(Path(cache_dir))
+        self.refresh_ahead_s = refresh_ahead_s
+        self._memory: dict[str, tuple[str, float]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Имя записи без секретов в имени файла."""
+        return hashlib.sha256("\0".join(str(p) for p in parts).encode()).hexdigest()[:32]
+
+    def _fresh(self, entry) -> bool:
+        return entry is not None and entry[1] - self.refresh_ahead_s > time.time()
+
+    def _read(self, key):
+        try:
+            with open(self.dir / f"{key}.json") as f:
+                rec = json.load(f)
+            return rec["token"], rec["expires_at"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write(self, key, token, expires_at):
+        path = self.dir / f"{key}.json"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"token": token, "expires_at": expires_at}, f)
+        os.replace(tmp, path)
+
+    def get(self, key: str, fetch) -> str:
+        """
+        Токен по ключу. fetch() -> (token, expires_at_epoch) вызывается,
+        только если ни в памяти, ни в файле нет достаточно свежего токена.
+        """
+        with self._key_lock(key):                     # single-flight внутри процесса
+            entry = self._memory.get(key)
+            if self._fresh(entry):
+                return entry[0]
+            entry = self._read(key)
+            if not self._fresh(entry):
+                with open(self.dir / f"{key}.lock", "a") as lock:
+                    fcntl.flock(lock, fcntl.LOCK_EX)  # ... и между процессами хоста
+                    try:
+                        entry = self._read(key)       # пока ждали, мог обновить сосед
+                        if not self._fresh(entry):
+                            entry = fetch()
+                            self._write(key, *entry)
+                    finally:
+                        fcntl.flock(lock, fcntl.LOCK_UN)
+            self._memory[key] = entry
+            return entry[0]
+
+
+_cache = None
+
+
+def token_cache() -> TokenCache:
+    global _cache
+    with _session_lock:
+        if _cache is None:
+            _cache = TokenCache()
+        return _cache
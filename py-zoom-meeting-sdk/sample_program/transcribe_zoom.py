@@ -13,18 +13,46 @@ import argparse
 import json
 import datetime
 import collections
+import heapq
 from pathlib import Path
 import re
+import struct
 import whisperx
 from faster_whisper import WhisperModel
+import run_profile as prof
+from asr_cache import ASRCache
+from autotune import apply_profile, autotune
+from audio_io import asr_input, wav_info
+from batched_asr import transcribe_islands
+from parallel_asr import ParallelTranscriber
+from parallel_diarization import parallel_diarize
+from segment_table import build_dialogue
+from dialogue_writers import WRITERS, DialogueWriters, dialogue_line, output_names
+from roster import ROSTER_FILE, load_speaker_labels
+from speaker_index import SpeakerIntervalIndex, assign_speakers, recording_origin
+from speech_intervals import INTERVALS_FILE, SpeechIntervals, load_intervals, speech_runs
+from whisper_segments import segment_to_dict
 
 FRAME_MS = 10                  # длительность одной PCM-рамки
 TS_FMT = "%Y.%m.%d %H:%M:%S.%f"
+PROFILE_FILE = "profile.json"  # профиль прогона рядом с dialogue.txt (--profile)
+
+# параметры декодирования faster-whisper (входят в ключ ASR-кэша)
+TRANSCRIBE_OPTIONS = {
+    "vad_filter": True,
+    "vad_parameters": {
+        "min_silence_duration_ms": 200,
+        "max_speech_duration_s": 30,
+        "speech_pad_ms": 400,
+    },
+    "word_timestamps": True,
+    "condition_on_previous_text": True,
+}
 
 # ---------- базовые функции ----------
 
-def load_model(name="base", lang="ru", device="cuda", compute="auto"):
-    print(f"→ loading Whisper {name} on {device} (compute_type={compute})")
+def load_model(name="base", lang="ru", device="cuda", compute="auto", cpu_threads=0):
+    print(f"→ loading Whisper {name} on {device} (compute_type={compute}, cpu_threads={cpu_threads or 'auto'})")
     # return whisperx.load_model(
     #     name,
     #     device=device,
@@ -53,10 +81,56 @@ def load_model(name="base", lang="ru", device="cuda", compute="auto"):
     #     }
     # )
 
-    return WhisperModel(name, device=device, compute_type=compute)
+    with prof.stage("model_load"):
+        return WhisperModel(name, device=device, compute_type=compute, cpu_threads=cpu_threads)
+
+
+def make_asr(args):
+    """
+    Одна модель в этом процессе или, при --workers > 1, пул процессов, где
+    каждый трек режется по паузам и куски транскрибируются параллельно.
+    """
+    if args.workers <= 1:
+        return load_model(args.model, args.language, args.device, args.compute_type,
+                          args.cpu_threads)
+    # модели грузятся в процессах пула, их время и CPU — в total.children_cpu_s
+    return ParallelTranscriber(args.model, args.device, args.compute_type,
+                               workers=args.workers, cpu_threads=args.worker_cpu_threads,
+                               chunk_s=args.chunk_s)
+
+
+def close_asr(model):
+    """Останавливает пул параллельного ASR (до записи профиля — чтобы учесть CPU воркеров)."""
+    if isinstance(model, ParallelTranscriber):
+        model.close()
+
+
+def asr_options(model) -> dict:
+    """Параметры для ключа ASR-кэша: резка на куски меняет результат на стыках."""
+    if isinstance(model, ParallelTranscriber):
+        return {**TRANSCRIBE_OPTIONS, "chunk_s": model.chunk_s, "overlap_s": model.overlap_s}
+    return TRANSCRIBE_OPTIONS
+
+def iter_transcribe(model, audio_path, cache: ASRCache | None = None, meta: dict | None = None):
+    """
+    ASR с тайм-кодами слов, сегменты отдаются по мере распознавания.
+    С cache повторный прогон того же аудио не идёт в модель.
+    meta (если передан) получает "language".
+    """
+    if meta is None:
+        meta = {}
+    track = meta.get("track")
+    if cache is not None:
+        with prof.stage("asr_cache", track):
+            key = cache.key(audio_path, asr_options(model))
+            cached = cache.get(key)
+        if cached is not None:
+            print(f"→ ASR cache hit: {audio_path}")
+            meta["language"] = cached.get("language")
+            prof.add("asr_cache", track, hits=1, audio_s=audio_seconds(audio_path))
+            yield from cached["segments"]
+            return
 
-def transcribe(model, audio_path):
-    """ASR с тайм-кодами слов."""
     # для whisperx
     # return model.transcribe(audio_path, 
     #                         batch_size=16,
@@ -67,34 +141,48 @@ def transcribe(model, audio_path):
     #                         # )
     #                         )
 
-    # для faster-whisper
-    segments, info = model.transcribe(audio_path,
-                            # batch_size=16,
-                            vad_filter=True,
-                            vad_parameters={
-                                "min_silence_duration_ms": 200,
-                                "max_speech_duration_s": 30,
-                                "speech_pad_ms": 400,
-                            },
-                            word_timestamps=True,
-                            condition_on_previous_text=True,
-                            )
+    # для faster-whisper: WAV бота читаем через memmap, без ffmpeg-декодера
+    with prof.stage("decode", track, audio_s=audio_seconds(audio_path)):
+        audio = asr_input(audio_path)
+    if isinstance(model, ParallelTranscriber):
+        # куски по паузам в пуле процессов, сегменты уже dict в времени трека
+        prof.add("asr", track, audio_s=audio_seconds(audio_path))
+        segments = model.transcribe(audio, TRANSCRIBE_OPTIONS, meta)
+    else:
+        # VAD и признаки считаются сразу, декодирование — лениво по сегментам
+        with prof.stage("vad_features", track):
+            segments, info = model.transcribe(audio,
+                                    # batch_size=16,
+                                    **TRANSCRIBE_OPTIONS,
+                                    )
+        del audio                   # дальше нужны только признаки внутри segments
+        meta["language"] = info.language
+        prof.add("asr", track, audio_s=info.duration)
+        segments = map(segment_to_dict, segments)                      # Segment dataclass
     seg_dicts = []
-    for seg in segments:                       # Segment dataclass
-        seg_dicts.append({
-            "id":    seg.id,
-            "start": seg.start,
-            "end":   seg.end,
-            "text":  seg.text,
-            "words": [
-                {
-                    "start": w.start,
-                    "end":   w.end,
-                    "text":  w.word
-                } for w in (seg.words or [])
-            ],
-        })
-    return {"segments": seg_dicts, "language": info.language}
+    for d in prof.timed(segments, "asr", track, count="segments"):
+        prof.add("asr", track, words=len(d["words"]))
+        if cache is not None:
+            seg_dicts.append(dict(d))       # в кэш — копия: d уходит потребителю
+        yield d
+    if cache is not None:
+        cache.put(key, {"segments": seg_dicts, "language": meta.get("language")})
+
+
+def transcribe(model, audio_path, cache: ASRCache | None = None, track=None):
+    """ASR с тайм-кодами слов."""
+    meta = {"track": track}
+    segments = list(iter_transcribe(model, audio_path, cache, meta))
+    return {"segments": segments, "language": meta.get("language")}
+
+
+def audio_seconds(path) -> float:
+    """Длительность WAV по заголовку (0, если формат не разобрали)."""
+    try:
+        info = wav_info(path)
+    except (ValueError, OSError, struct.error):
+        return 0.0
+    return info.frames / info.rate if info.rate else 0.0
 
 
 def find_log_gaps(ts_list, gap_ms=200):
@@ -114,9 +202,8 @@ def split_segment_by_log(seg, ts_list, gaps_idx, node, frame_ms=10):
     Разбиваем сегмент faster‑whisper по разрывам, найденным в логах.
     Возвращает list[dict] в формате faster‑whisper/WhisperX.
     """
-    if not gaps_idx:                 # разрывов нет → вернуть как есть
-        seg["speaker"] = node
-        return [seg]
+    if not gaps_idx:                 # разрывов нет → копия целиком (seg не меняем:
+        return [dict(seg, speaker=node)]  # он же может лежать в ASR-кэше)
 
     gaps_idx = sorted(gaps_idx)      # на всякий случай
     gap_ptr  = 0                     # указатель на 'текущий' разрыв
@@ -155,39 +242,97 @@ def abs_time(word_start_local: float, ts_list) -> datetime.datetime:
 
 
 def diarize(audio_path, device="cuda", hf_token=None):
-    pipe = whisperx.DiarizationPipeline(device=device, hf_token=hf_token)
-    return pipe(audio_path)
+    with prof.stage("diarization_load"):
+        pipe = whisperx.DiarizationPipeline(device=device, hf_token=hf_token)
+    with prof.stage("diarization", audio_s=audio_seconds(audio_path)):
+        return pipe(audio_path)
 
 def apply_diarization(asr_result, diarization_result):
-    return whisperx.assign_word_speakers(diarization_result, asr_result)
+    with prof.stage("assign_speakers", segments=len(asr_result["segments"])):
+        return whisperx.assign_word_speakers(diarization_result, asr_result)
 
 def segments_to_dialogue(segments):
     """Собираем реплики вида 'Speaker X: текст'."""
-    lines = []
-    for s in segments:
-        spk = s.get("speaker", "Speaker")
-        abs_start = s.get("abs_start", "HH:MM:SS")
-        lines.append(f"[{abs_start}] {spk}: {s['text'].strip()}")
-    return "\n".join(lines)
+    return "\n".join(dialogue_line(s) for s in segments)
 
 # ---------- сценарии обработки ----------
 
+def profile_meta(args, track=None) -> dict:
+    return {"input": str(args.input), "track": track, "model": args.model,
+            "device": args.device, "compute_type": args.compute_type,
+            "cpu_threads": args.cpu_threads, "workers": args.workers,
+            "worker_cpu_threads": args.worker_cpu_threads, "chunk_s": args.chunk_s,
+            "batch_size": args.batch_size, "diar_workers": args.diar_workers}
+
+
+def make_cache(args):
+    if not args.cache_dir:
+        return None
+    return ASRCache(args.cache_dir,
+                    max_bytes=args.cache_max_mb * 1024 * 1024,
+                    model=args.model,
+                    compute_type=args.compute_type)
+
+
+def speakers_from_log(asr, file_path, log_path):
+    """Разметка спикеров по логу бота; None, если в логе нет нужных событий."""
+    with prof.stage("log_parse"):
+        with open(log_path, "r") as f:
+            records = json.load(f)
+        # прогоны звука — из индекса бота, если он есть, иначе из кадров лога
+        intervals_path = Path(log_path).parent / INTERVALS_FILE
+        runs = speech_runs(load_intervals(intervals_path)) if intervals_path.exists() else None
+        index = SpeakerIntervalIndex.from_event_log(records, frame_intervals=runs)
+        origin = recording_origin(records, Path(file_path).name)
+    prof.add("log_parse", records=len(records))
+    if not index or origin is None:
+        print(f"→ no speaker events in {log_path}, falling back to diarization")
+        return None
+    print(f"→ speakers from event log: {len(index.bounds)} boundaries")
+    with prof.stage("assign_speakers", segments=len(asr["segments"])):
+        merged = assign_speakers(asr, index, origin)
+    labels = load_speaker_labels(Path(log_path).parent)
+    for seg in merged["segments"]:
+        seg["speaker"] = labels.get(seg["speaker"], seg["speaker"])
+    return merged
+
+
 def single_track(file_path, args):
-    model = load_model(args.model, args.language, args.device, args.compute_type)
-    asr = transcribe(model, file_path)
-    diar = diarize(file_path, args.device, args.hf_token)
-    merged = apply_diarization(asr, diar)
-    txt = segments_to_dialogue(merged["segments"])
-    out = Path(file_path).with_suffix(".dialogue.txt")
-    out.write_text(txt, "utf-8")
+    track = Path(file_path).name
+    prof.add(prof.INPUT_STAGE, track, audio_s=audio_seconds(file_path))
+    model = make_asr(args)
+    asr = transcribe(model, file_path, make_cache(args), track)
+    close_asr(model)
+    merged = None
+    if args.event_log:
+        merged = speakers_from_log(asr, file_path, args.event_log)
+    if merged is None:
+        if args.diar_workers > 0:
+            # CPU воркеров пула попадает в total.children_cpu_s
+            with prof.stage("diarization", audio_s=audio_seconds(file_path)):
+                diar = parallel_diarize(file_path, args.hf_token, args.device,
+                                        workers=args.diar_workers,
+                                        window_s=args.diar_window_s,
+                                        threshold=args.diar_threshold,
+                                        cache=make_cache(args))
+        else:
+            diar = diarize(file_path, args.device, args.hf_token)
+        merged = apply_diarization(asr, diar)
+    with prof.stage("write", segments=len(merged["segments"])):
+        txt = segments_to_dialogue(merged["segments"])
+        out = Path(file_path).with_suffix(".dialogue.txt")
+        out.write_text(txt, "utf-8")
     print(f"✓ dialogue saved to {out}")
+    prof.write(Path(file_path).with_suffix(".profile.json"), profile_meta(args, track))
 
 
 def get_meeting_event_log(folder) -> list:
     by_node = collections.defaultdict(list)
-    json_paths = list(Path(folder).glob("*.json"))
+    # в папке встречи, кроме лога, лежат roster.json бота и выходы прошлых прогонов
+    skip = {ROSTER_FILE, PROFILE_FILE, INTERVALS_FILE} | output_names()
+    json_paths = [p for p in Path(folder).glob("*.json") if p.name not in skip]
     assert len(json_paths) == 1
-    with open(json_paths[0], "r") as f:
+    with prof.stage("log_parse"), open(json_paths[0], "r") as f:
         meeting_event_log = json.loads(f.read())
         for rec in meeting_event_log:
             if rec["event"] != "on_one_way_audio_raw_data_received_callback":
@@ -196,9 +341,35 @@ def get_meeting_event_log(folder) -> list:
             ts = datetime.datetime.strptime(rec["ts"], TS_FMT)
             by_node[node].append(ts)
             # print(f"added new node: {node} - {ts}")
+    prof.add("log_parse", records=len(meeting_event_log))
     return by_node
 
 
+def get_meeting_timing(folder, tracks) -> dict:
+    """
+    {node: SpeechIntervals} по индексу бота (speech_intervals.json), если он
+    покрывает все треки; иначе {node: list[datetime]} из кадров лога (старые записи).
+    """
+    path = Path(folder) / INTERVALS_FILE
+    if path.exists():
+        with prof.stage("log_parse"):
+            intervals = load_intervals(path)
+        timing = {node: intervals.get(Path(audio).name) for node, audio in tracks.items()}
+        missing = [node for node, timeline in timing.items() if timeline is None]
+        if not missing:
+            prof.add("log_parse", runs=sum(len(t) for t in timing.values()))
+            return timing
+        print(f"→ {INTERVALS_FILE} has no runs for {missing}, falling back to the event log")
+    return get_meeting_event_log(folder)
+
+
+def timeline_origin(timeline):
+    """Начало первого кадра трека: SpeechIntervals или список меток лога."""
+    if isinstance(timeline, SpeechIntervals):
+        return timeline.origin
+    return timeline[0] if timeline else None
+
+
 def to_absolute(seg_start_local, ts_list):
     """seg_start_local -- float секунд от начала WAV."""
     frame_idx = round(seg_start_local * 1000 / FRAME_MS)
@@ -256,17 +427,17 @@ def id_from_wav(path: Path) -> str:
 #     print(f"✓ dialogue saved to {out}")
 
 
-def merge_consecutive_speaker_segments(segments, merge_gap_ms=400):
+def iter_merge_consecutive_speaker_segments(segments, merge_gap_ms=400):
     """
-    segments  – list[dict] отсортированный по 'abs_start'.
-    Возвращает новый list[dict] с объединёнными репликами.
+    segments  – iterable[dict] отсортированный по 'abs_start'.
+    Потоково объединяет подряд идущие реплики одного спикера:
+    реплика отдаётся, как только следующая её не продолжает.
     """
-    if not segments:
-        return []
-
-    merged = [segments[0].copy()]           # стартуем с первого сегмента
-    for seg in segments[1:]:
-        cur = merged[-1]
+    cur = None
+    for seg in segments:
+        if cur is None:
+            cur = dict(seg, words=list(seg["words"]))
+            continue
 
         same_speaker = seg["speaker"] == cur["speaker"]
         gap_ms = (seg["abs_start"] - cur["abs_start"]).total_seconds() * 1000 \
@@ -278,60 +449,219 @@ def merge_consecutive_speaker_segments(segments, merge_gap_ms=400):
             cur["end"]    = seg["end"]          # относительный конец
             cur["words"] += seg["words"]        # расширяем массив слов
         else:
-            merged.append(seg.copy())
+            yield cur
+            cur = dict(seg, words=list(seg["words"]))
+    if cur is not None:
+        yield cur
+
+
+def merge_consecutive_speaker_segments(segments, merge_gap_ms=400):
+    """
+    segments  – list[dict] отсортированный по 'abs_start'.
+    Возвращает новый list[dict] с объединёнными репликами.
+    """
+    return list(iter_merge_consecutive_speaker_segments(segments, merge_gap_ms))
 
-    return merged
 
+def iter_track_segments(asr_segments, node, ts_list, gap_ms):
+    """
+    Сегменты одного спикера с abs_start — уже по возрастанию времени.
+    ts_list — SpeechIntervals трека или список меток кадров из лога.
+    """
+    if isinstance(ts_list, SpeechIntervals):
+        gaps_idx = ts_list.gap_frames(gap_ms, FRAME_MS).tolist()
+        to_abs = ts_list.abs_time
+    else:
+        gaps_idx = find_log_gaps(ts_list, gap_ms)      # ① precalc разрывы по логам
+        to_abs = lambda t: abs_time(t, ts_list)
+    for seg in asr_segments:
+        # ② split по log‑gaps + слово‑тайм‑штампы
+        for s in split_segment_by_log(seg, ts_list, gaps_idx, node):
+            # ③ абсолютное время для слияния потоков
+            s["abs_start"] = to_abs(s["start"])
+            yield s
 
-def multi_track(folder, args, gap_ms=2000):
-    model = load_model(args.model, args.language, args.device, args.compute_type)
-    ts_map = get_meeting_event_log(folder)
-
-    all_segments = []
-    for audio in sorted(Path(folder).glob("*.wav")):
-        print("processing audio: ", audio)
-        node = id_from_wav(audio)
-        asr  = transcribe(model, str(audio))
-
-        # ① precalc разрывы по логам
-        gaps_idx = find_log_gaps(ts_map[node], gap_ms)
-
-        for seg in asr["segments"]:
-            # ② split по log‑gaps + слово‑тайм‑штампы
-            new_segs = split_segment_by_log(seg,
-                                             ts_map[node],
-                                             gaps_idx,
-                                             node)
-            for s in new_segs:
-                # ③ абсолютное время для дальнейшей сортировки
-                s["abs_start"] = abs_time(s["start"], ts_map[node])
-                all_segments.append(s)
-
-    all_segments.sort(key=lambda x: x["abs_start"])
-    all_segments = merge_consecutive_speaker_segments(all_segments, merge_gap_ms=400)
-    txt = segments_to_dialogue(all_segments)
-    
-    (Path(folder) / "dialogue.txt").write_text(txt, "utf-8")
+
+def transcribe_tracks_batched(model, tracks, cache, args):
+    """
+    Все треки (кроме найденных в кэше) — одним пакетным прогоном по островкам речи.
+    Возвращает {node: list[dict]} в локальном времени каждого трека.
+    """
+    options = {**TRANSCRIBE_OPTIONS, "batched_islands": True, "language": args.language}
+    result, keys, todo = {}, {}, {}
+    for node, audio in tracks.items():
+        if cache is not None:
+            with prof.stage("asr_cache", node):
+                keys[node] = cache.key(audio, options)
+                cached = cache.get(keys[node])
+            if cached is not None:
+                print(f"→ ASR cache hit: {audio}")
+                prof.add("asr_cache", node, hits=1, audio_s=audio_seconds(audio))
+                result[node] = cached["segments"]
+                continue
+        todo[node] = audio
+    if todo:
+        # декодирование, VAD и ASR всех треков идут одним прогоном — стадия общая
+        with prof.stage("asr_batched", audio_s=sum(audio_seconds(a) for a in todo.values())):
+            batched = transcribe_islands(model, todo, TRANSCRIBE_OPTIONS["vad_parameters"],
+                                         batch_size=args.batch_size, language=args.language)
+        for node, segments in batched.items():
+            prof.add("asr_batched", node, segments=len(segments),
+                     words=sum(len(s["words"]) for s in segments))
+            result[node] = segments
+            if cache is not None:
+                cache.put(keys[node], {"segments": segments, "language": args.language})
+    return result
+
+
+def multi_track(folder, args, gap_ms=2000, merge_gap_ms=400, formats=("txt",)):
+    model = make_asr(args)
+    cache = make_cache(args)
+    tracks = {id_from_wav(audio): audio for audio in sorted(Path(folder).glob("*.wav"))}
+    ts_map = get_meeting_timing(folder, tracks)
+    for node, audio in tracks.items():
+        prof.add(prof.INPUT_STAGE, node, audio_s=audio_seconds(audio))
+    if args.batch_size > 0:
+        asr_streams = transcribe_tracks_batched(model, tracks, cache, args)
+    elif args.columnar:
+        # build_dialogue проходит треки по очереди — генераторы запускаются по одному
+        asr_streams = {node: iter_transcribe(model, str(audio), cache, {"track": node})
+                       for node, audio in tracks.items()}
+    else:
+        # heapq.merge сразу берёт первый сегмент каждого потока: генераторы держали бы
+        # аудио и признаки всех треков одновременно. Поэтому ASR — по треку за раз,
+        # в памяти остаются только dict сегментов, их и сливаем
+        asr_streams = {node: transcribe(model, str(audio), cache, node)["segments"]
+                       for node, audio in tracks.items()}
+
+    origin = min((t for t in map(timeline_origin, ts_map.values()) if t is not None), default=None)
+    labels = load_speaker_labels(folder)            # id → имя из roster.json бота
+    if args.columnar:
+        # сегменты и слова — колонками NumPy вместо dict (segment_table), в dict-вид
+        # реплика превращается только при записи
+        with prof.stage("split_merge"):
+            table = build_dialogue(asr_streams, ts_map, gap_ms, merge_gap_ms, FRAME_MS)
+        prof.add("split_merge", segments=len(table), table_mb=table.nbytes / 2**20)
+        replies = iter(table.relabel(labels))
+    else:
+        streams = []
+        for node, audio in tracks.items():
+            print("processing audio: ", audio)
+            track_segments = iter_track_segments(asr_streams[node], node, ts_map[node], gap_ms)
+            streams.append(prof.timed(track_segments, "split", node, count="segments"))
+
+        # каждый поток отсортирован → k-way merge по куче вместо общей сортировки
+        merged = heapq.merge(*streams, key=lambda x: x["abs_start"])
+        replies = prof.timed(iter_merge_consecutive_speaker_segments(merged, merge_gap_ms),
+                             "merge", count="segments")
+
+    with DialogueWriters(folder, formats, origin) as out:
+        for seg in replies:
+            if not args.columnar:
+                seg["speaker"] = labels.get(seg["speaker"], seg["speaker"])
+            with prof.stage("write"):
+                out.write(seg)
+    close_asr(model)
+    print(f"✓ dialogue saved to {', '.join(map(str, out.paths))}")
+    prof.write(Path(folder) / PROFILE_FILE, profile_meta(args))
 
 # ---------- CLI ----------
 
+def dialogue_formats(value: str) -> list[str]:
+    """--formats: имена через запятую (пробелы допустимы), только из WRITERS."""
+    formats = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in WRITERS]
+    if not formats or unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown format(s) {', '.join(unknown) or repr(value)}; choose from {', '.join(WRITERS)}")
+    return formats
+
+
 if __name__ == "__main__":
     p = argparse.ArgumentParser()
     p.add_argument("--input", help="Файл (один трек) или папка (мульти-трек).",
                    default=r"C:\Users\Evgeniy\Desktop\ss3\zoom_assistant\py-zoom-meeting-sdk\sample_program\out\audio\72611797337_20250714_071633")
                 #    default=r"C:\Users\Evgeniy\Desktop\ss3\zoom_assistant\py-zoom-meeting-sdk\sample_program\out\audio\72611797337_20250714_071633 — копия")
                 #    default=r"C:\Users\Evgeniy\Desktop\meetings\common\meeting_20250704_044000.wav")
-    p.add_argument("--model", default="large")
+    p.add_argument("--model", default=None,
+                   help="Модель Whisper (по умолчанию — из профиля хоста, иначе large).")
     p.add_argument("--language", default="ru")
     p.add_argument("--device", default="cpu")
     p.add_argument("--hf_token", default=None,
                    help="HF token для диаризации.")
-    p.add_argument("--compute_type", default="float32",
-        help="int8 | float32 | int8_float16 | float16 | auto")
+    p.add_argument("--compute_type", default=None,
+        help="int8 | float32 | int8_float16 | float16 | auto (по умолчанию — из профиля хоста, иначе float32)")
+    p.add_argument("--cpu_threads", type=int, default=None,
+                   help="Потоки CTranslate2 (0 — по числу ядер; по умолчанию — из профиля хоста).")
+    p.add_argument("--workers", type=int, default=None,
+                   help="> 1: каждый трек режется по паузам и транскрибируется в N процессах "
+                        "(по умолчанию — из профиля хоста, иначе 1).")
+    p.add_argument("--worker_cpu_threads", type=int, default=None,
+                   help="Потоки CTranslate2 на процесс при --workers > 1 (0 — ядра / workers).")
+    p.add_argument("--chunk_s", type=float, default=120.0,
+                   help="Длина куска параллельного ASR, сек (режется по паузам).")
+    p.add_argument("--no_host_profile", action="store_true",
+                   help="Не подставлять настройки из профиля хоста (--autotune).")
+    p.add_argument("--cache_dir", default=None,
+                   help="Папка кэша ASR; повторный прогон не транскрибирует неизменённые треки.")
+    p.add_argument("--cache_max_mb", type=int, default=2048,
+                   help="Максимальный размер кэша ASR (МБ), старые записи вытесняются.")
+    p.add_argument("--event_log", default=None,
+                   help="JSON-лог бота: спикеры для одного трека берутся из него вместо диаризации.")
+    p.add_argument("--gap_ms", type=int, default=2000,
+                   help="Пауза в логах кадров, по которой режутся сегменты (мульти-трек).")
+    p.add_argument("--merge_gap_ms", type=int, default=400,
+                   help="Максимальный зазор для склейки реплик одного спикера.")
+    p.add_argument("--batch_size", type=int, default=0,
+                   help="> 0: пакетный ASR по островкам речи всех треков (мульти-трек).")
+    p.add_argument("--diar_workers", type=int, default=0,
+                   help="> 0: диаризация одного трека по окнам в N процессах (эмбеддинги кэшируются в --cache_dir).")
+    p.add_argument("--diar_window_s", type=float, default=300.0,
+                   help="Длина окна параллельной диаризации, сек (режется по паузам).")
+    p.add_argument("--diar_threshold", type=float, default=0.7,
+                   help="Порог косинусного расстояния при склейке спикеров окон.")
+    p.add_argument("--formats", type=dialogue_formats, default=["txt"],
+                   help="Форматы диалога (мульти-трек) через запятую: txt,json,srt,vtt.")
+    p.add_argument("--columnar", action="store_true",
+                   help="Мульти-трек: сегменты и слова в колонках NumPy (меньше памяти на длинных встречах).")
+    p.add_argument("--profile", action="store_true",
+                   help="Профиль по стадиям и трекам (wall/CPU/RSS/RTF) в profile.json рядом с диалогом.")
+    p.add_argument("--profiler", choices=("cprofile", "pyinstrument"), default=None,
+                   help="Дополнительно профилировать весь прогон: profile.prof или profile.html.")
+    p.add_argument("--autotune", action="store_true",
+                   help="Замерить конфигурации на образце из --input и сохранить профиль хоста.")
+    p.add_argument("--autotune_models", default=None,
+                   help="Модели-кандидаты через запятую (первая — эталон качества); по умолчанию --model.")
+    p.add_argument("--autotune_compute_types", default=None,
+                   help="compute_type-кандидаты через запятую; по умолчанию все разумные для --device.")
+    p.add_argument("--autotune_workers", default="1,2,4",
+                   help="Числа параллельных процессов ASR для замера.")
+    p.add_argument("--autotune_seconds", type=float, default=60.0,
+                   help="Длительность образца речи, сек.")
+    p.add_argument("--autotune_min_similarity", type=float, default=0.9,
+                   help="Минимальная похожесть текста на эталон, иначе конфигурация отбрасывается.")
+    p.add_argument("--autotune_max_rss_mb", type=float, default=0,
+                   help="> 0: отбрасывать конфигурации с суммарным пиком RSS выше порога.")
     args = p.parse_args()
 
     inp = Path(args.input)
-    if inp.is_dir():
-        multi_track(inp, args)
-    else:
-        single_track(inp, args)
+    if args.autotune:
+        paths = sorted(inp.glob("*.wav")) if inp.is_dir() else [inp]
+        autotune(paths, args, TRANSCRIBE_OPTIONS)
+        raise SystemExit(0)
+    workers_given = args.workers is not None
+    apply_profile(args, {"model": "large", "compute_type": "float32", "cpu_threads": 0,
+                         "workers": 1, "worker_cpu_threads": 0})
+    if args.workers > 1 and args.batch_size > 0:
+        if workers_given:
+            p.error("--workers and --batch_size are alternative ASR modes, choose one")
+        args.workers = 1                        # пакетный режим задан явно — он и работает
+    if args.profile:
+        prof.enable()
+    stem = inp / "profile" if inp.is_dir() else inp.with_suffix(".profile")
+    with prof.profiler(args.profiler, stem):
+        if inp.is_dir():
+            multi_track(inp, args, gap_ms=args.gap_ms, merge_gap_ms=args.merge_gap_ms,
+                        formats=args.formats)
+        else:
+            single_track(inp, args)
@@ -0,0 +1,195 @@
+"""
+Планировщик подписок на видео участников по активному говорящему.
+
+Декодировать видео всех участников в полном разрешении — нагрузка растёт
+линейно с размером встречи. Вместо этого:
+
+* уровень «говорящий» (говорил не позже hold_s назад) — speaker_resolution (720p);
+* уровень «недавний» (говорил не позже recent_s назад) — recent_resolution (90p);
+* остальные — без подписки.
+
+Стоимость подписки считается в «единицах» ~ числу пикселей кадра (90p = 1).
+Цена единицы в долях ядра измеряется по CPU процесса (os.times) за вычетом
+базового CPU (аудио, SDK, GLib — замер на интервалах без подписок на видео),
+и набор подписок урезается (понижение уровня, затем отписка — с наименее
+приоритетных), чтобы оставаться в cpu_budget. Замер на немногих единицах
+(только 90p) может цену лишь понизить: остаток неучтённого постоянного CPU,
+делённый на 1–2 единицы, иначе навсегда закрыл бы уровень 720p.
+
+    scheduler = VideoScheduler(on_frame)
+    scheduler.on_active_speakers(user_ids)     # из on_user_active_audio_change_callback
+    GLib.timeout_add_seconds(2, scheduler.tick)
+"""
+import os
+import time
+from dataclasses import dataclass, field
+
+import zoom_meeting_sdk as zoom
+
+RESOLUTION_COST = {
+    zoom.ZoomSDKResolution_90P: 1,
+    zoom.ZoomSDKResolution_180P: 4,
+    zoom.ZoomSDKResolution_360P: 16,
+    zoom.ZoomSDKResolution_720P: 64,
+    zoom.ZoomSDKResolution_1080P: 144,
+}
+CPU_PER_UNIT_GUESS = 0.004     # долей ядра на единицу до первых замеров: 720p ≈ 0.25 ядра
+CPU_PER_UNIT_MIN = CPU_PER_UNIT_GUESS / 10
+CPU_PER_UNIT_MAX = CPU_PER_UNIT_GUESS * 4
+MIN_SAMPLE_UNITS = 16           # с меньшего числа единиц цена может только снижаться
+EWMA_ALPHA = 0.3
+
+
+@dataclass
+class Subscription:
+    user_id: int
+    resolution: object
+    delegate: object
+    renderer: object
+    frames: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+
+class VideoScheduler:
+    def __init__(self, on_frame, my_user_id=None, is_video_on=None,
+                 speaker_resolution=zoom.ZoomSDKResolution_720P,
+                 recent_resolution=zoom.ZoomSDKResolution_90P,
+                 hold_s=3.0, recent_s=30.0, max_speakers=2, max_recent=6,
+                 cpu_budget=0.5):
+        """
+        on_frame(user_id, YUVRawDataI420) — обработчик кадров;
+        is_video_on(user_id) -> bool — необязательный фильтр по участникам;
+        cpu_budget — доля одного ядра, которую можно отдать под видео.
+        """
+        self.on_frame = on_frame
+        self.my_user_id = my_user_id
+        self.is_video_on = is_video_on
+        self.speaker_resolution = speaker_resolution
+        self.recent_resolution = recent_resolution
+        self.hold_s = hold_s
+        self.recent_s = recent_s
+        self.max_speakers = max_speakers
+        self.max_recent = max_recent
+        self.cpu_budget = cpu_budget
+
+        self.last_spoke: dict[int, float] = {}
+        self.subscriptions: dict[int, Subscription] = {}
+        self.cpu_per_unit = CPU_PER_UNIT_GUESS
+        self.baseline_cpu = 0.0                  # долей ядра без видео (EWMA)
+        self._last_cpu = None
+
+    # ---------- события встречи ----------
+
+    def on_active_speakers(self, user_ids):
+        now = time.monotonic()
+        for user_id in user_ids:
+            if user_id != self.my_user_id:
+                self.last_spoke[user_id] = now
+        self.rebalance()
+
+    def on_user_left(self, user_ids):
+        for user_id in user_ids:
+            self.last_spoke.pop(user_id, None)
+            self._unsubscribe(user_id)
+
+    # ---------- политика ----------
+
+    def units(self, plan=None) -> int:
+        plan = plan if plan is not None else {u: s.resolution for u, s in self.subscriptions.items()}
+        return sum(RESOLUTION_COST[r] for r in plan.values())
+
+    def plan(self, now=None) -> dict:
+        """{user_id: resolution} — желаемые подписки с учётом уровней и бюджета."""
+        now = now if now is not None else time.monotonic()
+        ranked = sorted(self.last_spoke.items(), key=lambda kv: kv[1], reverse=True)
+        ranked = [(u, now - t) for u, t in ranked if now - t <= self.recent_s]
+        if self.is_video_on:
+            ranked = [(u, age) for u, age in ranked if self.is_video_on(u)]
+
+        plan = {}
+        speakers = 0
+        for user_id, age in ranked:
+            if age <= self.hold_s and speakers < self.max_speakers:
+                plan[user_id] = self.speaker_resolution
+                speakers += 1
+            elif len(plan) - speakers < self.max_recent:
+                plan[user_id] = self.recent_resolution
+
+        # бюджет: с конца списка (наименее приоритетные) понижаем, потом отписываем;
+        # главного говорящего оставляем всегда, хотя бы в низком разрешении
+        budget_units = self.cpu_budget / self.cpu_per_unit
+        for user_id, _ in reversed(ranked):
+            if self.units(plan) <= budget_units:
+                break
+            if plan.get(user_id) == self.speaker_resolution:
+                plan[user_id] = self.recent_resolution
+        for user_id, _ in reversed(ranked):
+            if self.units(plan) <= budget_units or len(plan) <= 1:
+                break
+            plan.pop(user_id, None)
+        return plan
+
+    def rebalance(self):
+        plan = self.plan()
+        for user_id in list(self.subscriptions):
+            if user_id not in plan:
+                self._unsubscribe(user_id)
+        for user_id, resolution in plan.items():
+            sub = self.subscriptions.get(user_id)
+            if sub is None:
+                self._subscribe(user_id, resolution)
+            elif sub.resolution != resolution:
+                sub.renderer.setRawDataResolution(resolution)
+                sub.resolution = resolution
+
+    def tick(self):
+        """Периодически (GLib timeout): замер CPU, истечение уровней. Возвращает True."""
+        t = os.times()
+        cpu, wall = t.user + t.system, t.elapsed
+        units = self.units()
+        if self._last_cpu is not None and wall > self._last_cpu[1]:
+            used = (cpu - self._last_cpu[0]) / (wall - self._last_cpu[1])
+            if units == 0:
+                self.baseline_cpu += EWMA_ALPHA * (used - self.baseline_cpu)
+            else:
+                sample = min(max((used - self.baseline_cpu) / units, CPU_PER_UNIT_MIN),
+                             CPU_PER_UNIT_MAX)
+                if units < MIN_SAMPLE_UNITS:
+                    sample = min(sample, self.cpu_per_unit)
+                self.cpu_per_unit += EWMA_ALPHA * (sample - self.cpu_per_unit)
+        self._last_cpu = (cpu, wall)
+        self.rebalance()
+        return True
+
+    # ---------- подписки ----------
+
+    def _subscribe(self, user_id, resolution):
+        def on_frame(data):
+            sub.frames += 1
+            self.on_frame(user_id, data)
+
+        delegate = zoom.ZoomSDKRendererDelegateCallbacks(onRawDataFrameReceivedCallback=on_frame)
+        try:
+            renderer = zoom.createRenderer(delegate)
+        except RuntimeError as e:
+            print(f"video: createRenderer for {user_id} failed: {e}")
+            return
+        renderer.setRawDataResolution(resolution)
+        sub = Subscription(user_id, resolution, delegate, renderer)
+        result = renderer.subscribe(user_id, zoom.RAW_DATA_TYPE_VIDEO)
+        if result != zoom.SDKERR_SUCCESS:
+            print(f"video: subscribe {user_id} failed: {result}")
+            zoom.destroyRenderer(renderer)
+            return
+        self.subscriptions[user_id] = sub
+
+    def _unsubscribe(self, user_id):
+        sub = self.subscriptions.pop(user_id, None)
+        if sub is None:
+            return
+        sub.renderer.unSubscribe()
+        zoom.destroyRenderer(sub.renderer)
+
+    def close(self):
+        for user_id in list(self.subscriptions):
+            self._unsubscribe(user_id)
@@ -0,0 +1,53 @@
+"""
+Запись треков бота в WAV в формате захвата: s16 (PCM) или f32 (IEEE float).
+
+Модуль wave умеет только PCM, для f32 заголовок пишется вручную. Размеры в
+заголовке обновляются при close(); если бот упал, audio_io.wav_info всё
+равно прочитает файл (size = 0 → до конца файла).
+"""
+import struct
+import wave
+
+WAVE_FORMAT_IEEE_FLOAT = 3
+
+
+class FloatWavWriter:
+    def __init__(self, path, rate, channels=1):
+        self.f = open(path, "wb")
+        self.rate = rate
+        self.channels = channels
+        self.data_bytes = 0
+        self._write_header()
+
+    def _write_header(self):
+        block_align = 4 * self.channels
+        self.f.write(struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + self.data_bytes, b"WAVE",
+            b"fmt ", 16, WAVE_FORMAT_IEEE_FLOAT, self.channels, self.rate,
+            self.rate * block_align, block_align, 32,
+            b"data", self.data_bytes))
+
+    def writeframes(self, data):
+        self.f.write(data)
+        self.data_bytes += len(data)
+
+    def close(self):
+        if self.f.closed:
+            return
+        self.f.seek(0)
+        self._write_header()
+        self.f.close()
+
+
+def open_track(path, rate, sample_format="s16"):
+    """Объект с writeframes()/close() для моно-трека rate Гц в sample_format."""
+    if sample_format == "f32":
+        return FloatWavWriter(path, rate)
+    if sample_format != "s16":
+        raise ValueError(f"unsupported sample format: {sample_format}")
+    wav = wave.open(str(path), "wb")
+    wav.setnchannels(1)
+    wav.setsampwidth(2)
+    wav.setframerate(rate)
+    return wav
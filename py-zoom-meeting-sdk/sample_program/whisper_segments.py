@@ -0,0 +1,23 @@
+"""
+Сегменты faster-whisper → dict (формат faster-whisper/WhisperX).
+
+Без импортов whisperx/faster_whisper: модуль нужен и transcribe_zoom, и
+процессам пула parallel_asr.
+"""
+
+
+def segment_to_dict(seg) -> dict:
+    """faster-whisper Segment → dict в формате faster-whisper/WhisperX."""
+    return {
+        "id":    seg.id,
+        "start": seg.start,
+        "end":   seg.end,
+        "text":  seg.text,
+        "words": [
+            {
+                "start": w.start,
+                "end":   w.end,
+                "text":  w.word
+            } for w in (seg.words or [])
+        ],
+    }
@@ -0,0 +1,43 @@
+"""
+Разбор ссылок Zoom — без зависимостей (gi, dotenv), чтобы его могли
+импортировать и sample.py, и bot_supervisor.
+"""
+from typing import Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+
+def parse_zoom_link(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Извлекает ID конференции Zoom и секрет (pwd) из переданной ссылки.
+
+    Параметры
+    ----------
+    url : str
+        Ссылка вида https://…zoom.us/j/<MEETING_ID>?pwd=<SECRET>
+
+    Возвращает
+    ----------
+    Tuple[str | None, str | None]
+        (meeting_id, secret).  Если что-то не найдено, на этом месте будет None.
+    """
+    parsed = urlparse(url)
+
+    # ---------- ID конференции ----------
+    meeting_id = None
+    # Преобразуем путь '/j/83053648874' → ['j', '83053648874']
+    parts = [p for p in parsed.path.split('/') if p]
+    if 'j' in parts:                           # классический формат /j/<ID>
+        j_idx = parts.index('j')
+        if len(parts) > j_idx + 1:
+            meeting_id = parts[j_idx + 1]
+    elif parts and parts[0].isdigit():         # reserve: /<ID> без /j/
+        meeting_id = parts[0]
+
+    # ---------- Секрет (pwd) ----------
+    query = parse_qs(parsed.query)
+    secret = query.get('pwd', [None])[0]       # в большинстве случаев
+    # иногда встречается ?passcode=…
+    if secret is None:
+        secret = query.get('passcode', [None])[0]
+
+    return meeting_id, secret
@@ -0,0 +1,49 @@
+"""Measure how Python callback handlers scale across native (SDK-like) threads.
+
+    python scripts/benchmark_callback_threads.py --threads 1 2 4 8
+
+Each native thread calls a CPU-bound handler the way SDK threads call audio
+and video callbacks. With the GIL, throughput stays flat as threads are added;
+on a free-threaded build (python3.13t / 3.14t) it should grow with the number
+of cores.
+"""
+
+import argparse
+import sys
+
+import zoom_meeting_sdk as zoom
+
+
+def make_handler(work):
+    frame = bytes(range(256)) * 8       # ~ one 10 ms 32 kHz mono int16 frame
+
+    def handler(thread_index):
+        acc = 0
+        for _ in range(work):
+            acc += sum(frame[::64])
+        return acc
+
+    return handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--calls", type=int, default=2000, help="calls per thread")
+    parser.add_argument("--work", type=int, default=20, help="handler work units per call")
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    handler = make_handler(args.work)
+
+    base = None
+    for threads in args.threads:
+        elapsed = zoom.benchmarkCallbackDispatch(handler, threads, args.calls)
+        rate = threads * args.calls / elapsed
+        base = base or rate
+        print(f"{threads:3d} threads: {rate:10.0f} calls/s  x{rate / base:.2f}")
+
+
+if __name__ == "__main__":
+    main()
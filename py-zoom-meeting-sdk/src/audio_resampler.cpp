@@ -0,0 +1,199 @@
+#include <nanobind/nanobind.h>
+#include <nanobind/stl/string.h>
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <mutex>
+#include <numeric>
+#include <stdexcept>
+
+#include "audio_resampler.h"
+
+namespace nb = nanobind;
+using namespace std;
+
+SampleFormat parseSampleFormat(const std::string& name) {
+    if (name == "s16")
+        return SampleFormat::S16;
+    if (name == "f32")
+        return SampleFormat::F32;
+    throw std::invalid_argument("sample format must be 's16' or 'f32', got '" + name + "'");
+}
+
+const char* sampleFormatName(SampleFormat format) {
+    return format == SampleFormat::F32 ? "f32" : "s16";
+}
+
+uint32_t bytesPerSample(SampleFormat format) {
+    return format == SampleFormat::F32 ? 4 : 2;
+}
+
+// Modified Bessel function of the first kind, order 0 (for the Kaiser window)
+static double besselI0(double x) {
+    double sum = 1.0, term = 1.0, half = x / 2.0;
+    for (int k = 1; k < 64; k++) {
+        term *= (half / k) * (half / k);
+        sum += term;
+        if (term < sum * 1e-12)
+            break;
+    }
+    return sum;
+}
+
+static int64_t floorDiv(int64_t a, int64_t b) {
+    int64_t q = a / b;
+    return (a % b != 0 && ((a < 0) != (b < 0))) ? q - 1 : q;
+}
+
+PolyphaseResampler::PolyphaseResampler(uint32_t srcRate, uint32_t dstRate, int zeroCrossings, double beta)
+    : m_srcRate(srcRate), m_dstRate(dstRate), m_produced(0) {
+    if (srcRate == 0 || dstRate == 0)
+        throw std::invalid_argument("sample rates must be positive");
+    int64_t g = std::gcd((int64_t)srcRate, (int64_t)dstRate);
+    m_up = dstRate / g;
+    m_down = srcRate / g;
+    int64_t factor = std::max(m_up, m_down);
+    int64_t half = zeroCrossings * factor;
+    int64_t length = 2 * half + 1;
+    double cutoff = 0.5 / factor;
+
+    vector<double> h(length);
+    double i0Beta = besselI0(beta);
+    for (int64_t i = 0; i < length; i++) {
+        double n = (double)(i - half);
+        double x = 2.0 * cutoff * n;
+        double sinc = x == 0.0 ? 1.0 : std::sin(M_PI * x) / (M_PI * x);
+        double r = 2.0 * i / (length - 1) - 1.0;
+        double window = besselI0(beta * std::sqrt(std::max(0.0, 1.0 - r * r))) / i0Beta;
+        h[i] = 2.0 * cutoff * sinc * window * m_up;
+    }
+
+    m_center = half;
+    m_taps = (length + m_up - 1) / m_up;
+    h.resize(m_taps * m_up, 0.0);
+    // m_phases[p][j] multiplies x[base - taps + 1 + j]
+    m_phases.resize(m_up * m_taps);
+    for (int64_t p = 0; p < m_up; p++)
+        for (int64_t j = 0; j < m_taps; j++)
+            m_phases[p * m_taps + j] = (float)h[(m_taps - 1 - j) * m_up + p];
+
+    reset();
+}
+
+void PolyphaseResampler::reset() {
+    m_buffer.assign(m_taps - 1, 0.0f);
+    m_bufferStart = -(m_taps - 1);
+    m_produced = 0;
+}
+
+// Appends outputs m_produced..nMax; all their taps must be in m_buffer.
+void PolyphaseResampler::produce(std::vector<float>& out, int64_t nMax) {
+    if (nMax < m_produced)
+        return;
+    out.reserve(out.size() + (nMax - m_produced + 1));
+    for (int64_t n = m_produced; n <= nMax; n++) {
+        int64_t t = n * m_down + m_center;
+        int64_t base = t / m_up;
+        const float* x = m_buffer.data() + (base - (m_taps - 1) - m_bufferStart);
+        const float* c = m_phases.data() + (t % m_up) * m_taps;
+        float acc = 0.0f;
+        for (int64_t j = 0; j < m_taps; j++)
+            acc += x[j] * c[j];
+        out.push_back(acc);
+    }
+    m_produced = nMax + 1;
+}
+
+void PolyphaseResampler::process(const int16_t* in, size_t frames, uint32_t channels, std::vector<float>& out) {
+    if (channels == 0)
+        channels = 1;
+    size_t old = m_buffer.size();
+    m_buffer.resize(old + frames);
+    const float scale = 1.0f / (32768.0f * channels);
+    for (size_t i = 0; i < frames; i++) {
+        int32_t sum = 0;
+        for (uint32_t c = 0; c < channels; c++)
+            sum += in[i * channels + c];
+        m_buffer[old + i] = sum * scale;
+    }
+
+    int64_t bufferEnd = m_bufferStart + (int64_t)m_buffer.size();
+    produce(out, floorDiv((bufferEnd - 1) * m_up - m_center, m_down));
+
+    size_t keep = (size_t)(m_taps - 1);
+    if (m_buffer.size() > keep) {
+        m_buffer.erase(m_buffer.begin(), m_buffer.end() - keep);
+        m_bufferStart = bufferEnd - (int64_t)keep;
+    }
+}
+
+void PolyphaseResampler::flush(std::vector<float>& out) {
+    // outputs whose time n / dstRate falls before the end of the input
+    int64_t inputEnd = m_bufferStart + (int64_t)m_buffer.size();
+    int64_t total = (inputEnd * m_up + m_down - 1) / m_down;
+    if (total > m_produced) {
+        int64_t lastTap = ((total - 1) * m_down + m_center) / m_up;
+        m_buffer.resize(m_buffer.size() + std::max<int64_t>(lastTap + 1 - inputEnd, 0), 0.0f);
+        produce(out, total - 1);
+    }
+    reset();
+}
+
+void encodeSamples(const std::vector<float>& samples, SampleFormat format, std::string& out) {
+    size_t old = out.size();
+    if (format == SampleFormat::F32) {
+        out.resize(old + samples.size() * sizeof(float));
+        std::memcpy(&out[old], samples.data(), samples.size() * sizeof(float));
+        return;
+    }
+    out.resize(old + samples.size() * sizeof(int16_t));
+    int16_t* dst = reinterpret_cast<int16_t*>(&out[old]);
+    for (size_t i = 0; i < samples.size(); i++) {
+        float v = std::nearbyint(samples[i] * 32768.0f);
+        dst[i] = (int16_t)std::min(32767.0f, std::max(-32768.0f, v));
+    }
+}
+
+// Python-facing resampler: the GIL is released while filtering, so calls from
+// several threads on one object are serialized by its own mutex.
+struct LockedResampler {
+    LockedResampler(uint32_t srcRate, uint32_t dstRate) : resampler(srcRate, dstRate) {}
+
+    PolyphaseResampler resampler;
+    std::mutex lock;
+};
+
+void init_audio_resampler(nb::module_ &m) {
+    nb::class_<LockedResampler>(m, "AudioResampler")
+        .def(nb::init<uint32_t, uint32_t>(), nb::arg("srcRate"), nb::arg("dstRate"))
+        .def_prop_ro("srcRate", [](LockedResampler& self) { return self.resampler.srcRate(); })
+        .def_prop_ro("dstRate", [](LockedResampler& self) { return self.resampler.dstRate(); })
+        .def("process", [](LockedResampler& self, nb::bytes pcm16, uint32_t channels, const std::string& sampleFormat) {
+            SampleFormat format = parseSampleFormat(sampleFormat);
+            std::vector<float> samples;
+            std::string out;
+            {
+                nb::gil_scoped_release release;
+                std::lock_guard<std::mutex> lockGuard(self.lock);
+                self.resampler.process(reinterpret_cast<const int16_t*>(pcm16.c_str()),
+                                       pcm16.size() / (sizeof(int16_t) * std::max(channels, 1u)), channels, samples);
+                encodeSamples(samples, format, out);
+            }
+            return nb::bytes(out.data(), out.size());
+        }, nb::arg("pcm16"), nb::arg("channels") = 1, nb::arg("sampleFormat") = "s16",
+        "Resamples interleaved int16 PCM, returns mono samples in sampleFormat ('s16' or 'f32')")
+        .def("flush", [](LockedResampler& self, const std::string& sampleFormat) {
+            SampleFormat format = parseSampleFormat(sampleFormat);
+            std::vector<float> samples;
+            std::string out;
+            {
+                nb::gil_scoped_release release;
+                std::lock_guard<std::mutex> lockGuard(self.lock);
+                self.resampler.flush(samples);
+                encodeSamples(samples, format, out);
+            }
+            return nb::bytes(out.data(), out.size());
+        }, nb::arg("sampleFormat") = "s16",
+        "Returns the samples held back by the filter delay and resets the stream");
+}
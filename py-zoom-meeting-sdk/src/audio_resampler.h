@@ -0,0 +1,54 @@
+#ifndef AUDIO_RESAMPLER_H
+#define AUDIO_RESAMPLER_H
+
+#include <cstdint>
+#include <string>
+#include <vector>
+
+enum class SampleFormat {
+    S16,
+    F32
+};
+
+SampleFormat parseSampleFormat(const std::string& name);
+const char* sampleFormatName(SampleFormat format);
+uint32_t bytesPerSample(SampleFormat format);
+
+// Streaming polyphase resampler srcRate -> dstRate (rational up/down), Kaiser-windowed
+// sinc. The filter delay is compensated, so output sample n corresponds to input
+// time n / dstRate. Coefficients are stored per phase contiguously, so the inner
+// loop is a plain dot product the compiler can vectorize.
+class PolyphaseResampler {
+public:
+    PolyphaseResampler(uint32_t srcRate, uint32_t dstRate, int zeroCrossings = 16, double beta = 8.0);
+
+    uint32_t srcRate() const { return m_srcRate; }
+    uint32_t dstRate() const { return m_dstRate; }
+
+    // Interleaved int16 in (downmixed to mono), mono samples appended to `out`.
+    void process(const int16_t* in, size_t frames, uint32_t channels, std::vector<float>& out);
+
+    // Ends the stream: appends the outputs still held back by the filter delay
+    // (input is zero-padded past its end), then resets to the initial state.
+    void flush(std::vector<float>& out);
+
+private:
+    void produce(std::vector<float>& out, int64_t nMax);
+    void reset();
+
+    uint32_t m_srcRate;
+    uint32_t m_dstRate;
+    int64_t m_up;
+    int64_t m_down;
+    int64_t m_center;
+    int64_t m_taps;
+    std::vector<float> m_phases;      // m_up rows of m_taps coefficients
+    std::vector<float> m_buffer;      // history (m_taps - 1) + current input
+    int64_t m_bufferStart;            // global input index of m_buffer[0]
+    int64_t m_produced;
+};
+
+// Encodes mono float samples as `format` and appends the bytes to `out`.
+void encodeSamples(const std::vector<float>& samples, SampleFormat format, std::string& out);
+
+#endif
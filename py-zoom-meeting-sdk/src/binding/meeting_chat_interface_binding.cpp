@@ -14,6 +14,31 @@ namespace nb = nanobind;
 using namespace std;
 using namespace ZOOMSDK;
 
+static string chatString(const zchar_t* value) {
+    return value ? value : "";
+}
+
+// One message as a plain dict in a single call: the bot logs every field, and
+// per-getter calls across the binding add up during chat bursts on the SDK thread.
+static nb::dict chatMsgSnapshot(IChatMsgInfo& self) {
+    nb::dict d;
+    d["message_id"] = chatString(self.GetMessageID());
+    d["sender_id"] = self.GetSenderUserId();
+    d["sender_name"] = chatString(self.GetSenderDisplayName());
+    d["receiver_id"] = self.GetReceiverUserId();
+    d["receiver_name"] = chatString(self.GetReceiverDisplayName());
+    d["content"] = chatString(self.GetContent());
+    d["timestamp"] = static_cast<int64_t>(self.GetTimeStamp());
+    d["message_type"] = static_cast<int>(self.GetChatMessageType());
+    d["to_all"] = self.IsChatToAll();
+    d["to_all_panelist"] = self.IsChatToAllPanelist();
+    d["to_waiting_room"] = self.IsChatToWaitingroom();
+    d["is_comment"] = self.IsComment();
+    d["is_thread"] = self.IsThread();
+    d["thread_id"] = chatString(self.GetThreadID());
+    return d;
+}
+
 void init_meeting_chat_interface_binding(nb::module_ &m) {
     nb::enum_<SDKChatMessageType>(m, "SDKChatMessageType")
         .value("To_None", SDKChatMessageType_To_None)
@@ -23,6 +48,12 @@ void init_meeting_chat_interface_binding(nb::module_ &m) {
         .value("To_Individual", SDKChatMessageType_To_Individual)
         .value("To_WaitingRoomUsers", SDKChatMessageType_To_WaitingRoomUsers);
 
+    nb::enum_<SDKChatMessageDeleteType>(m, "SDKChatMessageDeleteType")
+        .value("SDK_CHAT_DELETE_BY_NONE", SDK_CHAT_DELETE_BY_NONE)
+        .value("SDK_CHAT_DELETE_BY_SELF", SDK_CHAT_DELETE_BY_SELF)
+        .value("SDK_CHAT_DELETE_BY_HOST", SDK_CHAT_DELETE_BY_HOST)
+        .value("SDK_CHAT_DELETE_BY_DLP", SDK_CHAT_DELETE_BY_DLP);
+
     nb::enum_<RichTextStyle>(m, "RichTextStyle")
         .value("None", TextStyle_None)
         .value("Bold", TextStyle_Bold)
@@ -84,6 +115,10 @@ void init_meeting_chat_interface_binding(nb::module_ &m) {
         .def("IsComment", &IChatMsgInfo::IsComment)
         .def("IsThread", &IChatMsgInfo::IsThread)
         .def("GetThreadID", &IChatMsgInfo::GetThreadID)
+        .def("Snapshot", &chatMsgSnapshot,
+             "All message fields as a dict (message_id, sender_id, sender_name, receiver_id, receiver_name, "
+             "content, timestamp, message_type, to_all, to_all_panelist, to_waiting_room, is_comment, "
+             "is_thread, thread_id)")
         .def("GetTextStyleItemList", [](IChatMsgInfo& self) {
             IList<IRichTextStyleItem*>* list = self.GetTextStyleItemList();
             vector<IRichTextStyleItem*> result;
@@ -42,7 +42,66 @@ namespace nb = nanobind;
 using namespace std;
 using namespace ZOOMSDK;
 
+// Whole roster in one call, column per field (struct of arrays). Filled without the GIL,
+// so Python pays one crossing instead of GetUserByUserID + several getters per user.
+struct ParticipantRoster {
+    vector<unsigned int> userId;
+    vector<string> userName;
+    vector<string> persistentId;
+    vector<int> role;
+    vector<bool> isHost;
+    vector<bool> isMySelf;
+    vector<bool> isAudioMuted;
+    vector<bool> isVideoOn;
+    vector<bool> isInWaitingRoom;
+    vector<bool> isPurePhoneUser;
+};
+
+static ParticipantRoster getParticipantsRoster(IMeetingParticipantsController& self) {
+    ParticipantRoster roster;
+    IList<unsigned int>* list = self.GetParticipantsList();
+    if (!list)
+        return roster;
+    int count = list->GetCount();
+    roster.userId.reserve(count);
+    roster.userName.reserve(count);
+    roster.persistentId.reserve(count);
+    roster.role.reserve(count);
+    for (int i = 0; i < count; i++) {
+        unsigned int userId = list->GetItem(i);
+        IUserInfo* user = self.GetUserByUserID(userId);
+        if (!user)
+            continue;
+        const zchar_t* name = user->GetUserName();
+        const zchar_t* persistentId = user->GetPersistentId();
+        roster.userId.push_back(userId);
+        roster.userName.push_back(name ? name : "");
+        roster.persistentId.push_back(persistentId ? persistentId : "");
+        roster.role.push_back(static_cast<int>(user->GetUserRole()));
+        roster.isHost.push_back(user->IsHost());
+        roster.isMySelf.push_back(user->IsMySelf());
+        roster.isAudioMuted.push_back(user->IsAudioMuted());
+        roster.isVideoOn.push_back(user->IsVideoOn());
+        roster.isInWaitingRoom.push_back(user->IsInWaitingRoom());
+        roster.isPurePhoneUser.push_back(user->IsPurePhoneUser());
+    }
+    return roster;
+}
+
 void init_meeting_participants_ctrl_interface_binding(nb::module_ &m) {
+    nb::class_<ParticipantRoster>(m, "ParticipantRoster")
+        .def_ro("userId", &ParticipantRoster::userId)
+        .def_ro("userName", &ParticipantRoster::userName)
+        .def_ro("persistentId", &ParticipantRoster::persistentId)
+        .def_ro("role", &ParticipantRoster::role)
+        .def_ro("isHost", &ParticipantRoster::isHost)
+        .def_ro("isMySelf", &ParticipantRoster::isMySelf)
+        .def_ro("isAudioMuted", &ParticipantRoster::isAudioMuted)
+        .def_ro("isVideoOn", &ParticipantRoster::isVideoOn)
+        .def_ro("isInWaitingRoom", &ParticipantRoster::isInWaitingRoom)
+        .def_ro("isPurePhoneUser", &ParticipantRoster::isPurePhoneUser)
+        .def("__len__", [](const ParticipantRoster& self) { return self.userId.size(); });
+
     nb::enum_<ZOOM_SDK_NAMESPACE::UserRole>(m, "UserRole")
         .value("USERROLE_NONE", ZOOM_SDK_NAMESPACE::USERROLE_NONE)
         .value("USERROLE_HOST", ZOOM_SDK_NAMESPACE::USERROLE_HOST)
@@ -90,6 +149,8 @@ void init_meeting_participants_ctrl_interface_binding(nb::module_ &m) {
             }
             return result;
         }, "Returns a list of participant user IDs in the meeting")
+        .def("GetParticipantsRoster", &getParticipantsRoster, nb::call_guard<nb::gil_scoped_release>(),
+            "Returns ids, names, roles and audio/video state of all participants as columns")
         .def("GetUserByUserID", &IMeetingParticipantsController::GetUserByUserID, nb::rv_policy::reference)
         .def("GetMySelfUser", &IMeetingParticipantsController::GetMySelfUser, nb::rv_policy::reference)
         .def("LowerAllHands", &IMeetingParticipantsController::LowerAllHands)
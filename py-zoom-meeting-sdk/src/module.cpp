@@ -35,6 +35,8 @@ void init_meeting_participants_ctrl_event_callbacks(nb::module_ &);
 void init_zoom_sdk_video_source_callbacks(nb::module_ &);
 void init_zoom_sdk_share_source_callbacks(nb::module_ &);
 void init_utilities(nb::module_ &);
+void init_audio_resampler(nb::module_ &);
+void init_video_frame_pool(nb::module_ &);
 
 NB_MODULE(_zoom_meeting_sdk_impl, m) {
     m.doc() = "Python bindings for Zoom Meeting SDK";
@@ -75,4 +77,6 @@ NB_MODULE(_zoom_meeting_sdk_impl, m) {
     init_zoom_sdk_share_source_callbacks(m);
 
     init_utilities(m);
+    init_audio_resampler(m);
+    init_video_frame_pool(m);
 }
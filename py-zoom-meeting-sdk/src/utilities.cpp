@@ -9,6 +9,15 @@
 #include <memory>
 #include <mutex>
 #include <vector>
+#include <thread>
+#include <atomic>
+#include <exception>
+#include <chrono>
+
+#include <sys/eventfd.h>
+#include <unistd.h>
+#include <cerrno>
+#include <stdexcept>
 
 #include "utilities.h"
 
@@ -25,14 +34,17 @@ CallbackPerformanceData::CallbackPerformanceData()
       processingTimeBinMax(20000),
       processingTimeBinMin(0) {}
 
+// Copies are taken while SDK threads may still be updating `other`, so read it under its lock
 CallbackPerformanceData::CallbackPerformanceData(const CallbackPerformanceData& other) 
-    : totalProcessingTimeMicroseconds(other.totalProcessingTimeMicroseconds),
-      numCalls(other.numCalls),
-      maxProcessingTimeMicroseconds(other.maxProcessingTimeMicroseconds),
-      minProcessingTimeMicroseconds(other.minProcessingTimeMicroseconds),
-      processingTimeBinCounts(other.processingTimeBinCounts),
-      processingTimeBinMax(other.processingTimeBinMax),
-      processingTimeBinMin(other.processingTimeBinMin) {}
+    : processingTimeBinMax(other.processingTimeBinMax),
+      processingTimeBinMin(other.processingTimeBinMin) {
+    std::lock_guard<std::mutex> lockGuard(other.lock);
+    totalProcessingTimeMicroseconds = other.totalProcessingTimeMicroseconds;
+    numCalls = other.numCalls;
+    maxProcessingTimeMicroseconds = other.maxProcessingTimeMicroseconds;
+    minProcessingTimeMicroseconds = other.minProcessingTimeMicroseconds;
+    processingTimeBinCounts = other.processingTimeBinCounts;
+}
 
 void CallbackPerformanceData::updatePerformanceData(uint64_t processingTimeMicroseconds) {
     std::lock_guard<std::mutex> lockGuard(lock);
@@ -50,7 +62,79 @@ void CallbackPerformanceData::updatePerformanceData(uint64_t processingTimeMicro
         minProcessingTimeMicroseconds = processingTimeMicroseconds;
 }
 
+EventNotifier::EventNotifier()
+    : m_fd(eventfd(0, EFD_NONBLOCK | EFD_CLOEXEC)) {
+    if (m_fd < 0)
+        throw std::runtime_error("eventfd() failed");
+}
+
+EventNotifier::~EventNotifier() {
+    if (m_fd >= 0)
+        close(m_fd);
+}
+
+int EventNotifier::fd() const {
+    return m_fd;
+}
+
+void EventNotifier::notify() {
+    uint64_t one = 1;
+    // EAGAIN means the counter is saturated, the reader is already due to wake up
+    while (write(m_fd, &one, sizeof(one)) < 0 && errno == EINTR) {}
+}
+
+uint64_t EventNotifier::drain() {
+    uint64_t value = 0;
+    while (read(m_fd, &value, sizeof(value)) < 0) {
+        if (errno != EINTR)
+            return 0;
+    }
+    return value;
+}
+
+double benchmarkCallbackDispatch(const function<void(uint32_t)>& callback, uint32_t threads, uint32_t callsPerThread) {
+    std::vector<std::thread> workers;
+    // an exception escaping a std::thread calls std::terminate: the first one
+    // raised by the handler is kept and rethrown once the GIL is held again
+    std::mutex errorLock;
+    std::exception_ptr error;
+    std::atomic<bool> failed{false};
+    auto start = std::chrono::steady_clock::now();
+    {
+        // the workers take the GIL (or attach to the interpreter) on every call, like SDK threads do
+        nb::gil_scoped_release release;
+        for (uint32_t i = 0; i < threads; i++) {
+            workers.emplace_back([&, i]() {
+                try {
+                    for (uint32_t n = 0; n < callsPerThread && !failed.load(std::memory_order_relaxed); n++)
+                        callback(i);
+                } catch (...) {
+                    std::lock_guard<std::mutex> lockGuard(errorLock);
+                    if (!error)
+                        error = std::current_exception();
+                    failed = true;
+                }
+            });
+        }
+        for (auto& worker : workers)
+            worker.join();
+    }
+    if (error)
+        std::rethrow_exception(error);
+    auto end = std::chrono::steady_clock::now();
+    return std::chrono::duration<double>(end - start).count();
+}
+
 void init_utilities(nb::module_ &m) {
+    m.def("benchmarkCallbackDispatch", &benchmarkCallbackDispatch,
+        nb::arg("callback"), nb::arg("threads"), nb::arg("callsPerThread"));
+
+    nb::class_<EventNotifier>(m, "EventNotifier")
+        .def(nb::init<>())
+        .def("fileno", &EventNotifier::fd)
+        .def("notify", &EventNotifier::notify)
+        .def("drain", &EventNotifier::drain);
+
     nb::class_<CallbackPerformanceData>(m, "CallbackPerformanceData")        
         .def_ro("totalProcessingTimeMicroseconds", &CallbackPerformanceData::totalProcessingTimeMicroseconds)
         .def_ro("numCalls", &CallbackPerformanceData::numCalls)
@@ -12,6 +12,7 @@
 #include <memory>
 #include <mutex>
 #include <vector>
+#include <cstdint>
 
 namespace nb = nanobind;
 using namespace std;
@@ -24,11 +25,33 @@ struct CallbackPerformanceData {
     std::vector<uint64_t> processingTimeBinCounts;
     uint64_t processingTimeBinMax;
     uint64_t processingTimeBinMin;
-    std::mutex lock;
+    mutable std::mutex lock;
 
     CallbackPerformanceData();
     CallbackPerformanceData(const CallbackPerformanceData& other);
     void updatePerformanceData(uint64_t processingTimeMicroseconds);
 };
 
+// Wraps a Linux eventfd so native code running on SDK threads can wake an event
+// loop (GLib io watch, asyncio add_reader) without calling into Python.
+class EventNotifier {
+public:
+    EventNotifier();
+    ~EventNotifier();
+    EventNotifier(const EventNotifier&) = delete;
+    EventNotifier& operator=(const EventNotifier&) = delete;
+
+    int fd() const;
+    void notify();
+    uint64_t drain();
+
+private:
+    int m_fd;
+};
+
+// Calls `callback(threadIndex)` callsPerThread times from each of `threads` native
+// threads and returns the wall time in seconds. Used to measure how Python
+// callback handlers scale across SDK threads (GIL vs free-threaded builds).
+double benchmarkCallbackDispatch(const function<void(uint32_t)>& callback, uint32_t threads, uint32_t callsPerThread);
+
 #endif
\ No newline at end of file
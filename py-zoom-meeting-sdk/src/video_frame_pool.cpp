@@ -0,0 +1,122 @@
+#include <nanobind/nanobind.h>
+#include <nanobind/ndarray.h>
+#include <nanobind/stl/unique_ptr.h>
+
+#include <stdexcept>
+
+#include "video_frame_pool.h"
+
+namespace nb = nanobind;
+using namespace std;
+
+RetainedVideoFrame::RetainedVideoFrame(YUVRawDataI420* frame, std::shared_ptr<VideoFramePoolState> pool)
+    : frame(frame), pool(std::move(pool)) {}
+
+RetainedVideoFrame::~RetainedVideoFrame() {
+    frame->Release();
+    pool->retained.fetch_sub(1);
+}
+
+VideoFrameHandle::VideoFrameHandle(std::shared_ptr<RetainedVideoFrame> ref) : m_ref(std::move(ref)) {
+    YUVRawDataI420* frame = m_ref->frame;
+    width = frame->GetStreamWidth();
+    height = frame->GetStreamHeight();
+    rotation = frame->GetRotation();
+    sourceId = frame->GetSourceID();
+    timestamp = frame->GetTimeStamp();
+    limitedRange = frame->IsLimitedI420();
+}
+
+const std::shared_ptr<RetainedVideoFrame>& VideoFrameHandle::ref() const {
+    if (!m_ref)
+        throw std::runtime_error("video frame has been released");
+    return m_ref;
+}
+
+VideoFramePool::VideoFramePool(uint32_t maxFrames)
+    : m_state(std::make_shared<VideoFramePoolState>(maxFrames)) {
+    if (maxFrames == 0)
+        throw std::invalid_argument("maxFrames must be positive");
+}
+
+std::unique_ptr<VideoFrameHandle> VideoFramePool::acquire(YUVRawDataI420* frame) {
+    if (!frame || !frame->CanAddRef()) {
+        m_state->rejected.fetch_add(1);
+        return nullptr;
+    }
+    // reserve a slot first so concurrent callbacks cannot overshoot maxFrames
+    uint32_t held = m_state->retained.load();
+    do {
+        if (held >= m_state->maxFrames) {
+            m_state->rejected.fetch_add(1);
+            return nullptr;
+        }
+    } while (!m_state->retained.compare_exchange_weak(held, held + 1));
+
+    if (!frame->AddRef()) {
+        m_state->retained.fetch_sub(1);
+        m_state->rejected.fetch_add(1);
+        return nullptr;
+    }
+    m_state->acquired.fetch_add(1);
+    return std::make_unique<VideoFrameHandle>(std::make_shared<RetainedVideoFrame>(frame, m_state));
+}
+
+using PlaneArray = nb::ndarray<nb::numpy, const uint8_t, nb::ndim<2>>;
+
+// Read-only view into one plane of the SDK buffer. The capsule owns its own
+// reference to the frame, so the array stays valid after the handle is released.
+// I420 chroma is subsampled 2x2 with rounding up, odd sizes keep the last column/row
+static size_t chromaSize(size_t lumaSize) {
+    return (lumaSize + 1) / 2;
+}
+
+static nb::object planeView(const VideoFrameHandle& self, const char* data, size_t rows, size_t cols) {
+    auto* owner = new std::shared_ptr<RetainedVideoFrame>(self.ref());
+    nb::capsule capsule(owner, [](void* p) noexcept {
+        delete static_cast<std::shared_ptr<RetainedVideoFrame>*>(p);
+    });
+    nb::object array = nb::cast(PlaneArray(reinterpret_cast<const uint8_t*>(data), {rows, cols}, capsule),
+                                nb::rv_policy::automatic);
+    array.attr("setflags")(nb::arg("write") = false);
+    return array;
+}
+
+void init_video_frame_pool(nb::module_ &m) {
+    nb::class_<VideoFrameHandle>(m, "VideoFrameHandle",
+        "AddRef'd SDK video frame. Planes are zero-copy read-only numpy views; the frame is "
+        "released once the handle is released (release() / with-block / GC) and no view remains")
+        .def_ro("width", &VideoFrameHandle::width)
+        .def_ro("height", &VideoFrameHandle::height)
+        .def_ro("rotation", &VideoFrameHandle::rotation)
+        .def_ro("sourceId", &VideoFrameHandle::sourceId)
+        .def_ro("timestamp", &VideoFrameHandle::timestamp)
+        .def_ro("limitedRange", &VideoFrameHandle::limitedRange)
+        .def_prop_ro("released", &VideoFrameHandle::isReleased)
+        .def_prop_ro("y", [](const VideoFrameHandle& self) {
+            return planeView(self, self.ref()->frame->GetYBuffer(), self.height, self.width);
+        }, "Y plane, shape (height, width)")
+        .def_prop_ro("u", [](const VideoFrameHandle& self) {
+            return planeView(self, self.ref()->frame->GetUBuffer(), chromaSize(self.height), chromaSize(self.width));
+        }, "U plane, shape ((height + 1) / 2, (width + 1) / 2)")
+        .def_prop_ro("v", [](const VideoFrameHandle& self) {
+            return planeView(self, self.ref()->frame->GetVBuffer(), chromaSize(self.height), chromaSize(self.width));
+        }, "V plane, shape ((height + 1) / 2, (width + 1) / 2)")
+        .def("release", &VideoFrameHandle::release)
+        .def("__enter__", [](VideoFrameHandle& self) -> VideoFrameHandle& { return self; },
+             nb::rv_policy::reference)
+        .def("__exit__", [](VideoFrameHandle& self, nb::handle, nb::handle, nb::handle) {
+            self.release();
+        }, nb::arg("exc_type").none(), nb::arg("exc_value").none(), nb::arg("traceback").none());
+
+    nb::class_<VideoFramePool>(m, "VideoFramePool",
+        "Bounded retention of SDK video frames: at most maxFrames are AddRef'd at a time")
+        .def(nb::init<uint32_t>(), nb::arg("maxFrames"))
+        .def("acquire", &VideoFramePool::acquire, nb::arg("frame"),
+             "Retains the frame and returns a VideoFrameHandle, or None if the pool is full "
+             "or the frame cannot be referenced")
+        .def_prop_ro("maxFrames", &VideoFramePool::maxFrames)
+        .def_prop_ro("retained", &VideoFramePool::retained)
+        .def_prop_ro("acquired", &VideoFramePool::acquired)
+        .def_prop_ro("rejected", &VideoFramePool::rejected);
+}
@@ -0,0 +1,72 @@
+#ifndef VIDEO_FRAME_POOL_H
+#define VIDEO_FRAME_POOL_H
+
+#include <atomic>
+#include <cstdint>
+#include <memory>
+
+#include "zoom_sdk.h"
+#include "zoom_sdk_raw_data_def.h"
+
+// Counters shared by a pool and every frame it handed out, so frames may
+// outlive the pool object itself.
+struct VideoFramePoolState {
+    explicit VideoFramePoolState(uint32_t maxFrames) : maxFrames(maxFrames) {}
+
+    const uint32_t maxFrames;
+    std::atomic<uint32_t> retained{0};
+    std::atomic<uint64_t> acquired{0};
+    std::atomic<uint64_t> rejected{0};
+};
+
+// One AddRef on an SDK frame. The SDK reference is dropped when the last owner
+// (the Python handle or any plane array exported from it) goes away.
+struct RetainedVideoFrame {
+    RetainedVideoFrame(YUVRawDataI420* frame, std::shared_ptr<VideoFramePoolState> pool);
+    ~RetainedVideoFrame();
+
+    YUVRawDataI420* frame;
+    std::shared_ptr<VideoFramePoolState> pool;
+};
+
+// Python-facing handle: frame metadata captured at acquire time plus a shared
+// reference to the retained frame. release() drops the handle's reference;
+// the SDK frame is released once no plane array still points into it.
+class VideoFrameHandle {
+public:
+    VideoFrameHandle(std::shared_ptr<RetainedVideoFrame> ref);
+
+    bool isReleased() const { return !m_ref; }
+    void release() { m_ref.reset(); }
+    const std::shared_ptr<RetainedVideoFrame>& ref() const;
+
+    uint32_t width;
+    uint32_t height;
+    uint32_t rotation;
+    uint32_t sourceId;
+    uint64_t timestamp;
+    bool limitedRange;
+
+private:
+    std::shared_ptr<RetainedVideoFrame> m_ref;
+};
+
+// Bounded retention: acquire() AddRefs a frame only while fewer than maxFrames
+// are held, so slow consumers cannot pin an unbounded number of SDK buffers.
+class VideoFramePool {
+public:
+    explicit VideoFramePool(uint32_t maxFrames);
+
+    // nullptr if the pool is full or the SDK frame cannot be referenced
+    std::unique_ptr<VideoFrameHandle> acquire(YUVRawDataI420* frame);
+
+    uint32_t maxFrames() const { return m_state->maxFrames; }
+    uint32_t retained() const { return m_state->retained.load(); }
+    uint64_t acquired() const { return m_state->acquired.load(); }
+    uint64_t rejected() const { return m_state->rejected.load(); }
+
+private:
+    std::shared_ptr<VideoFramePoolState> m_state;
+};
+
+#endif
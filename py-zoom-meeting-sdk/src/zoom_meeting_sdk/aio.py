@@ -0,0 +1,215 @@
+"""asyncio adapters that turn SDK callbacks into ``async for`` event streams.
+
+SDK callbacks run synchronously on SDK threads. The streams here only append
+to a bounded queue and signal an eventfd there; the asyncio loop watches that
+fd with ``loop.add_reader`` and hands items to the consumer. Slow consumers
+never block the SDK thread: when a queue is full the overflow policy decides
+what to drop.
+
+SDK objects passed to callbacks (``IChatMsgInfo``, ``IUserInfo``,
+``AudioRawData``) are views of native memory valid only while the callback
+runs. ``EventStream.callback`` therefore converts every argument with
+``snapshot`` before queueing: known SDK objects become plain dicts, any other
+native object is rejected with ``TypeError``.
+
+Callback example::
+
+    status = aio.EventStream(maxsize=64)
+    zoom.MeetingServiceEventCallbacks(onMeetingStatusChangedCallback=status.callback)
+
+    async for meeting_status, result in status:
+        ...
+
+Raw audio is queued natively by ``ZoomSDKAudioRawDataDelegateCallbacks`` in
+buffered mode; ``AudioFrameStream`` reads it through the delegate's own eventfd::
+
+    delegate = zoom.ZoomSDKAudioRawDataDelegateCallbacks(bufferOneWayAudio=True)
+    async for frame in aio.AudioFrameStream(delegate):
+        frame.userId, frame.data
+
+The SDK still needs a GLib main loop; the asyncio loop may run in the same
+thread (GLib-integrated loop) or in another thread, since the streams are
+thread-safe.
+"""
+
+import asyncio
+import collections
+import enum
+import os
+import threading
+
+from . import _zoom_meeting_sdk_impl as _impl
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+
+def _user_info(user):
+    return {
+        "user_id": user.GetUserID(),
+        "user_name": user.GetUserName(),
+        "persistent_id": user.GetPersistentId(),
+        "customer_key": user.GetCustomerKey(),
+        "is_host": user.IsHost(),
+        "is_myself": user.IsMySelf(),
+        "is_video_on": user.IsVideoOn(),
+        "is_audio_muted": user.IsAudioMuted(),
+        "is_talking": user.IsTalking(),
+        "is_in_waiting_room": user.IsInWaitingRoom(),
+        "is_raise_hand": user.IsRaiseHand(),
+        "user_role": user.GetUserRole(),
+    }
+
+
+def _audio_raw_data(data):
+    return {
+        "data": data.GetBuffer(),
+        "sample_rate": data.GetSampleRate(),
+        "channels": data.GetChannelNum(),
+        "timestamp": data.GetTimeStamp(),
+    }
+
+
+_SNAPSHOTS = {
+    _impl.IChatMsgInfo: lambda msg: msg.Snapshot(),
+    _impl.IUserInfo: _user_info,
+    _impl.AudioRawData: _audio_raw_data,
+}
+
+
+def snapshot(value):
+    """Copy a callback argument into plain Python values.
+
+    Must be called on the SDK thread, inside the callback. Raises
+    ``TypeError`` for native objects without a known snapshot.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes, enum.Enum)):
+        return value
+    convert = _SNAPSHOTS.get(type(value))
+    if convert is not None:
+        return convert(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(snapshot(v) for v in value)
+    if type(value).__module__.startswith(__package__):
+        raise TypeError(f"{type(value).__name__} is only valid during the SDK callback "
+                        "and cannot be queued; copy the needed fields in a callback of your own")
+    return value
+
+
+class _FdStream:
+    """Async iterator woken by an eventfd; subclasses provide ``_fill``."""
+
+    def __init__(self, fd):
+        self._fd = fd
+        self._items = collections.deque()
+        self._closed = False
+
+    def _fill(self):
+        """Move newly available items into ``self._items``."""
+
+    def _wake(self, fut):
+        try:
+            os.eventfd_read(self._fd)
+        except BlockingIOError:
+            pass
+        if not fut.done():
+            fut.set_result(None)
+
+    async def get(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._items:
+                self._fill()
+            if self._items:
+                return self._items.popleft()
+            if self._closed:
+                raise StopAsyncIteration
+            fut = loop.create_future()
+            loop.add_reader(self._fd, self._wake, fut)
+            try:
+                await fut
+            finally:
+                loop.remove_reader(self._fd)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+
+class EventStream(_FdStream):
+    """Bounded, thread-safe queue fed by SDK callbacks.
+
+    ``callback`` can be passed directly as any ``*Callbacks`` argument. A
+    single-argument callback yields the argument itself, otherwise a tuple;
+    arguments are converted with ``snapshot``. ``put`` queues items as given
+    and is for values the caller has already copied.
+    """
+
+    def __init__(self, maxsize=1024, overflow=DROP_OLDEST):
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"unknown overflow policy: {overflow}")
+        super().__init__(os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC))
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+
+    def put(self, item):
+        """Called on SDK threads: never blocks, never touches the event loop."""
+        with self._lock:
+            if self._closed:
+                return
+            if len(self._pending) >= self.maxsize:
+                self.dropped += 1
+                if self.overflow == DROP_NEWEST:
+                    return
+                self._pending.popleft()
+            self._pending.append(item)
+        os.eventfd_write(self._fd, 1)
+
+    def callback(self, *args):
+        args = tuple(snapshot(a) for a in args)
+        self.put(args[0] if len(args) == 1 else args)
+
+    def _fill(self):
+        with self._lock:
+            self._items, self._pending = self._pending, self._items
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        os.eventfd_write(self._fd, 1)
+
+    def __del__(self):
+        try:
+            os.close(self._fd)
+        except (OSError, AttributeError):
+            pass
+
+
+class AudioFrameStream(_FdStream):
+    """``BufferedAudioFrame`` objects from a buffered audio delegate.
+
+    The delegate signals its fd once ``notifyThresholdFrames`` frames are
+    pending or ``notifyLatencyMs`` after the first frame of a batch, so frames
+    arrive in batches with at most that much extra latency.
+    """
+
+    def __init__(self, delegate):
+        super().__init__(delegate.getNotificationFd())
+        self._delegate = delegate
+
+    def _fill(self):
+        self._items.extend(self._delegate.drainOneWayAudio())
+
+    def close(self):
+        """Ends iteration after the queued frames; wakes a pending ``get``."""
+        self._closed = True
+        os.eventfd_write(self._fd, 1)
+
+    @property
+    def dropped(self):
+        return self._delegate.getDroppedFrameCount()
@@ -13,12 +13,18 @@
 #include "rawdata/zoom_rawdata_api.h"
 
 #include "utilities.h"
+#include "audio_resampler.h"
 
 #include <iostream>
 #include <functional>
 #include <memory>
 #include <mutex>
+#include <condition_variable>
+#include <thread>
 #include <vector>
+#include <deque>
+#include <chrono>
+#include <unordered_map>
 
 namespace nb = nanobind;
 using namespace std;
@@ -41,6 +47,18 @@ public:
 };
 */
 
+// One-way audio frame copied out of the SDK buffer, so it can be handed to Python later.
+// With a capture format set, data is already resampled to sampleRate, mono, in sampleFormat.
+struct BufferedAudioFrame {
+    uint32_t userId;
+    uint32_t sampleRate;
+    uint32_t channelNum;
+    std::string sampleFormat;
+    uint64_t sdkTimeStamp;
+    uint64_t wallClockMicroseconds;
+    std::string data;
+};
+
 class ZoomSDKAudioRawDataDelegateCallbacks : public ZOOM_SDK_NAMESPACE::IZoomSDKAudioRawDataDelegate {
 private:
     function<void(AudioRawData*)> m_onMixedAudioRawDataReceivedCallback;
@@ -49,18 +67,159 @@ private:
     function<void(AudioRawData*, const zchar_t*)> m_onOneWayInterpreterAudioRawDataReceivedCallback;
     bool m_collectPerformanceData;
     CallbackPerformanceData m_performanceData;
+
+    // Buffered mode: one-way frames are queued natively (no GIL on the SDK thread)
+    // and the notifier fd is signalled once notifyThresholdFrames frames are
+    // pending or notifyLatencyMs after the first frame of the batch, whichever
+    // comes first. The deadline is kept by m_flusher, so a trailing partial
+    // batch is delivered even when no more audio arrives.
+    bool m_bufferOneWayAudio;
+    uint32_t m_notifyThresholdFrames;
+    uint32_t m_maxBufferedFrames;
+    std::chrono::milliseconds m_notifyLatency;
+    std::mutex m_bufferLock;
+    std::deque<BufferedAudioFrame> m_buffer;
+    uint64_t m_droppedFrames = 0;
+    uint32_t m_pendingSinceNotify = 0;
+    EventNotifier m_notifier;
+    std::condition_variable m_deadlineChanged;
+    bool m_deadlineArmed = false;
+    std::chrono::steady_clock::time_point m_deadline;
+    bool m_stopFlusher = false;
+    std::thread m_flusher;
+
+    // Capture format of buffered frames: per-user streams are resampled natively
+    // (0 = keep the SDK rate) and converted to m_sampleFormat before the queue.
+    // The lock is only contended when flushOneWayAudio runs on another thread.
+    uint32_t m_captureSampleRate;
+    SampleFormat m_sampleFormat;
+    std::mutex m_resamplerLock;
+    std::unordered_map<uint32_t, std::unique_ptr<PolyphaseResampler>> m_resamplers;
+    std::unordered_map<uint32_t, uint64_t> m_streamEndMicroseconds;   // wall clock after the last frame
+    std::vector<float> m_resampleScratch;
+
+    void convertFrame(AudioRawData* data_, uint32_t user_id, BufferedAudioFrame& frame) {
+        uint32_t rate = data_->GetSampleRate();
+        uint32_t channels = data_->GetChannelNum();
+        const int16_t* pcm = reinterpret_cast<const int16_t*>(data_->GetBuffer());
+        size_t frames = data_->GetBufferLen() / (sizeof(int16_t) * std::max(channels, 1u));
+
+        std::lock_guard<std::mutex> lockGuard(m_resamplerLock);
+        auto& resampler = m_resamplers[user_id];
+        uint32_t target = m_captureSampleRate ? m_captureSampleRate : rate;
+        if (!resampler || resampler->srcRate() != rate)
+            resampler = std::make_unique<PolyphaseResampler>(rate, target);
+        m_resampleScratch.clear();
+        resampler->process(pcm, frames, channels, m_resampleScratch);
+        encodeSamples(m_resampleScratch, m_sampleFormat, frame.data);
+        frame.sampleRate = target;
+        frame.channelNum = 1;
+        m_streamEndMicroseconds[user_id] = frame.wallClockMicroseconds + (rate ? frames * 1000000 / rate : 0);
+    }
+
+    void enqueue(BufferedAudioFrame&& frame) {
+        bool notify = false;
+        bool armed = false;
+        {
+            std::lock_guard<std::mutex> lockGuard(m_bufferLock);
+            if (m_buffer.size() >= m_maxBufferedFrames) {
+                m_buffer.pop_front();
+                m_droppedFrames++;
+            }
+            m_buffer.push_back(std::move(frame));
+            if (++m_pendingSinceNotify >= m_notifyThresholdFrames || !m_flusher.joinable()) {
+                m_pendingSinceNotify = 0;
+                m_deadlineArmed = false;
+                notify = true;
+            } else if (!m_deadlineArmed) {
+                m_deadlineArmed = true;
+                m_deadline = std::chrono::steady_clock::now() + m_notifyLatency;
+                armed = true;
+            }
+        }
+        if (notify)
+            m_notifier.notify();
+        if (armed)
+            m_deadlineChanged.notify_one();
+    }
+
+    // Signals the fd for a partial batch whose deadline has passed.
+    void runFlusher() {
+        std::unique_lock<std::mutex> lock(m_bufferLock);
+        while (!m_stopFlusher) {
+            if (!m_deadlineArmed) {
+                m_deadlineChanged.wait(lock);
+                continue;
+            }
+            if (std::chrono::steady_clock::now() < m_deadline) {
+                m_deadlineChanged.wait_until(lock, m_deadline);
+                continue;
+            }
+            m_deadlineArmed = false;
+            m_pendingSinceNotify = 0;
+            lock.unlock();
+            m_notifier.notify();
+            lock.lock();
+        }
+    }
+
+    void bufferOneWayAudio(AudioRawData* data_, uint32_t user_id) {
+        BufferedAudioFrame frame;
+        frame.userId = user_id;
+        frame.sampleRate = data_->GetSampleRate();
+        frame.channelNum = data_->GetChannelNum();
+        frame.sampleFormat = sampleFormatName(m_sampleFormat);
+        frame.sdkTimeStamp = data_->GetTimeStamp();
+        frame.wallClockMicroseconds = std::chrono::duration_cast<std::chrono::microseconds>(
+            std::chrono::system_clock::now().time_since_epoch()).count();
+        bool passthrough = m_sampleFormat == SampleFormat::S16 &&
+            (m_captureSampleRate == 0 || m_captureSampleRate == frame.sampleRate);
+        if (passthrough)
+            frame.data.assign(data_->GetBuffer(), data_->GetBufferLen());
+        else
+            convertFrame(data_, user_id, frame);
+        enqueue(std::move(frame));
+    }
+
 public:
     ZoomSDKAudioRawDataDelegateCallbacks(
         const function<void(AudioRawData*)>& onMixedAudioRawDataReceivedCallback = nullptr,
         const function<void(AudioRawData*, uint32_t)>& onOneWayAudioRawDataReceivedCallback = nullptr,
         const function<void(AudioRawData*)>& onShareAudioRawDataReceivedCallback = nullptr,
         const function<void(AudioRawData*, const zchar_t*)>& onOneWayInterpreterAudioRawDataReceivedCallback = nullptr,
-        bool collectPerformanceData = false
+        bool collectPerformanceData = false,
+        bool bufferOneWayAudio = false,
+        uint32_t notifyThresholdFrames = 10,
+        uint32_t maxBufferedFrames = 10000,
+        uint32_t captureSampleRate = 0,
+        const std::string& captureSampleFormat = "s16",
+        uint32_t notifyLatencyMs = 20
     ) : m_onMixedAudioRawDataReceivedCallback(onMixedAudioRawDataReceivedCallback),
         m_onOneWayAudioRawDataReceivedCallback(onOneWayAudioRawDataReceivedCallback),
         m_onShareAudioRawDataReceivedCallback(onShareAudioRawDataReceivedCallback),
         m_onOneWayInterpreterAudioRawDataReceivedCallback(onOneWayInterpreterAudioRawDataReceivedCallback),
-        m_collectPerformanceData(collectPerformanceData) {}
+        m_collectPerformanceData(collectPerformanceData),
+        m_bufferOneWayAudio(bufferOneWayAudio),
+        m_notifyThresholdFrames(notifyThresholdFrames > 0 ? notifyThresholdFrames : 1),
+        m_maxBufferedFrames(maxBufferedFrames > 0 ? maxBufferedFrames : 1),
+        m_notifyLatency(notifyLatencyMs),
+        m_captureSampleRate(captureSampleRate),
+        m_sampleFormat(parseSampleFormat(captureSampleFormat)) {
+        // notifyLatencyMs = 0: no coalescing, every frame signals the fd
+        if (m_bufferOneWayAudio && notifyLatencyMs > 0)
+            m_flusher = std::thread(&ZoomSDKAudioRawDataDelegateCallbacks::runFlusher, this);
+    }
+
+    ~ZoomSDKAudioRawDataDelegateCallbacks() {
+        if (!m_flusher.joinable())
+            return;
+        {
+            std::lock_guard<std::mutex> lockGuard(m_bufferLock);
+            m_stopFlusher = true;
+        }
+        m_deadlineChanged.notify_one();
+        m_flusher.join();
+    }
 
     void onMixedAudioRawDataReceived(AudioRawData* data_) override {
         if (m_onMixedAudioRawDataReceivedCallback)
@@ -78,7 +237,19 @@ public:
     }
 
     void onOneWayAudioRawDataReceived(AudioRawData* data_, uint32_t user_id) override {
-        if (m_onOneWayAudioRawDataReceivedCallback)
+        if (m_bufferOneWayAudio)
+        {
+            if (m_collectPerformanceData) {
+                auto start = std::chrono::high_resolution_clock::now();
+                bufferOneWayAudio(data_, user_id);
+                auto end = std::chrono::high_resolution_clock::now();
+                uint64_t processingTimeMicroseconds = std::chrono::duration_cast<std::chrono::microseconds>(end - start).count();
+                m_performanceData.updatePerformanceData(processingTimeMicroseconds);
+            }
+            else
+                bufferOneWayAudio(data_, user_id);
+        }
+        else if (m_onOneWayAudioRawDataReceivedCallback)
         {
             if (m_collectPerformanceData) {
                 auto start = std::chrono::high_resolution_clock::now();
@@ -122,26 +293,102 @@ public:
         }
     }
 
-    const CallbackPerformanceData & getPerformanceData() const {
+    // returned by value: the copy is taken under the data's lock
+    CallbackPerformanceData getPerformanceData() const {
         return m_performanceData;
     }
+
+    int getNotificationFd() const {
+        return m_notifier.fd();
+    }
+
+    vector<BufferedAudioFrame> drainOneWayAudio() {
+        m_notifier.drain();
+        std::deque<BufferedAudioFrame> pending;
+        {
+            std::lock_guard<std::mutex> lockGuard(m_bufferLock);
+            pending.swap(m_buffer);
+            m_pendingSinceNotify = 0;
+            m_deadlineArmed = false;
+        }
+        return vector<BufferedAudioFrame>(std::make_move_iterator(pending.begin()),
+                                          std::make_move_iterator(pending.end()));
+    }
+
+    // Queues the samples each user's resampler still holds back (filter delay) as
+    // one last frame per user and resets the streams. Call before closing tracks.
+    void flushOneWayAudio() {
+        std::vector<BufferedAudioFrame> tails;
+        {
+            std::lock_guard<std::mutex> lockGuard(m_resamplerLock);
+            for (auto& [userId, resampler] : m_resamplers) {
+                std::vector<float> samples;
+                resampler->flush(samples);
+                if (samples.empty())
+                    continue;
+                BufferedAudioFrame frame;
+                frame.userId = userId;
+                frame.sampleRate = resampler->dstRate();
+                frame.channelNum = 1;
+                frame.sampleFormat = sampleFormatName(m_sampleFormat);
+                frame.sdkTimeStamp = 0;
+                frame.wallClockMicroseconds = m_streamEndMicroseconds[userId];
+                encodeSamples(samples, m_sampleFormat, frame.data);
+                tails.push_back(std::move(frame));
+            }
+        }
+        for (auto& frame : tails)
+            enqueue(std::move(frame));
+    }
+
+    uint64_t getDroppedFrameCount() {
+        std::lock_guard<std::mutex> lockGuard(m_bufferLock);
+        return m_droppedFrames;
+    }
 };
 
 void init_zoom_sdk_audio_raw_data_delegate_callbacks(nb::module_ &m) {
 
+    nb::class_<BufferedAudioFrame>(m, "BufferedAudioFrame")
+        .def_ro("userId", &BufferedAudioFrame::userId)
+        .def_ro("sampleRate", &BufferedAudioFrame::sampleRate)
+        .def_ro("channelNum", &BufferedAudioFrame::channelNum)
+        .def_ro("sampleFormat", &BufferedAudioFrame::sampleFormat)
+        .def_ro("sdkTimeStamp", &BufferedAudioFrame::sdkTimeStamp)
+        .def_ro("wallClockMicroseconds", &BufferedAudioFrame::wallClockMicroseconds)
+        .def_prop_ro("data", [](const BufferedAudioFrame& self) -> nb::bytes {
+            return nb::bytes(self.data.data(), self.data.size());
+        });
+
     nb::class_<ZoomSDKAudioRawDataDelegateCallbacks, ZOOM_SDK_NAMESPACE::IZoomSDKAudioRawDataDelegate>(m, "ZoomSDKAudioRawDataDelegateCallbacks")
         .def(nb::init<
             const function<void(AudioRawData*)>&,
             const function<void(AudioRawData*, uint32_t)>&,
             const function<void(AudioRawData*)>&,
             const function<void(AudioRawData*, const zchar_t*)>&,
-            bool
+            bool,
+            bool,
+            uint32_t,
+            uint32_t,
+            uint32_t,
+            const std::string&,
+            uint32_t
         >(),
         nb::arg("onMixedAudioRawDataReceivedCallback") = nullptr,
         nb::arg("onOneWayAudioRawDataReceivedCallback") = nullptr,
         nb::arg("onShareAudioRawDataReceivedCallback") = nullptr,
         nb::arg("onOneWayInterpreterAudioRawDataReceivedCallback") = nullptr,
-        nb::arg("collectPerformanceData") = false
+        nb::arg("collectPerformanceData") = false,
+        nb::arg("bufferOneWayAudio") = false,
+        nb::arg("notifyThresholdFrames") = 10,
+        nb::arg("maxBufferedFrames") = 10000,
+        nb::arg("captureSampleRate") = 0,
+        nb::arg("captureSampleFormat") = "s16",
+        nb::arg("notifyLatencyMs") = 20
     )
-    .def("getPerformanceData", &ZoomSDKAudioRawDataDelegateCallbacks::getPerformanceData);
+    .def("getPerformanceData", &ZoomSDKAudioRawDataDelegateCallbacks::getPerformanceData)
+    .def("getNotificationFd", &ZoomSDKAudioRawDataDelegateCallbacks::getNotificationFd)
+    .def("drainOneWayAudio", &ZoomSDKAudioRawDataDelegateCallbacks::drainOneWayAudio, nb::call_guard<nb::gil_scoped_release>())
+    .def("flushOneWayAudio", &ZoomSDKAudioRawDataDelegateCallbacks::flushOneWayAudio, nb::call_guard<nb::gil_scoped_release>())
+    .def("getDroppedFrameCount", &ZoomSDKAudioRawDataDelegateCallbacks::getDroppedFrameCount);
 }
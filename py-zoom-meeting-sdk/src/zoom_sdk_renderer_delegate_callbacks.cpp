@@ -67,6 +67,8 @@ public:
     }
 
     void onRawDataFrameReceived(YUVRawDataI420* data) override {
+        if (!m_onRawDataFrameReceivedCallback)
+            return;
         if (m_collectPerformanceData) {
             auto start = std::chrono::high_resolution_clock::now();
             m_onRawDataFrameReceivedCallback(data);
@@ -83,7 +85,8 @@ public:
             m_onRawDataStatusChangedCallback(status);
     }
 
-    const CallbackPerformanceData & getPerformanceData() const {
+    // returned by value: the copy is taken under the data's lock
+    CallbackPerformanceData getPerformanceData() const {
         return m_performanceData;
     }
 };